@@ -4,8 +4,8 @@
 # --------------------------------------------------------------------
 
 
-import binascii
 import ctypes
+import functools
 import os
 import platform
 import re
@@ -15,11 +15,17 @@ import subprocess
 import sys
 import traceback
 import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from enum import Enum
 
 from . import FVCreation_header as FVC_h
 from . import XmlFwEntryValidation as XFEV
 from . import XmlParser as xp
+from . import checksum
+from . import entry_snapshot
+from . import ffs_builder
+from . import ffs_cache
+from . import fv_builder
 
 print_logs = 0
 
@@ -114,51 +120,6 @@ def get_file_name_only(s_file):
         return s_file[: s_file.rfind(".")]
 
 
-def Reflect(data_b, l_i):
-
-    data_i = int(data_b)
-    reff_i = 0
-
-    for i in range(l_i):
-        if (data_i & 0x1) != 0:
-            reff_i = reff_i | int(1 << (int(l_i - 1) - i))
-        data_i = data_i >> 1
-
-    return reff_i
-
-
-def CalcCRC32_i(buffer_b, l_i):
-    k_i = 8
-    MSB_i = 0
-    gx_h = 0x04C11DB7
-    regs_h = 0xFFFFFFFF
-    regsMask_h = 0xFFFFFFFF
-    regsMSB_i = 0
-
-    gx_i = int(gx_h)
-    regs_i = int(regs_h)
-    regsMask_i = int(regsMask_h)
-
-    for i in range(l_i):
-        DataByte_b = buffer_b[i]
-        DataByte_i = int(DataByte_b)
-        DataByte_i = Reflect(DataByte_i, 8)
-
-        for j in range(k_i):
-            MSB_i = DataByte_i >> (k_i - 1)
-            MSB_i = MSB_i & 1
-            regsMSB_i = int(regs_i >> 31) & 1
-            regs_i = regs_i << 1
-            if (regsMSB_i ^ MSB_i) != 0:
-                regs_i = regs_i ^ gx_i
-
-            regs_i = regs_i & regsMask_i
-            DataByte_i = DataByte_i << 1
-    regs_i = regs_i & regsMask_i
-
-    return Reflect(regs_i, 32) ^ int(0xFFFFFFFF)
-
-
 def execute_command_linux(s_command):
     try:
         result = subprocess.run(s_command, capture_output=True, text=True, shell=True)
@@ -215,6 +176,43 @@ def regenerate_all_executables():
     return ls_executables
 
 
+def run_gen_ffs(s_ffs_file, s_guid, s_input_file, tools_dir=None):
+    if tools_dir is None:
+        tools_dir = _resolve_tools_dir("GenFfs")
+    s_command = f"{_tool_path(tools_dir, 'GenFfs')} -o {s_ffs_file} -t EFI_FV_FILETYPE_RAW -g {s_guid} -s -v -i {s_input_file}"
+    execute_command_linux(s_command)
+
+
+def generate_ffs_file(
+    s_ffs_file,
+    s_guid,
+    s_input_file,
+    tools_dir=None,
+    use_edk2_tools=False,
+    cache=None,
+    stream=False,
+):
+    """Create a RAW FFS file for *s_input_file* and return it as an FfsFile.
+
+    The file is encoded in memory by ffs_builder. With *stream* nothing is
+    encoded yet: a StreamedFfsFile is returned and the input is encoded
+    while the FV is written.
+    *use_edk2_tools* runs edk2 GenFfs instead, which writes the same bytes
+    to *s_ffs_file*. GenFfs is skipped when *cache* (an ffs_cache.FfsCache)
+    holds its output for the same input.
+    """
+    if not use_edk2_tools:
+        if stream:
+            return ffs_builder.StreamedFfsFile(s_ffs_file, s_guid, s_input_file)
+        return ffs_builder.FfsFile.from_input_file(s_ffs_file, s_guid, s_input_file)
+
+    if cache is not None:
+        gen_ffs = functools.partial(run_gen_ffs, tools_dir=tools_dir)
+        return cache.build(s_ffs_file, s_guid, s_input_file, gen_ffs)
+    run_gen_ffs(s_ffs_file, s_guid, s_input_file, tools_dir)
+    return ffs_builder.FfsFile(s_ffs_file, s_guid, s_input_file)
+
+
 def generate_fv_main_file(lsFFsFiles):
     if os.path.exists(FV_MAIN_INF_NAME):
         os.remove(FV_MAIN_INF_NAME)
@@ -251,9 +249,56 @@ def generate_fv_main_file(lsFFsFiles):
         return False
 
 
-def generate_fv(s_output_file_name, ls_ffs, s_gen_fv, tools_dir=None):
-    bReturn = False
-    if not generate_fv_main_file(ls_ffs):
+def generate_ffs_files(
+    ls_tasks,
+    tools_dir=None,
+    use_edk2_tools=False,
+    jobs=None,
+    cache=None,
+    stream=False,
+):
+    """Run generate_ffs_file for each (s_ffs_file, s_guid, s_input_file) task.
+
+    Up to *jobs* files (default: one per CPU) are built at once. The
+    returned FfsFile list is always in *ls_tasks* order.
+    """
+    if stream and not use_edk2_tools:
+        # Streamed files are encoded later, one at a time, by the FV writer.
+        return [generate_ffs_file(*task, tools_dir, stream=True) for task in ls_tasks]
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    jobs = min(jobs, len(ls_tasks))
+    if jobs <= 1:
+        return [
+            generate_ffs_file(*task, tools_dir, use_edk2_tools, cache)
+            for task in ls_tasks
+        ]
+
+    n = len(ls_tasks)
+    if not use_edk2_tools:
+        # The native encoder is CPU bound and holds the GIL: checksum.sum8
+        # feeds zlib.adler32 256-byte blocks, below the size at which zlib
+        # releases it. Worker processes write the .ffs files themselves,
+        # so no image is pickled back; the FV writer reads them from disk.
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            list(executor.map(ffs_builder.write_ffs_file, *zip(*ls_tasks)))
+        return [ffs_builder.FfsFile(*task) for task in ls_tasks]
+
+    # GenFfs runs in its own process, so threads are enough to drive it.
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        return list(
+            executor.map(
+                generate_ffs_file,
+                *zip(*ls_tasks),
+                [tools_dir] * n,
+                [use_edk2_tools] * n,
+                [cache] * n,
+            )
+        )
+
+
+def run_gen_fv(s_output_file_name, ls_ffs_names, tools_dir=None):
+    if not generate_fv_main_file(ls_ffs_names):
         print(f"ERROR: Failure creating {FV_MAIN_INF_NAME} file.")
         return False
 
@@ -261,6 +306,27 @@ def generate_fv(s_output_file_name, ls_ffs, s_gen_fv, tools_dir=None):
         tools_dir = _resolve_tools_dir("GenFv")
     sFVCommand = f"{_tool_path(tools_dir, 'GenFv')} -o {s_output_file_name} -i {FV_MAIN_INF_NAME} -v"
     execute_command_linux(sFVCommand)
+    return True
+
+
+def generate_fv(
+    s_output_file_name, ls_ffs, s_gen_fv, tools_dir=None, use_edk2_tools=False
+):
+    bReturn = False
+
+    if use_edk2_tools:
+        if not run_gen_fv(s_output_file_name, [f.name for f in ls_ffs], tools_dir):
+            return False
+    else:
+        ls_sources = [
+            f if isinstance(f, ffs_builder.StreamedFfsFile) else f.read()
+            for f in ls_ffs
+        ]
+        try:
+            fv_builder.create_fv_file(s_output_file_name, ls_sources)
+        except (fv_builder.FvLayoutError, OSError, ValueError) as e:
+            print(f"ERROR: {e}")
+            return False
 
     if not os.path.exists(s_output_file_name):
         bReturn = False
@@ -270,6 +336,55 @@ def generate_fv(s_output_file_name, ls_ffs, s_gen_fv, tools_dir=None):
     return bReturn
 
 
+def compare_with_edk2(s_output_file_name, ls_ffs, tools_dir=None):
+    """Rebuild *ls_ffs* and the FV with GenFfs/GenFv and byte-compare them.
+
+    Used to check the native encoders against edk2; the FFS files are
+    regenerated from the same inputs and GUIDs.
+    """
+    b_match = True
+    for ffs in ls_ffs:
+        # Read the native image first: it may live in ffs.name, which GenFfs
+        # overwrites.
+        native_ffs = ffs.read()
+        run_gen_ffs(ffs.name, ffs.guid, ffs.input_file, tools_dir)
+        if not os.path.exists(ffs.name):
+            print(f"ERROR: GenFfs did not create {ffs.name}.")
+            return False
+        with open(ffs.name, "rb") as f:
+            if f.read() != native_ffs:
+                print(f"ERROR: {ffs.name} differs from GenFfs output.")
+                b_match = False
+
+    s_edk2_fv = s_output_file_name + ".edk2"
+    if not run_gen_fv(s_edk2_fv, [f.name for f in ls_ffs], tools_dir):
+        return False
+    if not os.path.exists(s_edk2_fv):
+        print(f"ERROR: GenFv did not create {s_edk2_fv}.")
+        return False
+
+    with open(s_output_file_name, "rb") as f:
+        native_fv = f.read()
+    with open(s_edk2_fv, "rb") as f:
+        edk2_fv = f.read()
+    os.remove(s_edk2_fv)
+
+    if native_fv != edk2_fv:
+        offset = next(
+            (i for i, (a, b) in enumerate(zip(native_fv, edk2_fv)) if a != b),
+            min(len(native_fv), len(edk2_fv)),
+        )
+        print(
+            f"ERROR: {s_output_file_name} differs from GenFv output at offset {offset:#x} "
+            f"(native {len(native_fv):#x} bytes, GenFv {len(edk2_fv):#x} bytes)."
+        )
+        b_match = False
+
+    if b_match:
+        print("INFO: FFS files and FV match GenFfs/GenFv output.")
+    return b_match
+
+
 def validate_sys_fw_ver_binary_file(fw_ver_binary_data):
     b_return = True
     s_revision = ["", ""]
@@ -300,7 +415,7 @@ def validate_sys_fw_ver_binary_file(fw_ver_binary_data):
         temp_version_data_crc32 = fw_ver_binary_data.VersionDataCrc32
         fw_ver_binary_data.VersionDataCrc32 = 0
 
-        if temp_version_data_crc32 != CalcCRC32_i(
+        if temp_version_data_crc32 != checksum.crc32(
             fw_ver_binary_data.to_bytes(), fw_ver_binary_data.VersionDataSize
         ):
             print("Unexpected VersionDataSize value found")
@@ -316,10 +431,6 @@ def validate_sys_fw_ver_binary_file(fw_ver_binary_data):
     return b_return
 
 
-def calc_crc32(data, size):
-    return binascii.crc32(data[:size]) & 0xFFFFFFFF
-
-
 def get_versions_from_sys_fw_ver_binary_file(s_fw_ver_binary_file, fw_ver_binary_data):
     try:
         with open(s_fw_ver_binary_file, "rb") as fs:
@@ -514,27 +625,33 @@ def process_sys_fw_ffs_creation(
     ls_paths,
     g_dynamic_var,
     tools_dir=None,
+    use_edk2_tools=False,
+    jobs=None,
+    cache=None,
+    stream=False,
 ):
     try:
         #
-        # Firmware version validation
+        # Firmware version validation. s_fw_ver_binary_file may be None when
+        # the caller already holds the parsed version data in memory.
         #
-        if not os.path.exists(s_fw_ver_binary_file):
-            print(
-                "ERROR: Invalid SYSFW_VERSION.BIN file, please check the input file provided.\n"
-            )
-            return False
-        elif print_logs >= 2:
-            print("%s file found" % (s_fw_ver_binary_file))
+        if s_fw_ver_binary_file is not None:
+            if not os.path.exists(s_fw_ver_binary_file):
+                print(
+                    "ERROR: Invalid SYSFW_VERSION.BIN file, please check the input file provided.\n"
+                )
+                return False
+            elif print_logs >= 2:
+                print("%s file found" % (s_fw_ver_binary_file))
 
-        fw_ver_binary_data = get_versions_from_sys_fw_ver_binary_file(
-            s_fw_ver_binary_file, fw_ver_binary_data
-        )
-        if not fw_ver_binary_data:
-            print("ERROR: Error parsing SYSFW_VERSION.BIN file.")
-            return False
-        elif print_logs >= 2:
-            print("%s parsed successfully" % (s_fw_ver_binary_file))
+            fw_ver_binary_data = get_versions_from_sys_fw_ver_binary_file(
+                s_fw_ver_binary_file, fw_ver_binary_data
+            )
+            if not fw_ver_binary_data:
+                print("ERROR: Error parsing SYSFW_VERSION.BIN file.")
+                return False
+            elif print_logs >= 2:
+                print("%s parsed successfully" % (s_fw_ver_binary_file))
 
         if not validate_sys_fw_ver_binary_file(fw_ver_binary_data):
             print("ERROR: Wrong SYSFW_VERSION.BIN file is supplied")
@@ -543,24 +660,46 @@ def process_sys_fw_ffs_creation(
             print("%s data validated successfully" % (s_fw_ver_binary_file))
 
         #
-        # Parse input XML
+        # With a cache, an XML validated before is restored from its entry
+        # snapshot instead of being parsed and validated again
         #
-        if not xp.parse_input_xml(
-            s_xml_file_name, s_breaking_change_number, g_dynamic_var
-        ):
-            print("ERROR: Error parsing XML file.")
-            return False
-        elif print_logs >= 2:
-            print("XML file parsed with xp.parse_input_xml")
+        snapshots = None
+        snapshot_path = None
+        if cache is not None:
+            snapshots = entry_snapshot.SnapshotCache(cache.cache_dir)
+            snapshot_path = snapshots.snapshot_path(
+                s_xml_file_name, g_dynamic_var.isGlymurMode, TOOL_VERSION_STRING
+            )
 
-        #
-        # Validate raw fw entries
-        #
-        if not XFEV.fw_entry_list_validation_main(g_dynamic_var):
-            print("ERROR: Error validating XML file.")
-            return False
-        elif print_logs >= 2:
-            print("XML file validated with XFEV.fw_entry_list_validation_main")
+        if snapshots is not None and snapshots.load(snapshot_path, g_dynamic_var):
+            print("INFO: Validated FwEntries restored from %s" % (snapshot_path))
+        else:
+            #
+            # Parse input XML
+            #
+            if not xp.parse_input_xml(
+                s_xml_file_name, s_breaking_change_number, g_dynamic_var
+            ):
+                print("ERROR: Error parsing XML file.")
+                return False
+            elif print_logs >= 2:
+                print("XML file parsed with xp.parse_input_xml")
+
+            #
+            # Validate raw fw entries
+            #
+            if not XFEV.fw_entry_list_validation_main(g_dynamic_var, collect_all=True):
+                print("ERROR: Error validating XML file.")
+                return False
+            elif print_logs >= 2:
+                print("XML file validated with XFEV.fw_entry_list_validation_main")
+
+            #
+            # Snapshot the entries now: generate_sys_fw_meta_data_file
+            # rewrites them in place
+            #
+            if snapshots is not None:
+                snapshots.store(snapshot_path, g_dynamic_var)
 
         #
         # Create metadata
@@ -577,7 +716,15 @@ def process_sys_fw_ffs_creation(
         # Generate FFS file of each input binary
         #
         if not generate_sys_fw_ffs_list(
-            ls_ffs, s_gen_ffs, ls_paths, g_dynamic_var, tools_dir
+            ls_ffs,
+            s_gen_ffs,
+            ls_paths,
+            g_dynamic_var,
+            tools_dir,
+            use_edk2_tools,
+            jobs,
+            cache,
+            stream,
         ):
             print("ERROR: Error Generating FFS files.")
             return False
@@ -590,11 +737,47 @@ def process_sys_fw_ffs_creation(
     return True
 
 
+def validate_sys_fw_xml(s_xml_file_name, g_dynamic_var):
+    """Parse and validate *s_xml_file_name* only (`fv-create --validate-only`).
+
+    Every FwEntry is checked and all problems are listed at once; no
+    metadata, FFS or FV file is written.
+    """
+    if not xp.parse_input_xml(s_xml_file_name, "0", g_dynamic_var):
+        print("ERROR: Error parsing XML file.")
+        return False
+
+    if not XFEV.fw_entry_list_validation_main(g_dynamic_var, collect_all=True):
+        print("ERROR: Error validating XML file.")
+        return False
+
+    print(
+        f"{s_xml_file_name} is valid: "
+        f"{len(g_dynamic_var.QpayloadFwEntryList)} of "
+        f"{len(g_dynamic_var.XmlRawFwEntryList)} FwEntries are updated."
+    )
+    return True
+
+
 def generate_sys_fw_ffs_list(
-    ls_ffs, s_gen_ffs, ls_paths, g_dynamic_var, tools_dir=None
+    ls_ffs,
+    s_gen_ffs,
+    ls_paths,
+    g_dynamic_var,
+    tools_dir=None,
+    use_edk2_tools=False,
+    jobs=None,
+    cache=None,
+    stream=False,
 ):
 
     try:
+        #
+        # Resolve every input and FFS name first, in XML order, so naming
+        # does not depend on which file finishes first.
+        #
+        ls_tasks = []
+        ls_ffs_names = [f.name for f in ls_ffs]
         for raw_fwentry in g_dynamic_var.XmlRawFwEntryList:
             if (
                 raw_fwentry.Operation.lower()
@@ -616,7 +799,7 @@ def generate_sys_fw_ffs_list(
             #
             # Handle FFS file naming to avoid overwriting
             #
-            if s_file_name + ".ffs" in ls_ffs:
+            if s_file_name + ".ffs" in ls_ffs_names:
                 temp_str = (
                     raw_fwentry.UpdatePath.PartitionName.lower()
                     .replace(s_file_name.lower(), "")
@@ -626,34 +809,55 @@ def generate_sys_fw_ffs_list(
 
             print(f"INFO: Creating ffs file for {raw_fwentry.InputBinary}.")
 
-            if tools_dir is None:
-                tools_dir = _resolve_tools_dir("GenFfs")
             raw_fwentry_FileGuid_uuid_bytes_obj = bytes(raw_fwentry.FileGuid)
             raw_fwentry_FileGuid_uuid_str = str(
                 uuid.UUID(bytes=raw_fwentry_FileGuid_uuid_bytes_obj)
             )
-            s_command = f"{_tool_path(tools_dir, 'GenFfs')} -o {s_file_name}.ffs -t EFI_FV_FILETYPE_RAW -g {raw_fwentry_FileGuid_uuid_str} -s -v -i {os.path.join(s_dir_path, raw_fwentry.InputBinary)}"
-            execute_command_linux(s_command)
-
-            ls_ffs.append(s_file_name + ".ffs")
+            ls_tasks.append(
+                (
+                    f"{s_file_name}.ffs",
+                    raw_fwentry_FileGuid_uuid_str,
+                    os.path.join(s_dir_path, raw_fwentry.InputBinary),
+                )
+            )
+            ls_ffs_names.append(f"{s_file_name}.ffs")
 
         s_file_name = SYS_FW_METADATA_FILE[: SYS_FW_METADATA_FILE.rfind(".")]
         s_guid = FVC_h.GlobalStaticVariable.FILE_GUID_METADATA_GUID.strip("{}")
 
+        ls_new_ffs = generate_ffs_files(
+            ls_tasks, tools_dir, use_edk2_tools, jobs, cache, stream
+        )
+        if cache is not None:
+            # Evict in every mode: the entry snapshots share the budget.
+            if use_edk2_tools:
+                cache.record(ls_new_ffs)
+            cache.evict()
+            cache.print_stats(use_edk2_tools)
+        ls_ffs.extend(ls_new_ffs)
+
+        # Metadata.dat carries freshly generated FileGuids, so it is never
+        # worth caching.
         print(f"INFO: Creating ffs file for {SYS_FW_METADATA_FILE}.")
-        if tools_dir is None:
-            tools_dir = _resolve_tools_dir("GenFfs")
-        s_command = f"{_tool_path(tools_dir, 'GenFfs')} -o {s_file_name}.ffs -t EFI_FV_FILETYPE_RAW -g {s_guid} -s -v -i {SYS_FW_METADATA_FILE}"
-        execute_command_linux(s_command)
-
-        ls_ffs.append(s_file_name + ".ffs")
+        ls_ffs.append(
+            generate_ffs_file(
+                f"{s_file_name}.ffs",
+                s_guid,
+                SYS_FW_METADATA_FILE,
+                tools_dir,
+                use_edk2_tools,
+                stream=stream,
+            )
+        )
 
         #
         # Check if all ffs files are present and can be located
         #
-        for s_file in ls_ffs:
-            if not os.path.exists(s_file):
-                print(f"ERROR: Failure locating {s_file} file to create FV.")
+        for ffs in ls_ffs:
+            if isinstance(ffs, ffs_builder.StreamedFfsFile):
+                continue
+            if ffs.data is None and not os.path.exists(ffs.name):
+                print(f"ERROR: Failure locating {ffs.name} file to create FV.")
                 return False
 
     except Exception:
@@ -662,26 +866,39 @@ def generate_sys_fw_ffs_list(
     return True
 
 
-def generate_ffs_for_ec_fw(ls_ffs, s_gen_ffs, s_ec_fw_file_name, tools_dir=None):
+def generate_ffs_for_ec_fw(
+    ls_ffs,
+    s_gen_ffs,
+    s_ec_fw_file_name,
+    tools_dir=None,
+    use_edk2_tools=False,
+    stream=False,
+):
     s_file_name = "EC_FW"
     s_guid = FVC_h.GlobalStaticVariable.EC_FW_FFS_FILE_GUID.strip("{}")
 
     try:
         print(f"INFO: Creating FFS file for {s_ec_fw_file_name}.")
 
-        if tools_dir is None:
-            tools_dir = _resolve_tools_dir("GenFfs")
-        s_command = f"{_tool_path(tools_dir, 'GenFfs')} -o {s_file_name}.ffs -t EFI_FV_FILETYPE_RAW -g {s_guid} -s -v -i {s_ec_fw_file_name}"
-        execute_command_linux(s_command)
-
-        ls_ffs.append(s_file_name + ".ffs")
+        ls_ffs.append(
+            generate_ffs_file(
+                f"{s_file_name}.ffs",
+                s_guid,
+                s_ec_fw_file_name,
+                tools_dir,
+                use_edk2_tools,
+                stream=stream,
+            )
+        )
 
         #
         # Check if all ffs files are present and can be located
         #
-        for s_file in ls_ffs:
-            if not os.path.exists(s_file):
-                print(f"ERROR: Failure locating {s_file} file to create FV.")
+        for ffs in ls_ffs:
+            if isinstance(ffs, ffs_builder.StreamedFfsFile):
+                continue
+            if ffs.data is None and not os.path.exists(ffs.name):
+                print(f"ERROR: Failure locating {ffs.name} file to create FV.")
                 return False
 
     except Exception:
@@ -690,9 +907,18 @@ def generate_ffs_for_ec_fw(ls_ffs, s_gen_ffs, s_ec_fw_file_name, tools_dir=None)
     return True
 
 
-def process_ec_fw_ffs_creation(s_ec_fw_file_name, s_gen_ffs, ls_ffs, tools_dir=None):
+def process_ec_fw_ffs_creation(
+    s_ec_fw_file_name,
+    s_gen_ffs,
+    ls_ffs,
+    tools_dir=None,
+    use_edk2_tools=False,
+    stream=False,
+):
     try:
-        if not generate_ffs_for_ec_fw(ls_ffs, s_gen_ffs, s_ec_fw_file_name, tools_dir):
+        if not generate_ffs_for_ec_fw(
+            ls_ffs, s_gen_ffs, s_ec_fw_file_name, tools_dir, use_edk2_tools, stream
+        ):
             print("Generating FFS file for EC FW failed.\n")
             return False
     except Exception:
@@ -701,6 +927,97 @@ def process_ec_fw_ffs_creation(s_ec_fw_file_name, s_gen_ffs, ls_ffs, tools_dir=N
     return True
 
 
+def finish_fv(
+    s_output_file_name,
+    ls_ffs,
+    s_gen_fv,
+    tools_dir=None,
+    use_edk2_tools=False,
+    compare_edk2=False,
+):
+    """Assemble *ls_ffs* into *s_output_file_name* and remove intermediates."""
+    if not generate_fv(s_output_file_name, ls_ffs, s_gen_fv, tools_dir, use_edk2_tools):
+        print("GenerateFV failed.\n")
+        return False
+    else:
+        print("FV created successfully")
+
+    b_return = True
+    if compare_edk2 and not use_edk2_tools:
+        b_return = compare_with_edk2(s_output_file_name, ls_ffs, tools_dir)
+
+    for file in os.listdir("."):
+        if file.endswith((".ffs", ".inf", ".fv.txt", ".fv.map", ".dat")):
+            os.remove(file)
+
+    return b_return
+
+
+def create_sys_fw_fv(
+    s_output_file_name,
+    s_xml_file_name,
+    ls_paths,
+    fw_ver_binary_data=None,
+    s_fw_ver_binary_file=None,
+    tools_dir=None,
+    glymur_mode=False,
+    use_edk2_tools=False,
+    jobs=None,
+    cache_dir=None,
+    cache_size=None,
+    stream=False,
+):
+    """Library entry point for a SYS_FW firmware volume.
+
+    Equivalent to `fv-create <out> -FvType SYS_FW <xml> <ver.bin> <paths...>`
+    but callable in-process. *s_xml_file_name* may be a path or a binary
+    file object, and the version data may be passed either as an already
+    parsed QSYS_FW_VERSION_DATA (*fw_ver_binary_data*) or as a file path
+    (*s_fw_ver_binary_file*). The FFS files and the FV are built natively
+    unless *use_edk2_tools* is set; *jobs* bounds how many FFS files are
+    built in parallel (default: one per CPU). *cache_dir* enables the
+    on-disk FFS cache and entry snapshots (see ffs_cache and
+    entry_snapshot), bounded together to *cache_size* MiB.
+    *stream* encodes each input straight into the FV in fixed size chunks
+    (see ffs_builder.StreamedFfsFile) so memory use does not grow with
+    the image sizes; *jobs* and the cache do not apply then.
+    """
+    g_dynamic_var = FVC_h.BuildContext(glymur_mode)
+    ls_ffs = []
+    cache = None
+    if cache_dir is not None:
+        cache = ffs_cache.FfsCache(cache_dir)
+        if cache_size is not None:
+            cache.max_bytes = cache_size * 1024 * 1024
+
+    if fw_ver_binary_data is None:
+        fw_ver_binary_data = FVC_h.QSYS_FW_VERSION_DATA()
+        if s_fw_ver_binary_file is None:
+            print("ERROR: No SYSFW_VERSION data supplied.")
+            return False
+
+    r = process_sys_fw_ffs_creation(
+        s_xml_file_name=s_xml_file_name,
+        s_fw_ver_binary_file=s_fw_ver_binary_file,
+        s_gen_ffs="GenFfs.exe",
+        s_breaking_change_number="0",
+        fw_ver_binary_data=fw_ver_binary_data,
+        ls_ffs=ls_ffs,
+        ls_paths=list(ls_paths),
+        g_dynamic_var=g_dynamic_var,
+        tools_dir=tools_dir,
+        use_edk2_tools=use_edk2_tools,
+        jobs=jobs,
+        cache=cache,
+        stream=stream,
+    )
+    if not r:
+        print("process_sys_fw_ffs_creation failed")
+        return False
+
+    return finish_fv(s_output_file_name, ls_ffs, "GenFv.exe", tools_dir, use_edk2_tools)
+
+
 def print_help():
     print("<======== FvCreator.py Usage ======>\n")
     print(
@@ -709,6 +1026,9 @@ def print_help():
     print(
         "[For EC Device Firmware FV Creation]    FVCreator.py <output FV file> -FvType EC_FW <EC Firmware Binary path>"
     )
+    print(
+        "[To validate the XML only]               FVCreator.py --validate-only <input xml file with binary & guid combinations>"
+    )
     return
 
 
@@ -755,11 +1075,17 @@ def The_Main(args):
     s_breaking_change_number = "0"
     ls_ffs = []
     ls_paths = []
-    g_dynamic_var = FVC_h.GlobalDynamicVariable()
+    g_dynamic_var = FVC_h.BuildContext()
     fw_ver_binary_data = FVC_h.QSYS_FW_VERSION_DATA()
     s_gen_ffs = "GenFfs.exe"
     s_gen_fv = "GenFv.exe"
     tools_dir = None
+    use_edk2_tools = False
+    compare_edk2 = False
+    validate_only = False
+    jobs = None
+    cache = None
+    stream = False
 
     # Extract --edk2-path if provided; derive tools_dir from it
     args = list(args)
@@ -777,12 +1103,81 @@ def The_Main(args):
             del args[i]
             break
 
+    # Extract --use-edk2-tools if provided; runs GenFfs/GenFv instead of the native encoders
+    for i, arg in enumerate(args):
+        if arg == "--use-edk2-tools":
+            use_edk2_tools = True
+            del args[i]
+            break
+
+    # Extract --jobs N if provided; number of FFS files built in parallel
+    for i, arg in enumerate(args):
+        if arg == "--jobs" and i + 1 < len(args):
+            if not args[i + 1].isdigit() or int(args[i + 1]) < 1:
+                print(f"ERROR: Invalid --jobs value {args[i + 1]}")
+                return False
+            jobs = int(args[i + 1])
+            del args[i : i + 2]
+            break
+
+    # Extract --cache-dir DIR if provided; reuses FFS files for unchanged inputs
+    for i, arg in enumerate(args):
+        if arg == "--cache-dir" and i + 1 < len(args):
+            cache = ffs_cache.FfsCache(args[i + 1])
+            del args[i : i + 2]
+            break
+
+    # Extract --cache-size MiB if provided; upper bound for the FFS cache
+    for i, arg in enumerate(args):
+        if arg == "--cache-size" and i + 1 < len(args):
+            if not args[i + 1].isdigit():
+                print(f"ERROR: Invalid --cache-size value {args[i + 1]}")
+                return False
+            if cache is not None:
+                cache.max_bytes = int(args[i + 1]) * 1024 * 1024
+            del args[i : i + 2]
+            break
+
+    # Extract --stream if provided; encodes each input straight into the FV
+    for i, arg in enumerate(args):
+        if arg == "--stream":
+            stream = True
+            del args[i]
+            break
+
+    # Extract --compare-edk2 if provided; checks the native output against GenFfs/GenFv
+    for i, arg in enumerate(args):
+        if arg == "--compare-edk2":
+            compare_edk2 = True
+            del args[i]
+            break
+
+    # Extract --validate-only if provided; checks the XML without building anything
+    for i, arg in enumerate(args):
+        if arg == "--validate-only":
+            validate_only = True
+            del args[i]
+            break
+
     # fv_type = FV_TYPE.UNKNOWN
 
     # Skipping the re-creation of all executables
     if len(args) == 1 and args[0].lower() == "-v":
         print("Version: %s" % (TOOL_VERSION_STRING))
-        return
+        return True
+
+    if validate_only:
+        # Either just the XML, or the full SYS_FW command line.
+        if len(args) == 1:
+            return validate_sys_fw_xml(args[0], g_dynamic_var)
+        if len(args) > 3 and args[1].lower() == "-FvType".lower():
+            if args[2].lower() == "SYS_FW".lower():
+                return validate_sys_fw_xml(args[3], g_dynamic_var)
+            print("ERROR: --validate-only only applies to -FvType SYS_FW")
+            return False
+        print("Invalid arguments")
+        print_help()
+        return False
 
     s_output_file_name = args[0]
 
@@ -825,6 +1220,10 @@ def The_Main(args):
             ls_paths=ls_paths,
             g_dynamic_var=g_dynamic_var,
             tools_dir=tools_dir,
+            use_edk2_tools=use_edk2_tools,
+            jobs=jobs,
+            cache=cache,
+            stream=stream,
         )
         if not r:
             print("process_sys_fw_ffs_creation failed")
@@ -837,23 +1236,25 @@ def The_Main(args):
             s_gen_ffs=s_gen_ffs,
             ls_ffs=ls_ffs,
             tools_dir=tools_dir,
+            use_edk2_tools=use_edk2_tools,
+            stream=stream,
         )
         if not r:
             print("process_ec_fw_ffs_creation failed")
 
-    if not generate_fv(s_output_file_name, ls_ffs, s_gen_fv, tools_dir):
-        print("GenerateFV failed.\n")
-        return
-    else:
-        print("FV created successfully")
-
-    for file in os.listdir("."):
-        if file.endswith((".ffs", ".inf", ".fv.txt", ".fv.map", ".dat")):
-            os.remove(file)
+    return finish_fv(
+        s_output_file_name,
+        ls_ffs,
+        s_gen_fv,
+        tools_dir,
+        use_edk2_tools,
+        compare_edk2,
+    )
 
 
 def main():
-    The_Main(args=sys.argv[1:])
+    if not The_Main(args=sys.argv[1:]):
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -8,6 +8,8 @@ import ctypes
 import uuid
 from collections import deque
 from enum import IntEnum
+from types import MappingProxyType
+from typing import Optional
 
 
 class FWENTRY_OPERATION_TYPE(IntEnum):
@@ -308,7 +310,7 @@ class XML_RAW_FWENTRY(ctypes.Structure):
     # layout (they are only ever mapped into QPAYLOAD_METADATA_FWENTRY's
     # ctypes-typed fields), so they are kept as plain, un-marshaled defaults.
     BinaryType = None
-    ARValidation = None
+    ARValidation: Optional[XML_RAW_FWENTRY_ARVALIDATION] = None
 
 
 class QPAYLOAD_METADATA_HEADER(ctypes.Structure):
@@ -349,166 +351,214 @@ class FV_TYPE(IntEnum):
     EC_FW = 2
 
 
-class GlobalDynamicVariable:
-    dFileGuidByDestFatFilePath = {
-        "\\ACPI\\CSRT.ACP": GlobalStaticVariable.FILE_GUID_CSRT_ACPI,
-        "\\ACPI\\TPM2.ACP": GlobalStaticVariable.FILE_GUID_TPM2_ACPI,
-        "\\ACPI\\BGRT.ACP": GlobalStaticVariable.FILE_GUID_BGRT_ACPI,
-        "\\LOGO1.BMP": GlobalStaticVariable.FILE_GUID_logo1_ACPI,
-        "\\ACPI\\DBG2.ACP": GlobalStaticVariable.FILE_GUID_DBG2_ACPI,
-        "\\ACPI\\DBGP.ACP": GlobalStaticVariable.FILE_GUID_DBG2_ACPI,
-        "\\ACPI\\DSDT.AML": GlobalStaticVariable.FILE_GUID_DSDT_AML,
-        "\\ACPI\\FACP.ACP": GlobalStaticVariable.FILE_GUID_FACP_ACPI,
-        "\\ACPI\\FACS.ACP": GlobalStaticVariable.FILE_GUID_FACS_ACPI,
-        "\\ACPI\\FPDT.ACP": GlobalStaticVariable.FILE_GUID_FPDT_ACPI,
-        "\\ACPI\\MADT.ACP": GlobalStaticVariable.FILE_GUID_MADT_ACPI,
-    }
-
-    dFileGuidByDestDppItemFile = {
-        "OPM_PUB.PROVISION": GlobalStaticVariable.FILE_GUID_OPM_PUB_PROVISION,
-        "OPM_PRIV.PROVISION": GlobalStaticVariable.FILE_GUID_OPM_PRIV_PROVISION,
-    }
-
-    dDiskTypeByString = {
-        "EMMC_PARTITION_USER_DATA": FWENTRY_DISK_TYPE.USER_DATA,
-        "EMMC_PARTITION_BOOT1": FWENTRY_DISK_TYPE.BOOT1,
-        "EMMC_PARTITION_BOOT2": FWENTRY_DISK_TYPE.BOOT2,
-        "EMMC_PARTITION_RPMB": FWENTRY_DISK_TYPE.RPMB,
-        "EMMC_PARTITION_GPP1": FWENTRY_DISK_TYPE.GPP1,
-        "EMMC_PARTITION_GPP2": FWENTRY_DISK_TYPE.GPP2,
-        "EMMC_PARTITION_GPP3": FWENTRY_DISK_TYPE.GPP3,
-        "EMMC_PARTITION_GPP4": FWENTRY_DISK_TYPE.GPP4,
-        "UFS_LUN0": FWENTRY_DISK_TYPE.LUN0,
-        "UFS_LUN1": FWENTRY_DISK_TYPE.LUN1,
-        "UFS_LUN2": FWENTRY_DISK_TYPE.LUN2,
-        "UFS_LUN3": FWENTRY_DISK_TYPE.LUN3,
-        "UFS_LUN4": FWENTRY_DISK_TYPE.LUN4,
-        "UFS_LUN5": FWENTRY_DISK_TYPE.LUN5,
-        "UFS_LUN6": FWENTRY_DISK_TYPE.LUN6,
-        "UFS_LUN7": FWENTRY_DISK_TYPE.LUN7,
-        "SPINOR": FWENTRY_DISK_TYPE.SPINOR,
-        "NVME": FWENTRY_DISK_TYPE.NVME,
-    }
-
-    dDiskTypeByValue = {
-        FWENTRY_DISK_TYPE.USER_DATA: "EMMC_PARTITION_USER_DATA",
-        FWENTRY_DISK_TYPE.BOOT1: "EMMC_PARTITION_BOOT1",
-        FWENTRY_DISK_TYPE.BOOT2: "EMMC_PARTITION_BOOT2",
-        FWENTRY_DISK_TYPE.RPMB: "EMMC_PARTITION_RPMB",
-        FWENTRY_DISK_TYPE.GPP1: "EMMC_PARTITION_GPP1",
-        FWENTRY_DISK_TYPE.GPP2: "EMMC_PARTITION_GPP2",
-        FWENTRY_DISK_TYPE.GPP3: "EMMC_PARTITION_GPP3",
-        FWENTRY_DISK_TYPE.GPP4: "EMMC_PARTITION_GPP4",
-        FWENTRY_DISK_TYPE.LUN0: "UFS_LUN0",
-        FWENTRY_DISK_TYPE.LUN1: "UFS_LUN1",
-        FWENTRY_DISK_TYPE.LUN2: "UFS_LUN2",
-        FWENTRY_DISK_TYPE.LUN3: "UFS_LUN3",
-        FWENTRY_DISK_TYPE.LUN4: "UFS_LUN4",
-        FWENTRY_DISK_TYPE.LUN5: "UFS_LUN5",
-        FWENTRY_DISK_TYPE.LUN6: "UFS_LUN6",
-        FWENTRY_DISK_TYPE.LUN7: "UFS_LUN7",
-        FWENTRY_DISK_TYPE.SPINOR: "SPINOR",
-        FWENTRY_DISK_TYPE.NVME: "NVME",
-    }
-
-    dFlashTypeByString = {
-        "EMMC": FlashType.EMMC,
-        "UFS": FlashType.UFS,
-        "NORNVME": FlashType.NORNVME,
-        "NORUFS": FlashType.NORUFS,
-    }
-
-    dFlashTypeByValue = {
-        FlashType.EMMC: "EMMC",
-        FlashType.UFS: "UFS",
-        FlashType.NORNVME: "NORNVME",
-        FlashType.NORUFS: "NORUFS",
-    }
-
-    dFlashTypeByDiskType = {
-        FWENTRY_DISK_TYPE.USER_DATA: [FlashType.EMMC],
-        FWENTRY_DISK_TYPE.BOOT1: [FlashType.EMMC],
-        FWENTRY_DISK_TYPE.BOOT2: [FlashType.EMMC],
-        FWENTRY_DISK_TYPE.RPMB: [FlashType.EMMC],
-        FWENTRY_DISK_TYPE.GPP1: [FlashType.EMMC],
-        FWENTRY_DISK_TYPE.GPP2: [FlashType.EMMC],
-        FWENTRY_DISK_TYPE.GPP3: [FlashType.EMMC],
-        FWENTRY_DISK_TYPE.GPP4: [FlashType.EMMC],
-        FWENTRY_DISK_TYPE.LUN0: [FlashType.UFS, FlashType.NORUFS],
-        FWENTRY_DISK_TYPE.LUN1: [FlashType.UFS],
-        FWENTRY_DISK_TYPE.LUN2: [FlashType.UFS],
-        FWENTRY_DISK_TYPE.LUN3: [FlashType.UFS],
-        FWENTRY_DISK_TYPE.LUN4: [FlashType.UFS],
-        FWENTRY_DISK_TYPE.LUN5: [FlashType.UFS],
-        FWENTRY_DISK_TYPE.LUN6: [FlashType.UFS],
-        FWENTRY_DISK_TYPE.LUN7: [FlashType.UFS],
-        FWENTRY_DISK_TYPE.SPINOR: [FlashType.NORNVME, FlashType.NORUFS],
-        FWENTRY_DISK_TYPE.NVME: [FlashType.NORNVME],
-    }
-
-    dOperationTypeByString = {
-        "IGNORE": FWENTRY_OPERATION_TYPE.IGNORE,
-        "UPDATE": FWENTRY_OPERATION_TYPE.UPDATE,
-    }
-
-    dOperationTypeByValue = {
-        FWENTRY_OPERATION_TYPE.IGNORE: "IGNORE",
-        FWENTRY_OPERATION_TYPE.UPDATE: "UPDATE",
-    }
-
-    dOperationPathTypeByString = {
-        "SOURCE": FWENTRY_OPERATION_PATH_TYPE.SOURCE,
-        "DEST": FWENTRY_OPERATION_PATH_TYPE.DEST,
-        "BACKUP": FWENTRY_OPERATION_PATH_TYPE.BACKUP,
-    }
-
-    dOperationPathTypeByValue = {
-        FWENTRY_OPERATION_PATH_TYPE.SOURCE: "SOURCE",
-        FWENTRY_OPERATION_PATH_TYPE.DEST: "DEST",
-        FWENTRY_OPERATION_PATH_TYPE.BACKUP: "BACKUP",
-    }
-
-    dUpdateTypeByString = {
-        "UPDATE_PARTITION": FWENTRY_UPDATE_TYPE.PARTITION,
-        "UPDATE_FAT_FILE": FWENTRY_UPDATE_TYPE.FAT_FILE,
-        "UPDATE_DPP_QCOM": FWENTRY_UPDATE_TYPE.DPP_QCOM,
-        "UPDATE_DPP_OEM": FWENTRY_UPDATE_TYPE.DPP_OEM,
-        "UPDATE_OPM_PRIV_KEY": FWENTRY_UPDATE_TYPE.OPM_PRIV_KEY,
-        "UPDATE_FWCLASS_GUID": FWENTRY_UPDATE_TYPE.FWCLASS_GUID,
-    }
-
-    dUpdateTypeByValue = {
-        FWENTRY_UPDATE_TYPE.PARTITION: "UPDATE_PARTITION",
-        FWENTRY_UPDATE_TYPE.FAT_FILE: "UPDATE_FAT_FILE",
-        FWENTRY_UPDATE_TYPE.DPP_QCOM: "UPDATE_DPP_QCOM",
-        FWENTRY_UPDATE_TYPE.DPP_OEM: "UPDATE_DPP_OEM",
-        FWENTRY_UPDATE_TYPE.OPM_PRIV_KEY: "UPDATE_OPM_PRIV_KEY",
-        FWENTRY_UPDATE_TYPE.FWCLASS_GUID: "UPDATE_FWCLASS_GUID",
-    }
-
-    dBackupTypeByString = {
-        "BACKUP_PARTITION": FWENTRY_BACKUP_TYPE.PARTITION,
-        "BACKUP_FAT_FILE": FWENTRY_BACKUP_TYPE.FAT_FILE,
-    }
-
-    dBackupTypeByValue = {
-        FWENTRY_BACKUP_TYPE.PARTITION: "BACKUP_PARTITION",
-        FWENTRY_BACKUP_TYPE.FAT_FILE: "BACKUP_FAT_FILE",
-    }
-
-    dBinaryTypeByString = {
-        "RAW": FWENTRY_BINARY_TYPE.RAW,
-        "FATFS": FWENTRY_BINARY_TYPE.FATFS,
-    }
-
-    dBinaryTypeByValue = {
-        FWENTRY_BINARY_TYPE.RAW: "RAW",
-        FWENTRY_BINARY_TYPE.FATFS: "FATFS",
-    }
-
-    XmlRawFwEntryList: deque = deque()
-    QpayloadFwEntryList: deque = deque()
-    DeviceFlashType = None
-    isMatchIdentifierInXML = False
-    isBinaryTypeInXML = False
-    isGlymurMode = False
+class BuildContext:
+    """State of one FV build.
+
+    Create one per build and pass it to XmlParser.parse_input_xml,
+    XmlFwEntryValidation and the FVCreation steps, so builds in the same
+    process (one after another or on threads) never see each other's
+    entries. The d*By* lookup tables are shared by every context and
+    read-only.
+    """
+
+    dFileGuidByDestFatFilePath = MappingProxyType(
+        {
+            "\\ACPI\\CSRT.ACP": GlobalStaticVariable.FILE_GUID_CSRT_ACPI,
+            "\\ACPI\\TPM2.ACP": GlobalStaticVariable.FILE_GUID_TPM2_ACPI,
+            "\\ACPI\\BGRT.ACP": GlobalStaticVariable.FILE_GUID_BGRT_ACPI,
+            "\\LOGO1.BMP": GlobalStaticVariable.FILE_GUID_logo1_ACPI,
+            "\\ACPI\\DBG2.ACP": GlobalStaticVariable.FILE_GUID_DBG2_ACPI,
+            "\\ACPI\\DBGP.ACP": GlobalStaticVariable.FILE_GUID_DBG2_ACPI,
+            "\\ACPI\\DSDT.AML": GlobalStaticVariable.FILE_GUID_DSDT_AML,
+            "\\ACPI\\FACP.ACP": GlobalStaticVariable.FILE_GUID_FACP_ACPI,
+            "\\ACPI\\FACS.ACP": GlobalStaticVariable.FILE_GUID_FACS_ACPI,
+            "\\ACPI\\FPDT.ACP": GlobalStaticVariable.FILE_GUID_FPDT_ACPI,
+            "\\ACPI\\MADT.ACP": GlobalStaticVariable.FILE_GUID_MADT_ACPI,
+        }
+    )
+
+    dFileGuidByDestDppItemFile = MappingProxyType(
+        {
+            "OPM_PUB.PROVISION": GlobalStaticVariable.FILE_GUID_OPM_PUB_PROVISION,
+            "OPM_PRIV.PROVISION": GlobalStaticVariable.FILE_GUID_OPM_PRIV_PROVISION,
+        }
+    )
+
+    dDiskTypeByString = MappingProxyType(
+        {
+            "EMMC_PARTITION_USER_DATA": FWENTRY_DISK_TYPE.USER_DATA,
+            "EMMC_PARTITION_BOOT1": FWENTRY_DISK_TYPE.BOOT1,
+            "EMMC_PARTITION_BOOT2": FWENTRY_DISK_TYPE.BOOT2,
+            "EMMC_PARTITION_RPMB": FWENTRY_DISK_TYPE.RPMB,
+            "EMMC_PARTITION_GPP1": FWENTRY_DISK_TYPE.GPP1,
+            "EMMC_PARTITION_GPP2": FWENTRY_DISK_TYPE.GPP2,
+            "EMMC_PARTITION_GPP3": FWENTRY_DISK_TYPE.GPP3,
+            "EMMC_PARTITION_GPP4": FWENTRY_DISK_TYPE.GPP4,
+            "UFS_LUN0": FWENTRY_DISK_TYPE.LUN0,
+            "UFS_LUN1": FWENTRY_DISK_TYPE.LUN1,
+            "UFS_LUN2": FWENTRY_DISK_TYPE.LUN2,
+            "UFS_LUN3": FWENTRY_DISK_TYPE.LUN3,
+            "UFS_LUN4": FWENTRY_DISK_TYPE.LUN4,
+            "UFS_LUN5": FWENTRY_DISK_TYPE.LUN5,
+            "UFS_LUN6": FWENTRY_DISK_TYPE.LUN6,
+            "UFS_LUN7": FWENTRY_DISK_TYPE.LUN7,
+            "SPINOR": FWENTRY_DISK_TYPE.SPINOR,
+            "NVME": FWENTRY_DISK_TYPE.NVME,
+        }
+    )
+
+    dDiskTypeByValue = MappingProxyType(
+        {
+            FWENTRY_DISK_TYPE.USER_DATA: "EMMC_PARTITION_USER_DATA",
+            FWENTRY_DISK_TYPE.BOOT1: "EMMC_PARTITION_BOOT1",
+            FWENTRY_DISK_TYPE.BOOT2: "EMMC_PARTITION_BOOT2",
+            FWENTRY_DISK_TYPE.RPMB: "EMMC_PARTITION_RPMB",
+            FWENTRY_DISK_TYPE.GPP1: "EMMC_PARTITION_GPP1",
+            FWENTRY_DISK_TYPE.GPP2: "EMMC_PARTITION_GPP2",
+            FWENTRY_DISK_TYPE.GPP3: "EMMC_PARTITION_GPP3",
+            FWENTRY_DISK_TYPE.GPP4: "EMMC_PARTITION_GPP4",
+            FWENTRY_DISK_TYPE.LUN0: "UFS_LUN0",
+            FWENTRY_DISK_TYPE.LUN1: "UFS_LUN1",
+            FWENTRY_DISK_TYPE.LUN2: "UFS_LUN2",
+            FWENTRY_DISK_TYPE.LUN3: "UFS_LUN3",
+            FWENTRY_DISK_TYPE.LUN4: "UFS_LUN4",
+            FWENTRY_DISK_TYPE.LUN5: "UFS_LUN5",
+            FWENTRY_DISK_TYPE.LUN6: "UFS_LUN6",
+            FWENTRY_DISK_TYPE.LUN7: "UFS_LUN7",
+            FWENTRY_DISK_TYPE.SPINOR: "SPINOR",
+            FWENTRY_DISK_TYPE.NVME: "NVME",
+        }
+    )
+
+    dFlashTypeByString = MappingProxyType(
+        {
+            "EMMC": FlashType.EMMC,
+            "UFS": FlashType.UFS,
+            "NORNVME": FlashType.NORNVME,
+            "NORUFS": FlashType.NORUFS,
+        }
+    )
+
+    dFlashTypeByValue = MappingProxyType(
+        {
+            FlashType.EMMC: "EMMC",
+            FlashType.UFS: "UFS",
+            FlashType.NORNVME: "NORNVME",
+            FlashType.NORUFS: "NORUFS",
+        }
+    )
+
+    dFlashTypeByDiskType = MappingProxyType(
+        {
+            FWENTRY_DISK_TYPE.USER_DATA: [FlashType.EMMC],
+            FWENTRY_DISK_TYPE.BOOT1: [FlashType.EMMC],
+            FWENTRY_DISK_TYPE.BOOT2: [FlashType.EMMC],
+            FWENTRY_DISK_TYPE.RPMB: [FlashType.EMMC],
+            FWENTRY_DISK_TYPE.GPP1: [FlashType.EMMC],
+            FWENTRY_DISK_TYPE.GPP2: [FlashType.EMMC],
+            FWENTRY_DISK_TYPE.GPP3: [FlashType.EMMC],
+            FWENTRY_DISK_TYPE.GPP4: [FlashType.EMMC],
+            FWENTRY_DISK_TYPE.LUN0: [FlashType.UFS, FlashType.NORUFS],
+            FWENTRY_DISK_TYPE.LUN1: [FlashType.UFS],
+            FWENTRY_DISK_TYPE.LUN2: [FlashType.UFS],
+            FWENTRY_DISK_TYPE.LUN3: [FlashType.UFS],
+            FWENTRY_DISK_TYPE.LUN4: [FlashType.UFS],
+            FWENTRY_DISK_TYPE.LUN5: [FlashType.UFS],
+            FWENTRY_DISK_TYPE.LUN6: [FlashType.UFS],
+            FWENTRY_DISK_TYPE.LUN7: [FlashType.UFS],
+            FWENTRY_DISK_TYPE.SPINOR: [FlashType.NORNVME, FlashType.NORUFS],
+            FWENTRY_DISK_TYPE.NVME: [FlashType.NORNVME],
+        }
+    )
+
+    dOperationTypeByString = MappingProxyType(
+        {
+            "IGNORE": FWENTRY_OPERATION_TYPE.IGNORE,
+            "UPDATE": FWENTRY_OPERATION_TYPE.UPDATE,
+        }
+    )
+
+    dOperationTypeByValue = MappingProxyType(
+        {
+            FWENTRY_OPERATION_TYPE.IGNORE: "IGNORE",
+            FWENTRY_OPERATION_TYPE.UPDATE: "UPDATE",
+        }
+    )
+
+    dOperationPathTypeByString = MappingProxyType(
+        {
+            "SOURCE": FWENTRY_OPERATION_PATH_TYPE.SOURCE,
+            "DEST": FWENTRY_OPERATION_PATH_TYPE.DEST,
+            "BACKUP": FWENTRY_OPERATION_PATH_TYPE.BACKUP,
+        }
+    )
+
+    dOperationPathTypeByValue = MappingProxyType(
+        {
+            FWENTRY_OPERATION_PATH_TYPE.SOURCE: "SOURCE",
+            FWENTRY_OPERATION_PATH_TYPE.DEST: "DEST",
+            FWENTRY_OPERATION_PATH_TYPE.BACKUP: "BACKUP",
+        }
+    )
+
+    dUpdateTypeByString = MappingProxyType(
+        {
+            "UPDATE_PARTITION": FWENTRY_UPDATE_TYPE.PARTITION,
+            "UPDATE_FAT_FILE": FWENTRY_UPDATE_TYPE.FAT_FILE,
+            "UPDATE_DPP_QCOM": FWENTRY_UPDATE_TYPE.DPP_QCOM,
+            "UPDATE_DPP_OEM": FWENTRY_UPDATE_TYPE.DPP_OEM,
+            "UPDATE_OPM_PRIV_KEY": FWENTRY_UPDATE_TYPE.OPM_PRIV_KEY,
+            "UPDATE_FWCLASS_GUID": FWENTRY_UPDATE_TYPE.FWCLASS_GUID,
+        }
+    )
+
+    dUpdateTypeByValue = MappingProxyType(
+        {
+            FWENTRY_UPDATE_TYPE.PARTITION: "UPDATE_PARTITION",
+            FWENTRY_UPDATE_TYPE.FAT_FILE: "UPDATE_FAT_FILE",
+            FWENTRY_UPDATE_TYPE.DPP_QCOM: "UPDATE_DPP_QCOM",
+            FWENTRY_UPDATE_TYPE.DPP_OEM: "UPDATE_DPP_OEM",
+            FWENTRY_UPDATE_TYPE.OPM_PRIV_KEY: "UPDATE_OPM_PRIV_KEY",
+            FWENTRY_UPDATE_TYPE.FWCLASS_GUID: "UPDATE_FWCLASS_GUID",
+        }
+    )
+
+    dBackupTypeByString = MappingProxyType(
+        {
+            "BACKUP_PARTITION": FWENTRY_BACKUP_TYPE.PARTITION,
+            "BACKUP_FAT_FILE": FWENTRY_BACKUP_TYPE.FAT_FILE,
+        }
+    )
+
+    dBackupTypeByValue = MappingProxyType(
+        {
+            FWENTRY_BACKUP_TYPE.PARTITION: "BACKUP_PARTITION",
+            FWENTRY_BACKUP_TYPE.FAT_FILE: "BACKUP_FAT_FILE",
+        }
+    )
+
+    dBinaryTypeByString = MappingProxyType(
+        {
+            "RAW": FWENTRY_BINARY_TYPE.RAW,
+            "FATFS": FWENTRY_BINARY_TYPE.FATFS,
+        }
+    )
+
+    dBinaryTypeByValue = MappingProxyType(
+        {
+            FWENTRY_BINARY_TYPE.RAW: "RAW",
+            FWENTRY_BINARY_TYPE.FATFS: "FATFS",
+        }
+    )
+
+    def __init__(self, glymur_mode: bool = False):
+        self.XmlRawFwEntryList: deque = deque()
+        self.QpayloadFwEntryList: deque = deque()
+        self.DeviceFlashType: Optional[FlashType] = None
+        self.isMatchIdentifierInXML = False
+        self.isBinaryTypeInXML = False
+        self.isGlymurMode = glymur_mode
+
+
+# Former name of BuildContext, kept for existing callers.
+GlobalDynamicVariable = BuildContext
@@ -10,6 +10,8 @@ import re
 import sys
 import traceback
 
+from . import checksum
+
 print_logs = 1
 sVersion = "1.0"
 S_SIGNATURE = "SYSFWVER"
@@ -167,127 +169,79 @@ class Arguments:
         return self.parameters.get(Param)
 
 
-def Reflect(data_b, l_i):
-    data_i = int(data_b)
-    reff_i = 0
-
-    for i in range(l_i):
-        if (data_i & 0x1) != 0:
-            reff_i = reff_i | int(1 << (int(l_i - 1) - i))
-
-        data_i = data_i >> 1
-    return reff_i
-
-
-def CalcCRC32(buffer_b, l_i):
-    k_i = 8
-    MSB_i = 0
-    gx_h = 0x04C11DB7
-    regs_h = 0xFFFFFFFF
-    regsMask_h = 0xFFFFFFFF
-    regsMSB_i = 0
-
-    for i in range(l_i):
-        DataByte_b = buffer_b[i]
-        DataByte_b = bytes(Reflect(DataByte_b, 8))
+def build_version_data(s_fw_version, s_lowest_fw_version):
+    """Return a populated QSYS_FW_VERSION_DATA for the given A.B.C.D versions.
 
-        for j in range(k_i):
-            MSB = DataByte_b >> (k_i - 1)
-            MSB = MSB & 1
-            regsMSB_i = int(regs_h >> 31) & 1
-            regs_h = regs_h << 1
-            if (regsMSB_i ^ MSB_i) != 0:
-                regs_h = regs_h ^ gx_h
-
-            regs_h = regs_h & regsMask_h
-            DataByte_b = DataByte_b << 1
-    regs_h = regs_h & regsMask_h
+    Returns None (after printing the reason) if either version string is
+    malformed.
+    """
+    FwVerBinaryData = QSYS_FW_VERSION_DATA()
+    FwVerBinaryData.VersionDataCrc32 = QSYS_FW_VERSION_DATA_VERSIONDATACRC32
+    FwVerBinaryData.Signature = int.from_bytes(S_SIGNATURE.encode("ascii"), "little")
+    sRevisionArr = S_REVISION.split(".")
+    FwVerBinaryData.Revision = (int(sRevisionArr[0]) << 16) | int(sRevisionArr[1])
 
-    return Reflect(regs_h, 32)
+    if not s_fw_version or not re.match(r"^\d+\.\d+\.\d+\.\d+$", s_fw_version):
+        print("ERROR: Value to the parameter -FwVer is not specified")
+        return None
+    sFirmwareVersionArr = s_fw_version.split(".")
+    FwVerBinaryData.FwVersion = (int(sFirmwareVersionArr[2]) << 16) | int(
+        sFirmwareVersionArr[3]
+    )
 
+    if not s_lowest_fw_version:
+        print("ERROR: Value to the parameter -LFwVer is not specified")
+        return None
+    if not re.match(r"^\d+\.\d+\.\d+\.\d+$", s_lowest_fw_version):
+        print("ERROR: Value to the parameter -FwVer is not specified")
+        return None
+    sFirmwareLowVersionArr = s_lowest_fw_version.split(".")
+    FwVerBinaryData.LowestSupportedFwVersion = (
+        int(sFirmwareLowVersionArr[2]) << 16
+    ) | int(sFirmwareLowVersionArr[3])
 
-def CalcCRC32_i(buffer_b, l_i):
-    k_i = 8
-    MSB_i = 0
-    gx_h = 0x04C11DB7
-    regs_h = 0xFFFFFFFF
-    regsMask_h = 0xFFFFFFFF
-    regsMSB_i = 0
+    FwVerBinaryData.VersionDataSize = len(FwVerBinaryData.to_bytes())
+    FwVerBinaryData.VersionDataCrc32 = checksum.crc32(
+        FwVerBinaryData.to_bytes(), FwVerBinaryData.VersionDataSize
+    )
+    return FwVerBinaryData
 
-    gx_i = int(gx_h)
-    regs_i = int(regs_h)
-    regsMask_i = int(regsMask_h)
 
-    for i in range(l_i):
-        DataByte_b = buffer_b[i]
-        DataByte_i = int(DataByte_b)
-        DataByte_i = Reflect(DataByte_i, 8)
+def write_binary_file(FwVerBinaryData, OutputBinary):
+    """Write *FwVerBinaryData* to basename(*OutputBinary*) in the cwd."""
+    FileName = os.path.basename(OutputBinary)
+    if os.path.exists(OutputBinary):
+        os.remove(OutputBinary)
 
-        for j in range(k_i):
-            MSB_i = DataByte_i >> (k_i - 1)
-            MSB_i = MSB_i & 1
-            regsMSB_i = int(regs_i >> 31) & 1
-            regs_i = regs_i << 1
-            if (regsMSB_i ^ MSB_i) != 0:
-                regs_i = regs_i ^ gx_i
+    output_file_path = os.path.join(os.getcwd(), FileName)
 
-            regs_i = regs_i & regsMask_i
-            DataByte_i = DataByte_i << 1
-    regs_i = regs_i & regsMask_i
+    with open(output_file_path, "wb") as fw_file:
+        fw_file.write(FwVerBinaryData.to_bytes())
 
-    return Reflect(regs_i, 32) ^ int(0xFFFFFFFF)
+    return output_file_path
 
 
 def generate_binary_file(args):
 
-    FwVerBinaryData = QSYS_FW_VERSION_DATA()
-    FwVerBinaryData.VersionDataCrc32 = QSYS_FW_VERSION_DATA_VERSIONDATACRC32
-    FwVerBinaryData.Signature = int.from_bytes(S_SIGNATURE.encode("ascii"), "little")
-    sRevisionArr = S_REVISION.split(".")
-    FwVerBinaryData.Revision = (int(sRevisionArr[0]) << 16) | int(sRevisionArr[1])
-
-    if args["FwVer"]:
-        if not re.match(r"^\d+\.\d+\.\d+\.\d+$", args["FwVer"]):
-            print("ERROR: Value to the parameter -FwVer is not specified")
-            return False
-        sFirmwareVersionArr = args["FwVer"].split(".")
-        FwVerBinaryData.FwVersion = (int(sFirmwareVersionArr[2]) << 16) | int(
-            sFirmwareVersionArr[3]
-        )
-    else:
+    if not args["FwVer"]:
         print("ERROR: Value to the parameter -FwVer is not specified")
         return False
 
-    if args["LFwVer"]:
-        if not re.match(r"^\d+\.\d+\.\d+\.\d+$", args["LFwVer"]):
-            print("ERROR: Value to the parameter -FwVer is not specified")
-            return False
-        sFirmwareLowVersionArr = args["LFwVer"].split(".")
-        FwVerBinaryData.LowestSupportedFwVersion = (
-            int(sFirmwareLowVersionArr[2]) << 16
-        ) | int(sFirmwareLowVersionArr[3])
-    else:
+    if not args["LFwVer"]:
         print("ERROR: Value to the parameter -LFwVer is not specified")
         return False
 
+    FwVerBinaryData = build_version_data(args["FwVer"], args["LFwVer"])
+    if FwVerBinaryData is None:
+        return False
+
     if args["O"]:
         OutputBinary = args["O"]
-        FileName = os.path.basename(OutputBinary)
     else:
         print("ERROR: Value to the parameter -o is not specified")
         return False
 
-    if os.path.exists(OutputBinary):
-        os.remove(OutputBinary)
-
-    FwVerBinaryData.VersionDataSize = len(FwVerBinaryData.to_bytes())
-    FwVerBinaryData.VersionDataCrc32 = CalcCRC32_i(
-        FwVerBinaryData.to_bytes(), FwVerBinaryData.VersionDataSize
-    )
-    output_file_path = os.path.join(os.getcwd(), FileName)
-
-    with open(output_file_path, "wb") as fw_file:
-        fw_file.write(FwVerBinaryData.to_bytes())
+    write_binary_file(FwVerBinaryData, OutputBinary)
 
     return True
 
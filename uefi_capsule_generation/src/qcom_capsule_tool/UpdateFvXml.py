@@ -29,6 +29,10 @@ SUPPORTED_PLATFORMS = {
 }
 
 
+class FvXmlError(ValueError):
+    """Raised when FvUpdate.xml cannot be generated."""
+
+
 def get_target_name(soc_name):
     for platform, target in SUPPORTED_PLATFORMS.items():
         if soc_name == platform:
@@ -40,17 +44,15 @@ def safe_clone(repo_dir):
         try:
             subprocess.run(["git", "clone", REPO_URL, repo_dir], check=True)
         except subprocess.CalledProcessError as e:
-            print(f"Error cloning repo: {e}")
-            sys.exit(1)
+            raise FvXmlError(f"Cannot clone {REPO_URL}: {e}")
 
 
 def read_partitions_conf(partition_conf_path):
     try:
         with open(partition_conf_path, "r") as f:
             return f.readlines()
-    except FileNotFoundError:
-        print(f"Error: {partition_conf_path} not found.")
-        sys.exit(1)
+    except OSError as e:
+        raise FvXmlError(f"Cannot read {partition_conf_path}: {e.strerror}")
 
 
 def detect_storage_type_from_conf(lines):
@@ -61,8 +63,7 @@ def detect_storage_type_from_conf(lines):
             return "EMMC"
         elif re.search(r"--type=spinor", line, re.IGNORECASE):
             return "SPINOR"
-    print("Error: Could not detect StorageType from partitions.conf.")
-    sys.exit(1)
+    raise FvXmlError("Could not detect StorageType from partitions.conf.")
 
 
 def parse_partition_info(args, lines, storage_type):
@@ -230,6 +231,55 @@ def write_xml(doc, output_file="FvUpdate.xml"):
         f.write(xml_str)
 
 
+def generate_fv_xml(
+    storage_type=None,
+    target=None,
+    partitions_conf=None,
+    ptool_path=None,
+    output_file="FvUpdate.xml",
+):
+    """Build FvUpdate.xml in-process and return the minidom document.
+
+    Either *partitions_conf* (storage type is auto-detected) or *target* plus
+    *storage_type* must be given. The document is also written to
+    *output_file* unless that is None. Raises FvXmlError for an unknown
+    target, a missing partitions.conf or a failed qcom-ptool clone.
+    """
+    repo_dir = ptool_path if ptool_path else DEFAULT_REPO_DIR
+
+    if partitions_conf:
+        lines = read_partitions_conf(partitions_conf)
+        storage_type = detect_storage_type_from_conf(lines)
+    else:
+        if not ptool_path:
+            safe_clone(repo_dir)
+        target_name = get_target_name(target)
+        if not target_name:
+            raise FvXmlError(f"Provided target {target} is unknown, please re-check.")
+        conf_dir = (
+            "spinor" if storage_type in ("NORUFS", "NORNVME") else storage_type.lower()
+        )
+        partition_conf_path = os.path.join(
+            repo_dir, "platforms", target_name, conf_dir, "partitions.conf"
+        )
+        lines = read_partitions_conf(partition_conf_path)
+
+    args = argparse.Namespace(StorageType=storage_type)
+    partition_info = parse_partition_info(args, lines, storage_type)
+    pairs = find_base_names(partition_info)
+    if not pairs:
+        print(
+            "Warning: No partition pairs (_a/_b or _BACKUP) found. FvUpdate.xml will not contain FwEntry blocks."
+        )
+    doc = create_xml(args, pairs, partition_info)
+    if output_file is not None:
+        write_xml(doc, output_file)
+    print(
+        f"FvUpdate.xml has been created successfully with StorageType={storage_type}."
+    )
+    return doc
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Generate FvUpdate.xml from partitions.conf"
@@ -258,8 +308,6 @@ def main():
     )
     args = parser.parse_args()
 
-    repo_dir = args.ptool_path if args.ptool_path else DEFAULT_REPO_DIR
-
     if args.F:
         if args.StorageType:
             print(
@@ -271,44 +319,25 @@ def main():
                 "Error: Do not provide -T/--StorageType when using -F/--partitions_conf."
             )
             sys.exit(1)
-        partition_conf_path = args.F
-        lines = read_partitions_conf(partition_conf_path)
-        args.StorageType = detect_storage_type_from_conf(lines)
     elif args.T:
         if not args.StorageType:
             print("Error: You must provide -S/--StorageType when using -T/--target.")
             sys.exit(1)
-        if not args.ptool_path:
-            safe_clone(repo_dir)
-        target = get_target_name(args.T)
-        if not target:
-            print("Provided target is Unknown !!! Please re-check")
-            sys.exit(1)
-        conf_dir = (
-            "spinor"
-            if args.StorageType in ("NORUFS", "NORNVME")
-            else args.StorageType.lower()
-        )
-        partition_conf_path = os.path.join(
-            repo_dir, "platforms", target, conf_dir, "partitions.conf"
-        )
-        lines = read_partitions_conf(partition_conf_path)
     else:
         print("Error: Invalid argument combination.")
         parser.print_usage()
         sys.exit(1)
 
-    partition_info = parse_partition_info(args, lines, args.StorageType)
-    pairs = find_base_names(partition_info)
-    if not pairs:
-        print(
-            "Warning: No partition pairs (_a/_b or _BACKUP) found. FvUpdate.xml will not contain FwEntry blocks."
+    try:
+        generate_fv_xml(
+            storage_type=args.StorageType,
+            target=args.T,
+            partitions_conf=args.F,
+            ptool_path=args.ptool_path,
         )
-    doc = create_xml(args, pairs, partition_info)
-    write_xml(doc)
-    print(
-        f"FvUpdate.xml has been created successfully with StorageType={args.StorageType}."
-    )
+    except FvXmlError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
 
 
 if __name__ == "__main__":
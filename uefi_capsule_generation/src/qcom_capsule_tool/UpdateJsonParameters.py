@@ -12,10 +12,11 @@
 import argparse
 import json
 import os
-import subprocess
 import sys
 from collections import OrderedDict
 
+from . import SYSFW_VERSION_program as SYSFW
+
 
 def ParseArguments():
     parser = argparse.ArgumentParser(description="Process input arguments.")
@@ -155,49 +156,31 @@ def GetEcFirmwareInfo(args):
 
 
 def GetSysFirmwareInfo(args):
-    commands = ["-GetFwVersionHex", "-GetLSFwVersionHex"]
     SysBinPath = args.BinFile
     try:
-        # Check if SysBinPath and SysFwVersion.exe path is valid
+        # Check if SysBinPath path is valid
         if not os.path.exists(SysBinPath):
             print("Invalid system firmware version file: {0}".format(SysBinPath))
             sys.exit(1)
 
-        # Call SYSFW_VERSION_program to extract the firmware version and lowest
-        # supported version. Invoke as a module so it resolves correctly when
-        # qcom-capsule-tool is installed via pip/pipx (no __file__ assumptions).
-        results = []
-        for cmd in commands:
-            try:
-                output = (
-                    subprocess.check_output(
-                        [
-                            sys.executable,
-                            "-m",
-                            "qcom_capsule_tool.SYSFW_VERSION_program",
-                            cmd,
-                            SysBinPath,
-                        ]
-                    )
-                    .decode()
-                    .strip()
-                )
-                results.append(output)
-            except Exception as e:
-                print("Failed to execute command:{0}. Error: {1}".format(cmd, (e)))
-                sys.exit(1)
+        # Decode the firmware version and lowest supported version in-process
+        # rather than spawning SYSFW_VERSION_program once per field.
+        with open(SysBinPath, "rb") as file:
+            FwVerBinaryData = SYSFW.QSYS_FW_VERSION_DATA.from_bytes(file.read())
+        if FwVerBinaryData is None:
+            print("Failed to extract firmware info from {0}".format(SysBinPath))
+            sys.exit(1)
 
-        (args.FwVersion, args.LowestSupportedVersion) = (results[0], results[1])
+        (args.FwVersion, args.LowestSupportedVersion) = (
+            hex(FwVerBinaryData.FwVersion),
+            hex(FwVerBinaryData.LowestSupportedFwVersion),
+        )
         print(
             "Firmware Version is {0}, lowest supported version: {1}".format(
                 args.FwVersion, args.LowestSupportedVersion
             )
         )
 
-    except subprocess.CalledProcessError as e:
-        print("Failed to extract firmware info from sys.bin: {0}".format(e))
-        sys.exit(1)
-
     except Exception as e:
         print("Exception in GetFirmwareInfo(): {0}".format(e))
         sys.exit(1)
@@ -210,7 +193,12 @@ def UpdateJsonFile(args):
     EcFwString = "EC_FW"
     SysFwString = "SYS_FW"
     try:
-        if FirmwareType == SysFwString:
+        if getattr(args, "FwVersion", None) and getattr(
+            args, "LowestSupportedVersion", None
+        ):
+            # Versions were supplied by the caller (e.g. CapsulePipeline).
+            pass
+        elif FirmwareType == SysFwString:
             GetSysFirmwareInfo(args)
             print("GetSysFirmwareInfo(): {0}".format(SysFwString))
         elif FirmwareType == EcFwString:
@@ -266,6 +254,8 @@ def UpdateJsonFile(args):
         print("Error occurred while writing to the JSON file: {0}.".format(e))
         sys.exit(1)
 
+    return data
+
 
 def main():
     args = ParseArguments()
@@ -5,365 +5,324 @@
 
 
 import ctypes
+import operator
 import uuid
+from dataclasses import dataclass
+from typing import Callable, Optional
 
 from . import FVCreation as FVC
 from . import FVCreation_header as FVC_h
 
 
-def partition_fields_checking(raw_fwentry, raw_dev_path, meta_data_dev_path):
-    if raw_fwentry.InputBinary is None:
-        print("Empty <InputBinary> tag is not allowed for partition operation")
-        return False
-    if raw_dev_path.DiskType is None:
-        print("Empty <DiskType> tag is not allowed for partition operation")
-        return False
-    if raw_dev_path.PartitionName is None:
-        print("Empty <PartitionName> tag is not allowed for partition operation")
-        return False
-    if raw_dev_path.PartitionTypeGUID is None:
-        print(
-            "Empty <PartitionTypeGuidName> tag is not allowed for partition operation"
-        )
-        return False
-    return True
+class FwEntryRuleError(Exception):
+    """Raised by a FieldRule converter; the message describes the violation."""
 
 
-def fat_fields_checking(raw_fwentry, raw_dev_path, meta_data_dev_path):
-    if raw_fwentry.InputBinary is None:
-        print("Empty <InputBinary> tag is not allowed for FAT file operation")
-        return False
-    if raw_dev_path.DiskType is None:
-        print("Empty <DiskType> tag is not allowed for FAT file operation")
-        return False
-    if raw_dev_path.PartitionName is None and raw_dev_path.PartitionTypeGUID is None:
-        print(
-            "Enter <PartitionName> or <PartitionTypeGUID> is required for FAT file operation"
-        )
-        return False
-    if raw_dev_path.FileName is None:
-        print("Empty <FileName> tag is not allowed for FAT file operation")
-        return False
-    return True
-
+@dataclass(frozen=True)
+class FieldRule:
+    # Attribute path of the field in XML_RAW_FWENTRY and in
+    # QPAYLOAD_METADATA_FWENTRY, e.g. "UpdatePath.DiskType".
+    path: str
+    # convert(rules, text) -> value stored in the metadata entry; raises
+    # FwEntryRuleError for a bad value.
+    convert: Callable
+    # Violation reported when the field is given for UPDATE_FWCLASS_GUID.
+    fwclass_guid_error: Optional[str] = None
+    # FwEntryRules flag the rule depends on ("is_glymur" or
+    # "has_match_identifier"); None for rules that always apply.
+    mode: Optional[str] = None
 
-def dpp_fields_checking(raw_fwentry, raw_dev_path, meta_data_dev_path):
-    if raw_fwentry.InputBinary is None:
-        print("Empty <InputBinary> tag is not allowed for DPP file operation")
-        return False
-    if raw_dev_path.FileName is None:
-        print("Empty <FileName> tag is not allowed for DPP file operation")
-        return False
-    return True
 
+def enum_value(lookup, unrecognized, unsupported=None):
+    """Convert through the g_dynamic_var.<lookup> string map."""
+    unsupported = unsupported or {}
 
-def delete_fat_fields_checking(raw_fwentry, raw_dev_path, meta_data_dev_path):
-    if raw_dev_path.DiskType is None:
-        print("Empty <DiskType> tag is not allowed for FAT file operation")
-        return False
-    if raw_dev_path.PartitionName is None and raw_dev_path.PartitionTypeGUID is None:
-        print(
-            "Empty <PartitionName> or <PartitionTypeGUID> is not allowed for FAT file operation"
-        )
-        return False
-    if raw_dev_path.FileName is None:
-        print("Empty <FileName> tag is not allowed for FAT file operation")
-        return False
-    return True
+    def convert(rules, text):
+        value = rules.lookup(lookup, text)
+        if value is None:
+            raise FwEntryRuleError(unrecognized.format(text))
+        if value in unsupported:
+            raise FwEntryRuleError(unsupported[value])
+        return value
 
+    return convert
 
-def delete_partition_fields_checking(raw_fwentry, raw_dev_path, meta_data_dev_path):
-    if raw_dev_path.DiskType is None:
-        print("Empty <DiskType> tag is not allowed for partition operation")
-        return False
-    if raw_dev_path.PartitionName is None:
-        print("Empty <PartitionName> tag is not allowed for partition operation")
-        return False
-    if raw_dev_path.PartitionTypeGUID is None:
-        print("Empty <PartitionTypeGUID> tag is not allowed for partition operation")
-        return False
-    return True
 
+def text_value(max_size, tag, encoding, reserved=None):
+    """Encode a name of at most *max_size* characters other than *reserved*."""
 
-def find_xml_raw_fw_entry_node(meta_data_fw_entry, g_dynamic_var):
-    xml_node_entry = FVC_h.XML_RAW_FWENTRY()
+    def convert(rules, text):
+        if len(text) > max_size:
+            raise FwEntryRuleError(f"More than {max_size} characters found in {tag}")
+        if text == reserved:
+            raise FwEntryRuleError(
+                f"Partition name {reserved} is not allowed, Otherwise version conflict will occur when different binary is used"
+            )
+        return text.encode(encoding)
 
-    for xml_raw_fw_entry in g_dynamic_var.XmlRawFwEntryList:
-        if xml_raw_fw_entry.FileGuid.lower() == meta_data_fw_entry.FileGuid.lower():
-            xml_node_entry = xml_raw_fw_entry
+    return convert
 
-    return xml_node_entry
 
+def guid_value(rules, text):
+    text = text.strip("{}")
+    if not text:
+        return None
+    try:
+        return uuid.UUID(text).bytes
+    except ValueError as e:
+        raise FwEntryRuleError(f"Failure creating partitionTypeGuid(error: {e}).")
+
+
+def device_path_rules(path, tag):
+    fwclass_guid_error = f"<{tag}> is not supported for UPDATE_FWCLASS_GUID"
+    return (
+        FieldRule(
+            f"{path}.DiskType",
+            enum_value("dDiskTypeByString", tag + " <DiskType> {} is not recognized"),
+            fwclass_guid_error,
+        ),
+        FieldRule(
+            f"{path}.PartitionName",
+            text_value(
+                FVC_h.GlobalStaticVariable.PARTITION_NAME_MAX_SIZE,
+                "<PartitionName>",
+                "utf-8",
+                FVC_h.GlobalStaticVariable.PARTITION_NAME_SYSFW_VERSION,
+            ),
+            fwclass_guid_error,
+        ),
+        FieldRule(f"{path}.PartitionTypeGUID", guid_value, fwclass_guid_error),
+        FieldRule(
+            f"{path}.FileName",
+            text_value(
+                FVC_h.GlobalStaticVariable.FILE_NAME_MAX_SIZE, "<FileName>", "utf-16-le"
+            ),
+            fwclass_guid_error,
+        ),
+    )
 
-def fw_entry_fields_value_checking(raw_fwentry, meta_data_fwentry, g_dynamic_var):
-    # Operation
-    if raw_fwentry.Operation:
-        if raw_fwentry.Operation.upper() in g_dynamic_var.dOperationTypeByString:
-            meta_data_fwentry.Operation = g_dynamic_var.dOperationTypeByString[
-                raw_fwentry.Operation.upper()
-            ]
-        else:
-            print(f"Operation {raw_fwentry.Operation} is not recognized")
-            return False
-
-    # UpdateType
-    if raw_fwentry.UpdateType:
-        if raw_fwentry.UpdateType.upper() in g_dynamic_var.dUpdateTypeByString:
-            meta_data_fwentry.UpdateType = g_dynamic_var.dUpdateTypeByString[
-                raw_fwentry.UpdateType.upper()
-            ]
-            if meta_data_fwentry.UpdateType == FVC_h.FWENTRY_UPDATE_TYPE.FAT_FILE:
-                print("ERROR: <UpdateType> is not supported for FAT_FILE")
-                return False
-        else:
-            print(f"<UpdateType> {raw_fwentry.UpdateType} is not recognized")
-            return False
-
-    # BackupType
-    if raw_fwentry.BackupType:
-        if meta_data_fwentry.UpdateType == FVC_h.FWENTRY_UPDATE_TYPE.FWCLASS_GUID:
-            print("ERROR: <BackupType> is not supported for UPDATE_FWCLASS_GUID")
-            return False
-
-        if raw_fwentry.BackupType.upper() in g_dynamic_var.dBackupTypeByString:
-            meta_data_fwentry.BackupType = g_dynamic_var.dBackupTypeByString[
-                raw_fwentry.BackupType.upper()
-            ]
-            if meta_data_fwentry.BackupType == FVC_h.FWENTRY_BACKUP_TYPE.FAT_FILE:
-                print("ERROR: <BackupType> is not supported for FAT_FILE")
-                return False
-        else:
-            print(f"<BackupType> {raw_fwentry.BackupType} is not recognized")
-            return False
 
-    # MatchIdentifier
-    if g_dynamic_var.isMatchIdentifierInXML:
-        meta_data_fwentry.Revision = FVC.SYS_FW_METADATA_REVISION
-        if raw_fwentry.MatchIdentifier:
-            if (
-                len(raw_fwentry.MatchIdentifier)
-                > FVC_h.GlobalStaticVariable.MATCH_IDENTIFIER_NAME_MAX_SIZE
-            ):
-                print(
-                    f"Error: More than {FVC_h.GlobalStaticVariable.MATCH_IDENTIFIER_NAME_MAX_SIZE} characters found in <MatchIdentifier>"
+# Every FwEntry field that is converted into the metadata entry, in the
+# order they are checked.
+FIELD_RULES = (
+    FieldRule(
+        "Operation",
+        enum_value("dOperationTypeByString", "Operation {} is not recognized"),
+    ),
+    FieldRule(
+        "UpdateType",
+        enum_value(
+            "dUpdateTypeByString",
+            "<UpdateType> {} is not recognized",
+            {
+                FVC_h.FWENTRY_UPDATE_TYPE.FAT_FILE: "<UpdateType> is not supported for FAT_FILE"
+            },
+        ),
+    ),
+    FieldRule(
+        "BackupType",
+        enum_value(
+            "dBackupTypeByString",
+            "<BackupType> {} is not recognized",
+            {
+                FVC_h.FWENTRY_BACKUP_TYPE.FAT_FILE: "<BackupType> is not supported for FAT_FILE"
+            },
+        ),
+        "<BackupType> is not supported for UPDATE_FWCLASS_GUID",
+    ),
+    FieldRule(
+        "MatchIdentifier",
+        text_value(
+            FVC_h.GlobalStaticVariable.MATCH_IDENTIFIER_NAME_MAX_SIZE,
+            "<MatchIdentifier>",
+            "utf-8",
+        ),
+        mode="has_match_identifier",
+    ),
+    FieldRule(
+        "BinaryType",
+        enum_value("dBinaryTypeByString", "<BinaryType> {} is not recognized"),
+        mode="is_glymur",
+    ),
+    *device_path_rules("UpdatePath", "Dest"),
+    *device_path_rules("BackupPath", "Backup"),
+)
+
+PARTITION_PATH_FIELDS = ("DiskType", "PartitionName", "PartitionTypeGUID")
+
+# What an UPDATE entry must carry, by UpdateType: the operation named in
+# messages (None: nothing is required), the <Dest> fields and whether a
+# partition <Backup> is needed as well.
+REQUIRED_FIELDS = {
+    FVC_h.FWENTRY_UPDATE_TYPE.PARTITION: ("partition", PARTITION_PATH_FIELDS, True),
+    FVC_h.FWENTRY_UPDATE_TYPE.DPP_QCOM: ("DPP file", ("FileName",), True),
+    FVC_h.FWENTRY_UPDATE_TYPE.DPP_OEM: ("DPP file", ("FileName",), True),
+    FVC_h.FWENTRY_UPDATE_TYPE.OPM_PRIV_KEY: ("DPP file", ("FileName",), True),
+    FVC_h.FWENTRY_UPDATE_TYPE.FWCLASS_GUID: (None, (), False),
+}
+
+
+def store_field(entry, parent, name, value):
+    # parent: attrgetter of the structure holding *name*, or None.
+    if parent is not None:
+        entry = parent(entry)
+    current = getattr(entry, name)
+    if isinstance(value, bytes) and isinstance(current, ctypes.Array):
+        current[: len(value)] = value
+    else:
+        setattr(entry, name, value)
+
+
+class FwEntryRules:
+    """
+    About:
+        FIELD_RULES and REQUIRED_FIELDS bound to one g_dynamic_var.  The
+        rules of the active modes are compiled once into attribute
+        getters, and each string map remembers the text it has already
+        looked up, so the FwEntries of a large FvUpdate.xml do not
+        upper-case and look up the same values again.
+    """
+
+    def __init__(self, g_dynamic_var):
+        self.g_dynamic_var = g_dynamic_var
+        self.is_glymur = g_dynamic_var.isGlymurMode
+        self.has_match_identifier = g_dynamic_var.isMatchIdentifierInXML
+        self.rules = []
+        for rule in FIELD_RULES:
+            if rule.mode and not getattr(self, rule.mode):
+                continue
+            parent, _, name = rule.path.rpartition(".")
+            self.rules.append(
+                (
+                    rule,
+                    operator.attrgetter(rule.path),
+                    operator.attrgetter(parent) if parent else None,
+                    name,
                 )
-                return False
-            meta_data_fwentry.MatchIdentifier = raw_fwentry.MatchIdentifier.encode(
-                "utf-8"
             )
-
-    # BinaryType
-    if g_dynamic_var.isGlymurMode and raw_fwentry.BinaryType:
-        if raw_fwentry.BinaryType.upper() in g_dynamic_var.dBinaryTypeByString:
-            meta_data_fwentry.BinaryType = g_dynamic_var.dBinaryTypeByString[
-                raw_fwentry.BinaryType.upper()
-            ]
-        else:
-            print(f"<BinaryType> {raw_fwentry.BinaryType} is not recognized")
-            return False
-
-    # ARValidation
-    if g_dynamic_var.isGlymurMode and raw_fwentry.ARValidation:
+        self.lookups = {}
+
+    def lookup(self, name, text):
+        seen = self.lookups.get(name)
+        if seen is None:
+            seen = self.lookups[name] = {}
+        if text not in seen:
+            seen[text] = getattr(self.g_dynamic_var, name).get(text.upper())
+        return seen[text]
+
+    def check_fields(self, raw_fwentry, meta_data_fwentry):
+        """Convert every field given; return the violations."""
+        errors = []
+        failed = set()
+        if self.has_match_identifier:
+            meta_data_fwentry.Revision = FVC.SYS_FW_METADATA_REVISION
+
+        for rule, get_text, parent, name in self.rules:
+            text = get_text(raw_fwentry)
+            if not text:
+                continue
+            if (
+                rule.fwclass_guid_error
+                and meta_data_fwentry.UpdateType
+                == FVC_h.FWENTRY_UPDATE_TYPE.FWCLASS_GUID
+            ):
+                errors.append(rule.fwclass_guid_error)
+                continue
+            try:
+                value = rule.convert(self, text)
+            except FwEntryRuleError as e:
+                errors.append(str(e))
+                failed.add(rule.path)
+                continue
+            if value is not None:
+                store_field(meta_data_fwentry, parent, name, value)
+
+        if self.is_glymur and raw_fwentry.ARValidation and "BinaryType" not in failed:
+            errors += self.check_ar_validation(raw_fwentry, meta_data_fwentry)
+        return errors
+
+    def check_ar_validation(self, raw_fwentry, meta_data_fwentry):
+        errors = []
         images = raw_fwentry.ARValidation.Images
-        image_count = len(images)
+        file_name_max = FVC_h.GlobalStaticVariable.FILE_NAME_MAX_SIZE
+        ar_type_max = FVC_h.GlobalStaticVariable.AR_VALIDATION_TYPE_MAX_SIZE
         for j, image in enumerate(images):
-            if meta_data_fwentry.BinaryType == FVC_h.FWENTRY_BINARY_TYPE.FATFS:
-                if image.FileName is None:
-                    print(
-                        f"ERROR: FileName is null for image {raw_fwentry.InputBinary}"
+            image_errors = []
+            if image.FileName is None:
+                if meta_data_fwentry.BinaryType == FVC_h.FWENTRY_BINARY_TYPE.FATFS:
+                    image_errors.append(
+                        f"FileName is null for image {raw_fwentry.InputBinary}"
                     )
-                    return False
-                if len(image.FileName) > FVC_h.GlobalStaticVariable.FILE_NAME_MAX_SIZE:
-                    print(
-                        f"ERROR: More than {FVC_h.GlobalStaticVariable.FILE_NAME_MAX_SIZE} characters found in <FileName>"
-                    )
-                    return False
-            elif meta_data_fwentry.BinaryType == FVC_h.FWENTRY_BINARY_TYPE.RAW:
-                if (
-                    image.FileName is not None
-                    and len(image.FileName)
-                    < FVC_h.GlobalStaticVariable.FILE_NAME_MAX_SIZE
-                ):
-                    if image.FileName != raw_fwentry.InputBinary:
-                        print(
-                            "ARValidation FileName should be same as InputBinary name for RAW FwEntry"
-                        )
-                        return False
+            elif len(image.FileName) > file_name_max:
+                image_errors.append(
+                    f"More than {file_name_max} characters found in <FileName>"
+                )
+            elif (
+                meta_data_fwentry.BinaryType == FVC_h.FWENTRY_BINARY_TYPE.RAW
+                and len(image.FileName) < file_name_max
+                and image.FileName != raw_fwentry.InputBinary
+            ):
+                image_errors.append(
+                    "ARValidation FileName should be same as InputBinary name for RAW FwEntry"
+                )
 
             if not image.ARValidationType:
-                print(f"ERROR: ARValidationType is null for image {image.FileName}")
-                return False
-
-            if (
-                len(image.ARValidationType)
-                > FVC_h.GlobalStaticVariable.AR_VALIDATION_TYPE_MAX_SIZE
-            ):
-                print(
-                    f"ERROR: More than {FVC_h.GlobalStaticVariable.AR_VALIDATION_TYPE_MAX_SIZE} characters found in <ARValidationType>"
+                image_errors.append(
+                    f"ARValidationType is null for image {image.FileName}"
+                )
+            elif len(image.ARValidationType) > ar_type_max:
+                image_errors.append(
+                    f"More than {ar_type_max} characters found in <ARValidationType>"
                 )
-                return False
 
+            if image_errors:
+                errors += image_errors
+                continue
+            meta_image = meta_data_fwentry.ARValidation.Images[j]
             if image.FileName is not None:
-                meta_data_fwentry.ARValidation.Images[j].FileName[
-                    : len(image.FileName.encode("utf-16-le"))
-                ] = image.FileName.encode("utf-16-le")
-            meta_data_fwentry.ARValidation.Images[j].ARValidationType[
-                : len(image.ARValidationType.encode("utf-16-le"))
-            ] = image.ARValidationType.encode("utf-16-le")
-
-        meta_data_fwentry.ARValidation.ImageCount = image_count
-
-    # Dest DiskType
-    if raw_fwentry.UpdatePath.DiskType:
-        if meta_data_fwentry.UpdateType == FVC_h.FWENTRY_UPDATE_TYPE.FWCLASS_GUID:
-            print("ERROR: <Dest> is not supported for UPDATE_FWCLASS_GUID")
-            return False
-
-        if raw_fwentry.UpdatePath.DiskType.upper() in g_dynamic_var.dDiskTypeByString:
-            meta_data_fwentry.UpdatePath.DiskType = g_dynamic_var.dDiskTypeByString[
-                raw_fwentry.UpdatePath.DiskType.upper()
-            ]
-        else:
-            print(
-                f"Dest <DiskType> {raw_fwentry.UpdatePath.DiskType} is not recognized"
-            )
-            return False
-
-    # Dest PartitionName
-    if raw_fwentry.UpdatePath.PartitionName:
-        if meta_data_fwentry.UpdateType == FVC_h.FWENTRY_UPDATE_TYPE.FWCLASS_GUID:
-            print("ERROR: <Dest> is not supported for UPDATE_FWCLASS_GUID")
-            return False
-        if (
-            len(raw_fwentry.UpdatePath.PartitionName)
-            > FVC_h.GlobalStaticVariable.PARTITION_NAME_MAX_SIZE
-        ):
-            print(
-                f"Error: More than {FVC_h.GlobalStaticVariable.PARTITION_NAME_MAX_SIZE} characters found in <PartitionName>"
-            )
-            return False
-        if (
-            raw_fwentry.UpdatePath.PartitionName
-            == FVC_h.GlobalStaticVariable.PARTITION_NAME_SYSFW_VERSION
-        ):
-            print(
-                f"Error: Partition name {FVC_h.GlobalStaticVariable.PARTITION_NAME_SYSFW_VERSION} is not allowed, Otherwise version conflict will occur when different binary is used"
-            )
-            return False
-        meta_data_fwentry.UpdatePath.PartitionName[
-            : len(raw_fwentry.UpdatePath.PartitionName)
-        ] = bytearray(raw_fwentry.UpdatePath.PartitionName, "utf-8")
-
-    # Dest PartitionTypeGuid
-    if raw_fwentry.UpdatePath.PartitionTypeGUID:
-        if meta_data_fwentry.UpdateType == FVC_h.FWENTRY_UPDATE_TYPE.FWCLASS_GUID:
-            print("ERROR: <Dest> is not supported for UPDATE_FWCLASS_GUID")
-            return False
-
-        s_temp = raw_fwentry.UpdatePath.PartitionTypeGUID.strip("{}")
-        if s_temp:
-            try:
-                uuid_obj = uuid.UUID(s_temp)
-                meta_data_fwentry.UpdatePath.PartitionTypeGUID = (ctypes.c_byte * 16)(
-                    *uuid_obj.bytes
+                store_field(
+                    meta_image, None, "FileName", image.FileName.encode("utf-16-le")
                 )
-
-            except ValueError as e:
-                print(f"ERROR: Failure creating partitionTypeGuid(error: {e}).\n")
-                return False
-
-    # Dest FileName
-    if raw_fwentry.UpdatePath.FileName:
-        if meta_data_fwentry.UpdateType == FVC_h.FWENTRY_UPDATE_TYPE.FWCLASS_GUID:
-            print("ERROR: <Dest> is not supported for UPDATE_FWCLASS_GUID")
-            return False
-
-        if (
-            len(raw_fwentry.UpdatePath.FileName)
-            > FVC_h.GlobalStaticVariable.FILE_NAME_MAX_SIZE
-        ):
-            print(
-                f"Error: More than {FVC_h.GlobalStaticVariable.FILE_NAME_MAX_SIZE} characters found in <FileName>"
+            store_field(
+                meta_image,
+                None,
+                "ARValidationType",
+                image.ARValidationType.encode("utf-16-le"),
             )
-            return False
-        meta_data_fwentry.UpdatePath.FileName = raw_fwentry.UpdatePath.FileName
-
-    # Backup DiskType
-    if raw_fwentry.BackupPath.DiskType:
-        if meta_data_fwentry.UpdateType == FVC_h.FWENTRY_UPDATE_TYPE.FWCLASS_GUID:
-            print("ERROR: <Backup> is not supported for UPDATE_FWCLASS_GUID")
-            return False
-
-        if raw_fwentry.BackupPath.DiskType.upper() in g_dynamic_var.dDiskTypeByString:
-            meta_data_fwentry.BackupPath.DiskType = g_dynamic_var.dDiskTypeByString[
-                raw_fwentry.BackupPath.DiskType.upper()
-            ]
-        else:
-            print(
-                f"Dest <DiskType> {raw_fwentry.BackupPath.DiskType} is not recognized"
-            )
-            return False
-
-    # Backup PartitionName
-    if raw_fwentry.BackupPath.PartitionName:
-        if meta_data_fwentry.UpdateType == FVC_h.FWENTRY_UPDATE_TYPE.FWCLASS_GUID:
-            print("ERROR: <Backup> is not supported for UPDATE_FWCLASS_GUID")
-            return False
 
-        if (
-            len(raw_fwentry.BackupPath.PartitionName)
-            > FVC_h.GlobalStaticVariable.PARTITION_NAME_MAX_SIZE
-        ):
-            print(
-                f"Error: More than {FVC_h.GlobalStaticVariable.PARTITION_NAME_MAX_SIZE} characters found in <PartitionName>"
+        meta_data_fwentry.ARValidation.ImageCount = len(images)
+        return errors
+
+    def check_required(self, raw_fwentry, meta_data_fwentry):
+        """The fields an UPDATE entry of its UpdateType is missing."""
+        if meta_data_fwentry.Operation != FVC_h.FWENTRY_OPERATION_TYPE.UPDATE:
+            return []
+        operation, dest_fields, needs_backup = REQUIRED_FIELDS[
+            meta_data_fwentry.UpdateType
+        ]
+        if operation is None:
+            return []
+
+        errors = []
+        if raw_fwentry.InputBinary is None:
+            errors.append(
+                f"Empty <InputBinary> tag is not allowed for {operation} operation"
             )
-            return False
-        if (
-            raw_fwentry.BackupPath.PartitionName
-            == FVC_h.GlobalStaticVariable.PARTITION_NAME_SYSFW_VERSION
-        ):
-            print(
-                f"Error: Partition name {FVC_h.GlobalStaticVariable.PARTITION_NAME_SYSFW_VERSION} is not allowed, Otherwise version conflict will occur when different binary is used"
-            )
-            return False
-        meta_data_fwentry.BackupPath.PartitionName[
-            : len(raw_fwentry.BackupPath.PartitionName)
-        ] = bytearray(raw_fwentry.BackupPath.PartitionName, "utf-8")
-
-    # Backup PartitionTypeGuid
-    if raw_fwentry.BackupPath.PartitionTypeGUID:
-        if meta_data_fwentry.UpdateType == FVC_h.FWENTRY_UPDATE_TYPE.FWCLASS_GUID:
-            print("ERROR: <Backup> is not supported for UPDATE_FWCLASS_GUID")
-            return False
-
-        s_temp = raw_fwentry.BackupPath.PartitionTypeGUID.strip("{}")
-        if s_temp:
-            try:
-                uuid_obj = uuid.UUID(s_temp)
-                meta_data_fwentry.BackupPath.PartitionTypeGUID = (ctypes.c_byte * 16)(
-                    *uuid_obj.bytes
-                )
-            except ValueError as e:
-                print(f"ERROR: Failure creating partitionTypeGuid(error: {e}).\n")
-                return False
-
-    # Backup FileName
-    if raw_fwentry.BackupPath.FileName:
-        if meta_data_fwentry.UpdateType == FVC_h.FWENTRY_UPDATE_TYPE.FWCLASS_GUID:
-            print("ERROR: <Backup> is not supported for UPDATE_FWCLASS_GUID")
-            return False
-
-        if (
-            len(raw_fwentry.BackupPath.FileName)
-            > FVC_h.GlobalStaticVariable.FILE_NAME_MAX_SIZE
+        for tag, path, fields in (
+            ("Dest", raw_fwentry.UpdatePath, dest_fields),
+            (
+                "Backup",
+                raw_fwentry.BackupPath,
+                PARTITION_PATH_FIELDS if needs_backup else (),
+            ),
         ):
-            print(
-                f"Error: More than {FVC_h.GlobalStaticVariable.FILE_NAME_MAX_SIZE} characters found in <FileName>"
-            )
-            return False
-        meta_data_fwentry.BackupPath.FileName = raw_fwentry.BackupPath.FileName
-
-    return True
+            for field in fields:
+                if getattr(path, field) is None:
+                    errors.append(
+                        f"Empty <{field}> tag in <{tag}> is not allowed for "
+                        f"{'partition' if tag == 'Backup' else operation} operation"
+                    )
+        return errors
 
 
 def assign_file_guid_for_fw_entry(raw_fwentry, meta_data_fwentry, g_dynamic_var):
@@ -383,12 +342,13 @@ def assign_file_guid_for_fw_entry(raw_fwentry, meta_data_fwentry, g_dynamic_var)
             s_temp_guid1 = g_dynamic_var.dFileGuidByDestDppItemFile[
                 raw_fwentry.UpdatePath.FileName.upper()
             ].strip("{}")
-            raw_fwentry.FileGuid = s_temp_guid1
             try:
-                meta_data_fwentry.FileGuid = uuid.UUID(s_temp_guid1)
+                uuid_obj = uuid.UUID(s_temp_guid1)
             except ValueError as e:
                 print(f"ERROR: Failure creating FileGuid(error: {e}).\n")
                 return False
+            meta_data_fwentry.FileGuid = (ctypes.c_byte * 16)(*uuid_obj.bytes)
+            raw_fwentry.FileGuid = meta_data_fwentry.FileGuid
             return True
 
     try:
@@ -403,83 +363,7 @@ def assign_file_guid_for_fw_entry(raw_fwentry, meta_data_fwentry, g_dynamic_var)
     return True
 
 
-def fw_entry_fields_combination_checking(raw_fwentry, meta_data_fwentry, g_dynamic_var):
-    if meta_data_fwentry.Operation == FVC_h.FWENTRY_OPERATION_TYPE.UPDATE:
-        if meta_data_fwentry.UpdateType == FVC_h.FWENTRY_UPDATE_TYPE.PARTITION:
-            if partition_fields_checking(
-                raw_fwentry, raw_fwentry.UpdatePath, meta_data_fwentry.UpdatePath
-            ):
-                if meta_data_fwentry.BackupType == FVC_h.FWENTRY_BACKUP_TYPE.PARTITION:
-                    if partition_fields_checking(
-                        raw_fwentry,
-                        raw_fwentry.BackupPath,
-                        meta_data_fwentry.BackupPath,
-                    ):
-                        print("Firmware entry validated\n")
-                        return True
-                    print("BackupPath partition validation failed")
-                    return False
-                if meta_data_fwentry.BackupType == FVC_h.FWENTRY_BACKUP_TYPE.FAT_FILE:
-                    print("Invalid BackupPath")
-                    return False
-            print("UpdatePath partition validation failed")
-            return False
-
-        if meta_data_fwentry.UpdateType == FVC_h.FWENTRY_UPDATE_TYPE.FWCLASS_GUID:
-            print("Firmware entry validated\n")
-            return True
-
-        if meta_data_fwentry.UpdateType == FVC_h.FWENTRY_UPDATE_TYPE.FAT_FILE:
-            return False
-
-        if meta_data_fwentry.UpdateType in [
-            FVC_h.FWENTRY_UPDATE_TYPE.DPP_QCOM,
-            FVC_h.FWENTRY_UPDATE_TYPE.DPP_OEM,
-        ]:
-            if dpp_fields_checking(
-                raw_fwentry, raw_fwentry.UpdatePath, meta_data_fwentry.UpdatePath
-            ):
-                if meta_data_fwentry.BackupType == FVC_h.FWENTRY_BACKUP_TYPE.FAT_FILE:
-                    return False
-                if meta_data_fwentry.BackupType == FVC_h.FWENTRY_BACKUP_TYPE.PARTITION:
-                    if partition_fields_checking(
-                        raw_fwentry,
-                        raw_fwentry.BackupPath,
-                        meta_data_fwentry.BackupPath,
-                    ):
-                        print("Firmware entry validated\n")
-                        return True
-                    return False
-                return False
-            return False
-
-        if meta_data_fwentry.UpdateType == FVC_h.FWENTRY_UPDATE_TYPE.OPM_PRIV_KEY:
-            if dpp_fields_checking(
-                raw_fwentry, raw_fwentry.UpdatePath, meta_data_fwentry.UpdatePath
-            ):
-                if meta_data_fwentry.BackupType == FVC_h.FWENTRY_BACKUP_TYPE.FAT_FILE:
-                    return False
-                if meta_data_fwentry.BackupType == FVC_h.FWENTRY_BACKUP_TYPE.PARTITION:
-                    if partition_fields_checking(
-                        raw_fwentry,
-                        raw_fwentry.BackupPath,
-                        meta_data_fwentry.BackupPath,
-                    ):
-                        print("Firmware entry validated\n")
-                        return True
-                    return False
-                return False
-            return False
-
-        return False
-
-    if meta_data_fwentry.Operation == FVC_h.FWENTRY_OPERATION_TYPE.IGNORE:
-        return True
-
-    return False
-
-
-def fw_entry_validation(raw_fwentry, meta_data_fwentry, g_dynamic_var):
+def print_fw_entry(raw_fwentry, g_dynamic_var):
     print("Validating firmware entry...")
     print("============================")
     print(
@@ -509,28 +393,124 @@ def fw_entry_validation(raw_fwentry, meta_data_fwentry, g_dynamic_var):
     )
     print(f"    BackupPath <FileName>          = {raw_fwentry.BackupPath.FileName}")
 
-    if not fw_entry_fields_value_checking(
-        raw_fwentry, meta_data_fwentry, g_dynamic_var
-    ):
-        return False
 
+def fw_entry_errors(raw_fwentry, meta_data_fwentry, g_dynamic_var, rules):
+    """
+    About:
+        Apply *rules* (a FwEntryRules) to one FwEntry, filling in
+        meta_data_fwentry.  The required fields are only checked once
+        every given field converted, and a FileGuid is only assigned to
+        an entry without violations.
+
+    Return:
+        list: The violations found, empty if the entry is valid.
+    """
+    errors = rules.check_fields(raw_fwentry, meta_data_fwentry)
+    if errors:
+        return errors
+    errors = rules.check_required(raw_fwentry, meta_data_fwentry)
+    if errors:
+        return errors
     if not assign_file_guid_for_fw_entry(raw_fwentry, meta_data_fwentry, g_dynamic_var):
-        return False
+        return ["Failure creating FileGuid"]
+    if meta_data_fwentry.Operation == FVC_h.FWENTRY_OPERATION_TYPE.UPDATE:
+        print("Firmware entry validated\n")
+    return []
 
-    if not fw_entry_fields_combination_checking(
-        raw_fwentry, meta_data_fwentry, g_dynamic_var
-    ):
-        return False
 
-    return True
+def fw_entry_validation(raw_fwentry, meta_data_fwentry, g_dynamic_var, rules=None):
+    print_fw_entry(raw_fwentry, g_dynamic_var)
+    if rules is None:
+        rules = FwEntryRules(g_dynamic_var)
+    errors = fw_entry_errors(raw_fwentry, meta_data_fwentry, g_dynamic_var, rules)
+    for error in errors:
+        print(f"ERROR: {error}")
+    return not errors
 
 
-def fw_entry_list_validation_main(g_dynamic_var):
-    base_match_identifier = None
-    target_match_identifier = None
+def fw_entry_name(index, raw_fwentry):
+    return f"FwEntry {index + 1} ({raw_fwentry.InputBinary})"
 
-    for i in range(len(g_dynamic_var.XmlRawFwEntryList)):
-        raw_fw_entry_temp = g_dynamic_var.XmlRawFwEntryList.popleft()
+
+def partition_key(dev_path):
+    # Normalized partition target: the DiskType and the metadata's byte
+    # encodings of the PartitionTypeGUID and PartitionName.
+    return (
+        dev_path.DiskType,
+        bytes(dev_path.PartitionTypeGUID),
+        bytes(dev_path.PartitionName),
+    )
+
+
+def claim_partition(claims, key, entry, match_identifier, kind):
+    """
+    About:
+        Claim the partition target *key* for *entry*, an (index,
+        XML_RAW_FWENTRY) pair.  Entries may share a target only if both
+        have a MatchIdentifier and their identifiers and InputBinaries
+        differ; claims[key] indexes the owners by None (no identifier),
+        ("match", identifier) and ("binary", InputBinary) to check that.
+
+    Return:
+        str: The conflict, naming both entries, or None.
+    """
+    owners = claims.get(key)
+    if owners is None:
+        owners = claims[key] = {"first": entry}
+    else:
+        binary = entry[1].InputBinary
+        if match_identifier is None or None in owners:
+            other = owners.get(None, owners["first"])
+            reason = ""
+        elif ("match", match_identifier) in owners:
+            other = owners[("match", match_identifier)]
+            reason = " with same match identifier"
+        elif ("binary", binary) in owners:
+            other = owners[("binary", binary)]
+            reason = " with same input binary"
+        else:
+            other = None
+        if other is not None:
+            return (
+                f"same partition {kind} path{reason} found in the list: "
+                f"{fw_entry_name(*other)} and {fw_entry_name(*entry)}."
+            )
+
+    if match_identifier is None:
+        owners[None] = entry
+    else:
+        owners[("match", match_identifier)] = entry
+    owners[("binary", entry[1].InputBinary)] = entry
+    return None
+
+
+def fw_entry_list_validation_main(g_dynamic_var, collect_all=False):
+    """
+    About:
+        Validate g_dynamic_var.XmlRawFwEntryList, filling
+        g_dynamic_var.QpayloadFwEntryList with the metadata entry of every
+        FwEntry that is not ignored.
+
+    Args:
+        g_dynamic_var : The build's BuildContext.
+        collect_all   : Keep going after a violation and list all of them
+                        at the end, instead of stopping at the first.
+
+    Return:
+        bool: True if every FwEntry is valid.
+    """
+    rules = FwEntryRules(g_dynamic_var)
+    validated_entries = []
+    errors = []
+
+    def report(error):
+        # Record a violation; False when validation should stop here.
+        if not collect_all:
+            print(f"ERROR: {error}")
+        errors.append(error)
+        return collect_all
+
+    for i, raw_fw_entry in enumerate(g_dynamic_var.XmlRawFwEntryList):
         m_fw_entry = FVC_h.QPAYLOAD_METADATA_FWENTRY()
         m_fw_entry.UpdatePath = FVC_h.FWENTRY_DEVICE_PATH(0x0)
         m_fw_entry.BackupPath = FVC_h.FWENTRY_DEVICE_PATH(0x0)
@@ -539,227 +519,130 @@ def fw_entry_list_validation_main(g_dynamic_var):
                 b"\0" * FVC_h.GlobalStaticVariable.MATCH_IDENTIFIER_NAME_MAX_SIZE
             )
 
-        if fw_entry_validation(raw_fw_entry_temp, m_fw_entry, g_dynamic_var):
-            if m_fw_entry.Operation != FVC_h.FWENTRY_OPERATION_TYPE.IGNORE:
-                g_dynamic_var.QpayloadFwEntryList.append(m_fw_entry)
-        else:
-            print("ERROR: Error validating firmware entry.")
-            return False
-        g_dynamic_var.XmlRawFwEntryList.append(raw_fw_entry_temp)
+        print_fw_entry(raw_fw_entry, g_dynamic_var)
+        entry_errors = fw_entry_errors(raw_fw_entry, m_fw_entry, g_dynamic_var, rules)
+        if entry_errors:
+            for error in entry_errors:
+                if not report(f"{fw_entry_name(i, raw_fw_entry)}: {error}"):
+                    print("ERROR: Error validating firmware entry.")
+                    return False
+            continue
+        if m_fw_entry.Operation != FVC_h.FWENTRY_OPERATION_TYPE.IGNORE:
+            g_dynamic_var.QpayloadFwEntryList.append(m_fw_entry)
+            validated_entries.append((i, raw_fw_entry, m_fw_entry))
 
     # FlashType exclusive checking
     print("FlashType exclusive checking\n")
-    for i in range(len(g_dynamic_var.QpayloadFwEntryList)):
-        m_fw_entry = g_dynamic_var.QpayloadFwEntryList[i]
-        if m_fw_entry.UpdateType != FVC_h.FWENTRY_UPDATE_TYPE.FWCLASS_GUID:
-            if m_fw_entry.UpdateType not in [
-                FVC_h.FWENTRY_UPDATE_TYPE.DPP_QCOM,
-                FVC_h.FWENTRY_UPDATE_TYPE.DPP_OEM,
-                FVC_h.FWENTRY_UPDATE_TYPE.OPM_PRIV_KEY,
-            ]:
-                if (
-                    g_dynamic_var.DeviceFlashType
-                    not in g_dynamic_var.dFlashTypeByDiskType[
-                        FVC_h.FWENTRY_DISK_TYPE(m_fw_entry.UpdatePath.DiskType)
-                    ]
-                ):
-                    print(
-                        f"ERROR1: DiskType {g_dynamic_var.dDiskTypeByValue[FVC_h.FWENTRY_DISK_TYPE(m_fw_entry.UpdatePath.DiskType)]} can't be used on a {g_dynamic_var.dFlashTypeByValue[g_dynamic_var.DeviceFlashType]} device."
-                    )
-                    return False
-
+    flash_type = g_dynamic_var.dFlashTypeByValue[g_dynamic_var.DeviceFlashType]
+    for i, raw_fw_entry, m_fw_entry in validated_entries:
+        if m_fw_entry.UpdateType == FVC_h.FWENTRY_UPDATE_TYPE.FWCLASS_GUID:
+            continue
+        paths = [("Backup", m_fw_entry.BackupPath)]
+        if m_fw_entry.UpdateType not in [
+            FVC_h.FWENTRY_UPDATE_TYPE.DPP_QCOM,
+            FVC_h.FWENTRY_UPDATE_TYPE.DPP_OEM,
+            FVC_h.FWENTRY_UPDATE_TYPE.OPM_PRIV_KEY,
+        ]:
+            paths.insert(0, ("Dest", m_fw_entry.UpdatePath))
+        for tag, path in paths:
+            disk_type = FVC_h.FWENTRY_DISK_TYPE(path.DiskType)
             if (
                 g_dynamic_var.DeviceFlashType
-                not in g_dynamic_var.dFlashTypeByDiskType[
-                    FVC_h.FWENTRY_DISK_TYPE(m_fw_entry.BackupPath.DiskType)
-                ]
+                not in g_dynamic_var.dFlashTypeByDiskType[disk_type]
             ):
-                print(
-                    f"ERROR2: DiskType {g_dynamic_var.dDiskTypeByValue[FVC_h.FWENTRY_DISK_TYPE(m_fw_entry.BackupPath.DiskType)]} can't be used on a {g_dynamic_var.dFlashTypeByValue[g_dynamic_var.DeviceFlashType]} device."
+                if not report(
+                    f"{fw_entry_name(i, raw_fw_entry)}: {tag} <DiskType> "
+                    f"{g_dynamic_var.dDiskTypeByValue[disk_type]} can't be used on a "
+                    f"{flash_type} device."
+                ):
+                    return False
+
+    # DPP item name, partition device path, FileGuid and MatchIdentifier
+    # exclusive checking, in one pass: each entry is looked up in, then
+    # added to, an index of the values claimed by the entries before it.
+    print("FwEntry exclusive checking\n")
+    dpp_names = {}
+    update_claims = {}
+    backup_claims = {}
+    file_guids = {}
+
+    for i, raw_fw_entry, m_fw_entry in validated_entries:
+        entry = (i, raw_fw_entry)
+
+        if m_fw_entry.UpdateType in [
+            FVC_h.FWENTRY_UPDATE_TYPE.DPP_QCOM,
+            FVC_h.FWENTRY_UPDATE_TYPE.DPP_OEM,
+        ]:
+            # DPP item names are matched case-insensitively, as in
+            # dFileGuidByDestDppItemFile.
+            key = (m_fw_entry.UpdateType, raw_fw_entry.UpdatePath.FileName.upper())
+            if key in dpp_names:
+                owner = (
+                    "QCOM"
+                    if m_fw_entry.UpdateType == FVC_h.FWENTRY_UPDATE_TYPE.DPP_QCOM
+                    else "OEM"
                 )
-                return False
+                if not report(
+                    f"duplicated {owner} type DPP items found in the list: "
+                    f"{raw_fw_entry.UpdatePath.FileName} in "
+                    f"{fw_entry_name(*dpp_names[key])} and {fw_entry_name(*entry)}."
+                ):
+                    return False
+            else:
+                dpp_names[key] = entry
+
+        if m_fw_entry.UpdateType == FVC_h.FWENTRY_UPDATE_TYPE.PARTITION:
+            update_key = partition_key(m_fw_entry.UpdatePath)
+            backup_key = partition_key(m_fw_entry.BackupPath)
+            conflicts = []
+            if update_key == backup_key:
+                conflicts.append(
+                    "same partition update path and backup path found in "
+                    f"the same entry: {fw_entry_name(*entry)}."
+                )
+            for key, claims in (
+                (update_key, backup_claims),
+                (backup_key, update_claims),
+            ):
+                if key in claims:
+                    conflicts.append(
+                        "same partition update path and backup path found in "
+                        f"the list: {fw_entry_name(*claims[key]['first'])} and "
+                        f"{fw_entry_name(*entry)}."
+                    )
 
-    # QCOM Dpp Item Name exclusive checking
-    print("QCOM Dpp Item Name exclusive checking\n")
-    for i in range(len(g_dynamic_var.QpayloadFwEntryList)):
-        m_fw_entry_base = g_dynamic_var.QpayloadFwEntryList[i]
-
-        if m_fw_entry_base.UpdateType == FVC_h.FWENTRY_UPDATE_TYPE.DPP_QCOM:
-            base_file_name = "".join(m_fw_entry_base.UpdatePath.FileName)
-
-            for j in range(i + 1, len(g_dynamic_var.QpayloadFwEntryList)):
-                m_fw_entry_target = g_dynamic_var.QpayloadFwEntryList[j]
-                if m_fw_entry_target.UpdateType == FVC_h.FWENTRY_UPDATE_TYPE.DPP_QCOM:
-                    target_file_name = "".join(m_fw_entry_target.UpdatePath.FileName)
-                    if base_file_name == target_file_name:
-                        print(
-                            "ERROR: duplicated QCOM type DPP items found in the list."
-                        )
-                        return False
-
-    # OEM Dpp Item Name exclusive checking
-    print("OEM Dpp Item Name exclusive checking\n")
-    for i in range(len(g_dynamic_var.QpayloadFwEntryList)):
-        m_fw_entry_base = g_dynamic_var.QpayloadFwEntryList[i]
-
-        if m_fw_entry_base.UpdateType == FVC_h.FWENTRY_UPDATE_TYPE.DPP_OEM:
-            base_file_name = "".join(m_fw_entry_base.UpdatePath.FileName)
-
-            for j in range(i + 1, len(g_dynamic_var.QpayloadFwEntryList)):
-                m_fw_entry_target = g_dynamic_var.QpayloadFwEntryList[j]
-                if m_fw_entry_target.UpdateType == FVC_h.FWENTRY_UPDATE_TYPE.DPP_OEM:
-                    target_file_name = "".join(m_fw_entry_target.UpdatePath.FileName)
-                    if base_file_name == target_file_name:
-                        print("ERROR: duplicated OEM type DPP items found in the list.")
-                        return False
-
-    # Partition device path exclusive checking
-    print("Partition device path exclusive checking\n")
-    for i in range(len(g_dynamic_var.QpayloadFwEntryList)):
-        m_fw_entry_base = g_dynamic_var.QpayloadFwEntryList[i]
-
-        if m_fw_entry_base.UpdateType == FVC_h.FWENTRY_UPDATE_TYPE.PARTITION:
-            base_update_part_name = "".join(
-                chr(b) for b in m_fw_entry_base.UpdatePath.PartitionName
+            match_identifier = None
+            if g_dynamic_var.isMatchIdentifierInXML:
+                match_identifier = m_fw_entry.MatchIdentifier or None
+            conflicts.append(
+                claim_partition(
+                    update_claims, update_key, entry, match_identifier, "update"
+                )
             )
-            base_backup_part_name = "".join(
-                chr(b) for b in m_fw_entry_base.BackupPath.PartitionName
+            conflicts.append(
+                claim_partition(
+                    backup_claims, backup_key, entry, match_identifier, "backup"
+                )
             )
+            for conflict in conflicts:
+                if conflict and not report(conflict):
+                    return False
 
-            # Case 1: BaseFwEntry's updatePath VS BaseFwEntry's BackupPath.
-            if (
-                m_fw_entry_base.UpdatePath.DiskType
-                == m_fw_entry_base.BackupPath.DiskType
-                and m_fw_entry_base.UpdatePath.PartitionTypeGUID
-                == m_fw_entry_base.BackupPath.PartitionTypeGUID
-                and base_update_part_name == base_backup_part_name
+        file_guid = bytes(m_fw_entry.FileGuid)
+        if file_guid in file_guids:
+            if not report(
+                f"duplicated FileGuid {uuid.UUID(bytes=file_guid)} found in "
+                f"the list: {fw_entry_name(*file_guids[file_guid])} and "
+                f"{fw_entry_name(*entry)}."
             ):
-                print(
-                    "ERROR: same partition update path and backup path found in the same entry."
-                )
                 return False
+        else:
+            file_guids[file_guid] = entry
 
-            for j in range(i + 1, len(g_dynamic_var.QpayloadFwEntryList)):
-                m_fw_entry_target = g_dynamic_var.QpayloadFwEntryList[j]
-                if m_fw_entry_target.UpdateType == FVC_h.FWENTRY_UPDATE_TYPE.PARTITION:
-                    target_update_part_name = "".join(
-                        chr(b) for b in m_fw_entry_target.UpdatePath.PartitionName
-                    )
-                    target_backup_part_name = "".join(
-                        chr(b) for b in m_fw_entry_target.BackupPath.PartitionName
-                    )
-
-                    if g_dynamic_var.isMatchIdentifierInXML:
-                        if any(m_fw_entry_base.MatchIdentifier):
-                            base_match_identifier = "".join(
-                                m_fw_entry_base.MatchIdentifier
-                            )
-                        if any(m_fw_entry_target.MatchIdentifier):
-                            target_match_identifier = "".join(
-                                m_fw_entry_target.MatchIdentifier
-                            )
-
-                    # Case 2: BaseFwEntry's updatePath VS TargetFwEntry's UpdatePath
-                    if (
-                        m_fw_entry_base.UpdatePath.DiskType
-                        == m_fw_entry_target.UpdatePath.DiskType
-                        and m_fw_entry_base.UpdatePath.PartitionTypeGUID
-                        == m_fw_entry_target.UpdatePath.PartitionTypeGUID
-                        and base_update_part_name == target_update_part_name
-                    ):
-                        if not base_match_identifier or not target_match_identifier:
-                            print(
-                                "ERROR: same partition update path found in the list."
-                            )
-                            return False
-                        elif base_match_identifier == target_match_identifier:
-                            print(
-                                "ERROR: same partition update path with same match identifier found in the list."
-                            )
-                            return False
-                        elif base_match_identifier != target_match_identifier:
-                            xml_entry_base = find_xml_raw_fw_entry_node(
-                                m_fw_entry_base, g_dynamic_var
-                            )
-                            xml_entry_target = find_xml_raw_fw_entry_node(
-                                m_fw_entry_target, g_dynamic_var
-                            )
-                            if (
-                                xml_entry_base.InputBinary
-                                == xml_entry_target.InputBinary
-                            ):
-                                print(
-                                    "ERROR: same partition update path with same input binary found in the list."
-                                )
-                                return False
-
-                    # Case 3: BaseFwEntry's updatePath VS TargetFwEntry's BackupPath
-                    if (
-                        m_fw_entry_base.UpdatePath.DiskType
-                        == m_fw_entry_target.BackupPath.DiskType
-                        and m_fw_entry_base.UpdatePath.PartitionTypeGUID
-                        == m_fw_entry_target.BackupPath.PartitionTypeGUID
-                        and base_update_part_name == target_backup_part_name
-                    ):
-                        print(
-                            "ERROR: same partition update path and backup path found in the list."
-                        )
-                        return False
-
-                    # Case 4: BaseFwEntry's BackupPath VS TargetFwEntry's UpdatePath
-                    if (
-                        m_fw_entry_base.BackupPath.DiskType
-                        == m_fw_entry_target.UpdatePath.DiskType
-                        and m_fw_entry_base.BackupPath.PartitionTypeGUID
-                        == m_fw_entry_target.UpdatePath.PartitionTypeGUID
-                        and base_backup_part_name == target_update_part_name
-                    ):
-                        print(
-                            "ERROR: same partition update path and backup path found in the list."
-                        )
-                        return False
-
-                    # Case 5: BaseFwEntry's BackupPath VS TargetFwEntry's BackupPath
-                    if (
-                        m_fw_entry_base.BackupPath.DiskType
-                        == m_fw_entry_target.BackupPath.DiskType
-                        and m_fw_entry_base.BackupPath.PartitionTypeGUID
-                        == m_fw_entry_target.BackupPath.PartitionTypeGUID
-                        and base_backup_part_name == target_backup_part_name
-                    ):
-                        if not base_match_identifier or not target_match_identifier:
-                            print(
-                                "ERROR: same partition backup path found in the list."
-                            )
-                            return False
-                        elif base_match_identifier == target_match_identifier:
-                            print(
-                                "ERROR: same partition backup path with same match identifier found in the list."
-                            )
-                            return False
-                        elif base_match_identifier != target_match_identifier:
-                            xml_entry_base = find_xml_raw_fw_entry_node(
-                                m_fw_entry_base, g_dynamic_var
-                            )
-                            xml_entry_target = find_xml_raw_fw_entry_node(
-                                m_fw_entry_target, g_dynamic_var
-                            )
-                            if (
-                                xml_entry_base.InputBinary
-                                == xml_entry_target.InputBinary
-                            ):
-                                print(
-                                    "ERROR: same partition backup path with same input binary found in the list."
-                                )
-                                return False
-
-    # Fat device path exclusive checking
-    print("Fat device path exclusive checking\n")
-    for i in range(len(g_dynamic_var.QpayloadFwEntryList)):
-        m_fw_entry_base = g_dynamic_var.QpayloadFwEntryList[i]
-
-        if m_fw_entry_base.UpdateType == FVC_h.FWENTRY_UPDATE_TYPE.FAT_FILE:
-            print("Invalid BackupPath")
-            return False
+    if errors:
+        print(f"ERROR: {len(errors)} problem(s) found in the FwEntry list:")
+        for error in errors:
+            print(f"    {error}")
+        return False
 
     return True
@@ -5,9 +5,9 @@
 
 
 import re
-import traceback
 import xml.etree.ElementTree as ET
 from collections import OrderedDict
+from xml.parsers import expat
 
 from . import FVCreation_header as FVC_h
 
@@ -77,136 +77,240 @@ def print_all_level_d(d, indent=0, log_file_obj=None):
             print(d[x])
 
 
-def xml_to_dict(ele):
-    if len(ele) == 0:
-        return ele.text
+class _XmlEntryError(Exception):
+    """A <FwEntry> that cannot be converted to an XML_RAW_FWENTRY."""
 
-    result_dict = OrderedDict()
-    for c in ele:
-        c_dict = xml_to_dict(c)
 
-        if c.tag in result_dict:
-            if type(result_dict[c.tag]) is list:
-                result_dict[c.tag].append(c_dict)
-            else:
-                result_dict[c.tag] = [result_dict[c.tag], c_dict]
-        else:
-            result_dict[c.tag] = c_dict
+def _child_elements(element):
+    """
+    Map each child tag of *element* to its child; a tag that is given more
+    than once maps to None.
+    """
+    children = {child.tag: child for child in element}
+    if len(children) != len(element):
+        seen = set()
+        for child in element:
+            if child.tag in seen:
+                children[child.tag] = None
+            seen.add(child.tag)
+    return children
+
+
+def _child_error(element, children, tag):
+    """Describe why <tag> of *element* is not a single value element."""
+    if tag not in children:
+        return _XmlEntryError(f"<{element.tag}> has no <{tag}>")
+    if children[tag] is None:
+        return _XmlEntryError(f"<{element.tag}> has more than one <{tag}>")
+    return _XmlEntryError(f"<{tag}> holds elements instead of a value")
+
+
+def _child_element(element, children, tag):
+    child = children.get(tag)
+    if child is None:
+        raise _child_error(element, children, tag)
+    return child
+
+
+def _child_text(element, children, tag):
+    child = children.get(tag)
+    if child is None or len(child):
+        raise _child_error(element, children, tag)
+    return child.text
+
+
+def _optional_child_text(element, children, tag):
+    return _child_text(element, children, tag) if tag in children else None
+
+
+def _copy_child_texts(element, children, tags, target):
+    """Set each attribute of *target* named in *tags* to that child's text."""
+    for tag in tags:
+        child = children.get(tag)
+        if child is None or len(child):
+            raise _child_error(element, children, tag)
+        setattr(target, tag, child.text)
+
+
+# Values of a <FwEntry> and of its <Dest>/<Backup>, named as the fields of
+# XML_RAW_FWENTRY and XML_RAW_FWENTRY_DEVICE_PATH.
+_FW_ENTRY_FIELDS = ("Operation", "InputBinary", "InputPath", "UpdateType", "BackupType")
+_DEVICE_PATH_FIELDS = ("DiskType", "PartitionName", "PartitionTypeGUID")
+
+
+def _raw_fw_entry(fw_entry, g_dynamic_var):
+    """Build the XML_RAW_FWENTRY of a closed <FwEntry> element."""
+    children = _child_elements(fw_entry)
+    raw_fw_item = FVC_h.XML_RAW_FWENTRY()
+    _copy_child_texts(fw_entry, children, _FW_ENTRY_FIELDS, raw_fw_item)
+    for tag, path in (
+        ("Dest", raw_fw_item.UpdatePath),
+        ("Backup", raw_fw_item.BackupPath),
+    ):
+        element = _child_element(fw_entry, children, tag)
+        _copy_child_texts(element, _child_elements(element), _DEVICE_PATH_FIELDS, path)
+
+    if g_dynamic_var.isGlymurMode:
+        if "MatchIdentifier" in children:
+            raw_fw_item.MatchIdentifier = _child_text(
+                fw_entry, children, "MatchIdentifier"
+            )
+            g_dynamic_var.isMatchIdentifierInXML = True
+
+        if "BinaryType" in children:
+            raw_fw_item.BinaryType = _child_text(fw_entry, children, "BinaryType")
+            g_dynamic_var.isBinaryTypeInXML = True
+
+        if "ARValidation" in children:
+            ar_validation = _child_element(fw_entry, children, "ARValidation")
+            images = []
+            for image_element in ar_validation.findall("Image"):
+                fields = _child_elements(image_element)
+                images.append(
+                    FVC_h.XML_RAW_FWENTRY_IMAGE(
+                        file_name=_optional_child_text(
+                            image_element, fields, "FileName"
+                        ),
+                        ar_validation_type=_optional_child_text(
+                            image_element, fields, "ARValidationType"
+                        ),
+                    )
+                )
+            if images:
+                raw_fw_item.ARValidation = FVC_h.XML_RAW_FWENTRY_ARVALIDATION(images)
 
-    return result_dict
+    return raw_fw_item
 
 
-def parse_input_xml(s_xml_file, s_breaking_change_number, g_dynamic_var):
+def _fw_entry_line(s_xml_file, index):
+    """
+    Line of the start tag of the *index*-th <FwEntry> in *s_xml_file*.
+    ElementTree does not keep positions, so this re-reads the file; it is
+    only needed to report a malformed entry.
+    """
+    parser = expat.ParserCreate()
+    lines = []
 
+    def start_element(tag, attrs):
+        if tag == "FwEntry":
+            lines.append(parser.CurrentLineNumber)
+
+    parser.StartElementHandler = start_element
     try:
-        tree = ET.parse(s_xml_file)
-        root = tree.getroot()
+        if hasattr(s_xml_file, "read"):
+            s_xml_file.seek(0)
+            parser.ParseFile(s_xml_file)
+        else:
+            with open(s_xml_file, "rb") as f:
+                parser.ParseFile(f)
+    except expat.ExpatError:
+        pass  # a syntax error after the entry; its line is already known
+    return lines[index] if index < len(lines) else 0
 
-    except Exception:
-        print(traceback.format_exc())
-        return False
 
-    result_dict = xml_to_dict(root)
-
-    # print_all_level_d(result_dict)
-
-    # print("\n\n\nin custom code:")
-    if isinstance(result_dict["FwEntry"], OrderedDict):
-        result_dict["FwEntry"] = [result_dict["FwEntry"]]
-    for fw_entry in result_dict["FwEntry"]:
-        raw_fw_item = FVC_h.XML_RAW_FWENTRY()
-
-        raw_fw_item.Operation = fw_entry["Operation"]
-        raw_fw_item.InputBinary = fw_entry["InputBinary"]
-        raw_fw_item.InputPath = fw_entry["InputPath"]
-        raw_fw_item.UpdateType = fw_entry["UpdateType"]
-        raw_fw_item.BackupType = fw_entry["BackupType"]
-        raw_fw_item.UpdatePath.DiskType = fw_entry["Dest"]["DiskType"]
-
-        raw_fw_item.UpdatePath.PartitionName = fw_entry["Dest"]["PartitionName"]
-        raw_fw_item.UpdatePath.PartitionTypeGUID = fw_entry["Dest"]["PartitionTypeGUID"]
-        raw_fw_item.BackupPath.DiskType = fw_entry["Backup"]["DiskType"]
-        raw_fw_item.BackupPath.PartitionName = fw_entry["Backup"]["PartitionName"]
-        raw_fw_item.BackupPath.PartitionTypeGUID = fw_entry["Backup"][
-            "PartitionTypeGUID"
-        ]
+def _xml_source_name(s_xml_file):
+    """Name of *s_xml_file* (a path or a binary file object) for messages."""
+    if hasattr(s_xml_file, "read"):
+        return getattr(s_xml_file, "name", "in-memory FvUpdate.xml")
+    return s_xml_file
 
-        if g_dynamic_var.isGlymurMode:
-            if "MatchIdentifier" in fw_entry:
-                raw_fw_item.MatchIdentifier = fw_entry["MatchIdentifier"]
-                g_dynamic_var.isMatchIdentifierInXML = True
-
-            if "BinaryType" in fw_entry:
-                raw_fw_item.BinaryType = fw_entry["BinaryType"]
-                g_dynamic_var.isBinaryTypeInXML = True
-
-            if "ARValidation" in fw_entry:
-                ar_validation = fw_entry["ARValidation"]
-                image_nodes = ar_validation.get("Image") if ar_validation else None
-                if image_nodes:
-                    if isinstance(image_nodes, OrderedDict):
-                        image_nodes = [image_nodes]
-                    images = []
-                    for image_node in image_nodes:
-                        image = FVC_h.XML_RAW_FWENTRY_IMAGE(
-                            file_name=image_node.get("FileName"),
-                            ar_validation_type=image_node.get("ARValidationType"),
-                        )
-                        images.append(image)
-                    raw_fw_item.ARValidation = FVC_h.XML_RAW_FWENTRY_ARVALIDATION(
-                        images
-                    )
 
-        g_dynamic_var.XmlRawFwEntryList.append(raw_fw_item)
+def _check_metadata(metadata, g_dynamic_var):
+    """Validate a closed <Metadata> element and record its FlashType."""
+    b_found = False
+    media_found = False
+    s_brk_chg_num = "0"
+    s_flash_type_in = "0"
 
-    # print("\n\n\n*******************\n")
+    if len(metadata) != 2:
+        print("ERROR: Malformed XML. MetaData node does not contain two elements.")
+        return False
 
-    metadata_items = root.findall(".//Metadata")
+    # Traversing MetaData entries
+    for child in metadata:
+        if child.tag.lower() == "breakingchangenumber":
+            s_brk_chg_num = (child.text or "").strip()
+            b_found = True
+            continue
 
-    for metadata in metadata_items:
-        b_found = False
-        media_found = False
-        s_brk_chg_num = "0"
-        s_flash_type_in = "0"
+        if child.tag.lower() == "flashtype":
+            s_flash_type_in = (child.text or "").strip()
+            media_found = True
+            continue
 
-        if len(metadata) != 2:
-            print("ERROR: Malformed XML. MetaData node does not contain two elements.")
-            return False
+    if not b_found:
+        print("Warning: MetaData does not contain BreakingChangeNumber element.")
+        return False
 
-        # Traversing MetaData entries
-        for child in metadata:
-            if child.tag.lower() == "breakingchangenumber":
-                s_brk_chg_num = child.text.strip()
-                b_found = True
-                continue
+    if not re.match("^[0-9]+$", s_brk_chg_num):
+        print(
+            "ERROR: Invalid BreakingChangeNumber in the XML file. BreakingChangeNumber should only contain numbers."
+        )
+        return False
 
-            if child.tag.lower() == "flashtype":
-                s_flash_type_in = child.text.strip()
-                media_found = True
-                continue
+    if not media_found:
+        print("Warning: MetaData does not contain FlashType element.")
+        return False
 
-        if not b_found:
-            print("Warning: MetaData does not contain BreakingChangeNumber element.")
-            return False
+    if s_flash_type_in.upper() not in g_dynamic_var.dFlashTypeByString:
+        print(
+            "ERROR: Invalid FlashType in the XML file. FlashType should only be UFS or EMMC."
+        )
+        return False
+    else:
+        g_dynamic_var.DeviceFlashType = g_dynamic_var.dFlashTypeByString[
+            s_flash_type_in.upper()
+        ]
 
-        if not re.match("^[0-9]+$", s_brk_chg_num):
-            print(
-                "ERROR: Invalid BreakingChangeNumber in the XML file. BreakingChangeNumber should only contain numbers."
-            )
-            return False
+    return True
 
-        if not media_found:
-            print("Warning: MetaData does not contain FlashType element.")
-            return False
 
-        if s_flash_type_in.upper() not in g_dynamic_var.dFlashTypeByString:
-            print(
-                "ERROR: Invalid FlashType in the XML file. FlashType should only be UFS or EMMC."
-            )
-            return False
-        else:
-            g_dynamic_var.DeviceFlashType = g_dynamic_var.dFlashTypeByString[
-                s_flash_type_in.upper()
-            ]
+def parse_input_xml(s_xml_file, s_breaking_change_number, g_dynamic_var):
+    """
+    About:
+        Parse FvUpdate.xml in a single streaming pass.  Each <FwEntry> is
+        converted to an XML_RAW_FWENTRY in g_dynamic_var.XmlRawFwEntryList
+        as soon as it closes, and every <Metadata> is checked as it closes;
+        both are then cleared, so the whole tree is never held in memory.
+
+    Args:
+        s_xml_file: Path of FvUpdate.xml, or a binary file object
+            holding it -> str / BinaryIO
+        s_breaking_change_number: Unused -> str
+        g_dynamic_var: Receives the entries, DeviceFlashType and the
+            MatchIdentifier/BinaryType flags -> FVC_h.BuildContext
+
+    Return:
+        True on success; False, after printing the reason (with its line
+        number for a malformed FwEntry), otherwise.
+    """
+    fw_entry_count = 0
+    s_source = _xml_source_name(s_xml_file)
+    try:
+        for _, element in ET.iterparse(s_xml_file):
+            if element.tag == "FwEntry":
+                g_dynamic_var.XmlRawFwEntryList.append(
+                    _raw_fw_entry(element, g_dynamic_var)
+                )
+                fw_entry_count += 1
+                element.clear()
+            elif element.tag == "Metadata":
+                if not _check_metadata(element, g_dynamic_var):
+                    return False
+                element.clear()
+    except OSError as e:
+        print(f"ERROR: Cannot read {s_source}: {e}")
+        return False
+    except ET.ParseError as e:
+        print(f"ERROR: Malformed XML in {s_source}: {e}")
+        return False
+    except _XmlEntryError as e:
+        line = _fw_entry_line(s_xml_file, fw_entry_count)
+        print(f"ERROR: Malformed FwEntry at line {line} of {s_source}: {e}")
+        return False
+
+    if fw_entry_count == 0:
+        print(f"ERROR: Malformed XML. {s_source} has no FwEntry element.")
+        return False
 
     return True
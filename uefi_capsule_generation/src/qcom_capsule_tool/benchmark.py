@@ -0,0 +1,934 @@
+# --------------------------------------------------------------------
+# Copyright (c) 2026 Qualcomm Innovation Center, Inc. All rights reserved.
+# SPDX-License-Identifier: BSD-3-Clause-Clear
+# --------------------------------------------------------------------
+
+"""
+bench: Offline, end-to-end performance benchmark of capsule generation.
+
+Every input is synthesized in a scratch directory, so nothing is
+downloaded and no edk2 tools are needed (FFS/FV/capsule encoding is all
+native):
+
+  Images/img0000.bin ...   random content, --image-size bytes each
+  FvUpdate.xml             --entries FwEntries (UPDATE_PARTITION, UFS)
+  SYSFW_VERSION.bin        written by the sysfw_version stage
+  config.json              the create_config() template
+  certs/                   a throwaway self-signed chain, when openssl
+                           is available (otherwise capsules are unsigned)
+
+For each --entries value the stages of `create` are timed one by one,
+then the whole CapsulePipeline, --repeat times:
+
+  sysfw_version  build and write SYSFW_VERSION.bin
+  version_parse  read and validate SYSFW_VERSION.bin
+  xml_parse      XmlParser.parse_input_xml
+  validation     XmlFwEntryValidation.fw_entry_list_validation_main
+  metadata       generate_sys_fw_meta_data_file
+  ffs            generate_sys_fw_ffs_list
+  fv             generate_fv
+  json_update    UpdateJsonParameters.UpdateJsonFile
+  capsule        fmp_capsule.generate_capsule
+  create         CapsulePipeline.run (all of the above)
+
+--micro NAME runs a microbenchmark on a synthetic --micro-size buffer
+instead (add --entries to run both). Each first checks the optimized
+code against the loop it replaced:
+
+  dtb_scan       patch_capsule_cert._scan_dtbs / _find_dtb_magic
+  dtb_patch      patch_capsule_cert.set_dtb_property on a --micro-size DTB
+  checksum       checksum.sum8 / checksum16 on --micro-size bytes and crc32
+                 on a 28-byte SYSFW_VERSION.bin payload
+
+Results are written as JSON (-o). `--compare BASELINE.json` matches
+cases by entry count and image size (or microbenchmark and size) and
+fails when a stage's best time grew by more than --threshold percent.
+
+Usage:
+    qcom-capsule-tool bench --entries 8 32 128 --image-size 1M -o bench.json
+    qcom-capsule-tool bench --entries 8 32 128 --compare bench.json
+    qcom-capsule-tool bench --micro dtb_scan --micro-size 64M
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from . import FVCreation as FVC
+from . import FVCreation_header as FVC_h
+from . import SYSFW_VERSION_program as SYSFW
+from . import UpdateJsonParameters as UJP
+from . import XmlFwEntryValidation as XFEV
+from . import XmlParser as xp
+from . import fmp_capsule
+from .capsule_pipeline import (
+    FIRMWARE_FV_FILE,
+    FV_UPDATE_XML_FILE,
+    SYSFW_VERSION_FILE,
+    CapsulePipeline,
+    CapsulePipelineError,
+)
+
+RESULTS_FORMAT = 1
+
+STAGES = (
+    "sysfw_version",
+    "version_parse",
+    "xml_parse",
+    "validation",
+    "metadata",
+    "ffs",
+    "fv",
+    "json_update",
+    "capsule",
+    "create",
+)
+
+DEFAULT_ENTRIES = [8, 32]
+DEFAULT_IMAGE_SIZE = 1024 * 1024
+DEFAULT_REPEAT = 3
+DEFAULT_MICRO_SIZE = 64 * 1024 * 1024
+DEFAULT_THRESHOLD = 10.0
+# Stages faster than this are too noisy to flag as regressions.
+MIN_REGRESSION_SECONDS = 0.005
+
+FW_VERSION = "0.0.1.2"
+LOWEST_FW_VERSION = "0.0.0.0"
+FMP_GUID = "6F25BFD2-A165-468B-980F-AC51A0A45C52"
+CONFIG_FILE = "config.json"
+CAPSULE_FILE = "capsule_file.cap"
+IMAGES_DIR = "Images"
+
+
+class BenchmarkError(Exception):
+    """Raised when a benchmarked stage fails."""
+
+
+@dataclass
+class Fixture:
+    """Synthetic inputs for one benchmark case."""
+
+    work_dir: str
+    entries: int
+    image_size: int
+    fv_xml: bytes
+    p: str = ""
+    x: str = ""
+    oc: str = ""
+
+    @property
+    def images(self) -> str:
+        return os.path.join(self.work_dir, IMAGES_DIR)
+
+    @property
+    def signed(self) -> bool:
+        return bool(self.p)
+
+
+# ============================================================
+# Fixtures
+# ============================================================
+
+
+def parse_size(text: str) -> int:
+    """Parse a byte count with an optional K/M/G suffix (binary units)."""
+    units = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+    text = text.strip().upper()
+    scale = 1
+    if text and text[-1] in units:
+        scale = units[text[-1]]
+        text = text[:-1]
+    try:
+        value = int(text) * scale
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size: {text!r}")
+    if value < 0:
+        raise argparse.ArgumentTypeError(f"invalid size: {text!r}")
+    return value
+
+
+def make_fv_xml(entries: int, rng: random.Random) -> bytes:
+    """Return an FvUpdate.xml with *entries* UFS partition updates."""
+    lines = [
+        '<?xml version="1.0" encoding="utf-8"?>',
+        "<FVItems>",
+        "  <Metadata>",
+        "    <BreakingChangeNumber>0</BreakingChangeNumber>",
+        "    <FlashType>UFS</FlashType>",
+        "  </Metadata>",
+    ]
+    for i in range(entries):
+        dest_guid = str(uuid.UUID(int=rng.getrandbits(128), version=4)).upper()
+        backup_guid = str(uuid.UUID(int=rng.getrandbits(128), version=4)).upper()
+        lines += [
+            "  <FwEntry>",
+            f"    <InputBinary>img{i:04d}.bin</InputBinary>",
+            f"    <InputPath>{IMAGES_DIR}</InputPath>",
+            "    <Operation>UPDATE</Operation>",
+            "    <UpdateType>UPDATE_PARTITION</UpdateType>",
+            "    <BackupType>BACKUP_PARTITION</BackupType>",
+            "    <Dest>",
+            "      <DiskType>UFS_LUN4</DiskType>",
+            f"      <PartitionName>img{i:04d}_a</PartitionName>",
+            f"      <PartitionTypeGUID>{{{dest_guid}}}</PartitionTypeGUID>",
+            "    </Dest>",
+            "    <Backup>",
+            "      <DiskType>UFS_LUN4</DiskType>",
+            f"      <PartitionName>img{i:04d}_b</PartitionName>",
+            f"      <PartitionTypeGUID>{{{backup_guid}}}</PartitionTypeGUID>",
+            "    </Backup>",
+            "  </FwEntry>",
+        ]
+    lines.append("</FVItems>")
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def _make_certs(cert_dir: str) -> Optional[Sequence[str]]:
+    """Create a throwaway self-signed signer; return (p, x, oc) or None."""
+    openssl = shutil.which("openssl")
+    if openssl is None:
+        return None
+    os.makedirs(cert_dir, exist_ok=True)
+    key = os.path.join(cert_dir, "bench.key")
+    cert = os.path.join(cert_dir, "bench.pub.pem")
+    result = subprocess.run(
+        [
+            openssl,
+            "req",
+            "-x509",
+            "-newkey",
+            "rsa:2048",
+            "-nodes",
+            "-days",
+            "1",
+            "-subj",
+            "/CN=qcom-capsule-tool bench",
+            "-keyout",
+            key,
+            "-out",
+            cert,
+        ],
+        capture_output=True,
+    )
+    if result.returncode != 0:
+        return None
+    signer = os.path.join(cert_dir, "bench.pem")
+    with open(signer, "wb") as out:
+        for path in (key, cert):
+            with open(path, "rb") as f:
+                out.write(f.read())
+    return signer, cert, cert
+
+
+def make_fixture(
+    work_dir: str,
+    entries: int,
+    image_size: int,
+    seed: int = 0,
+    sign: bool = True,
+) -> Fixture:
+    """Write the synthetic inputs for one case into *work_dir*."""
+    rng = random.Random(seed)
+    os.makedirs(os.path.join(work_dir, IMAGES_DIR), exist_ok=True)
+    for i in range(entries):
+        with open(os.path.join(work_dir, IMAGES_DIR, f"img{i:04d}.bin"), "wb") as f:
+            f.write(rng.randbytes(image_size))
+
+    fixture = Fixture(work_dir, entries, image_size, make_fv_xml(entries, rng))
+    if sign:
+        certs = _make_certs(os.path.join(work_dir, "certs"))
+        if certs is None:
+            print("WARNING: openssl not available, capsules will be unsigned.")
+        else:
+            fixture.p, fixture.x, fixture.oc = certs
+    return fixture
+
+
+# ============================================================
+# Stages
+# ============================================================
+
+
+@contextlib.contextmanager
+def _chdir(path: str) -> Iterator[None]:
+    cwd = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(cwd)
+
+
+def _timed(timings: Dict[str, float], name: str, fn: Callable[[], object]) -> None:
+    start = time.perf_counter()
+    ok = fn()
+    timings[name] = time.perf_counter() - start
+    if ok is False or ok is None:
+        raise BenchmarkError(f"stage {name} failed")
+
+
+_SIGNING_KEYS = (
+    "OpenSslSignerPrivateCertFile",
+    "OpenSslOtherPublicCertFile",
+    "OpenSslTrustedPublicCertFile",
+    "SigningToolPath",
+)
+
+
+def _reset_config(fixture: Fixture) -> None:
+    # UpdateJsonFile edits config.json in place; start every run from
+    # the template so runs are identical.
+    if os.path.exists(CONFIG_FILE):
+        os.remove(CONFIG_FILE)
+    UJP.create_config()
+    if fixture.signed:
+        return
+    # Empty certificate paths are an error, as in GenerateCapsule.py;
+    # an unsigned payload must not list them at all.
+    with open(CONFIG_FILE) as f:
+        config = json.load(f, object_pairs_hook=OrderedDict)
+    for payload in config["Payloads"]:
+        for key in _SIGNING_KEYS:
+            payload.pop(key, None)
+    with open(CONFIG_FILE, "w") as f:
+        json.dump(config, f, indent=4)
+
+
+def _json_args(fixture: Fixture, version_data) -> argparse.Namespace:
+    return argparse.Namespace(
+        JsonFile=CONFIG_FILE,
+        FwType="SYS_FW",
+        BinFile=SYSFW_VERSION_FILE,
+        SigningToolPath=None,
+        OpenSslSignerPrivateCertFile=fixture.p,
+        OpenSslTrustedPublicCertFile=fixture.x,
+        OpenSslOtherPublicCertFile=fixture.oc,
+        Payload=FIRMWARE_FV_FILE,
+        Guid=FMP_GUID,
+        FwVersion=hex(version_data.FwVersion),
+        LowestSupportedVersion=hex(version_data.LowestSupportedFwVersion),
+    )
+
+
+def run_stages(
+    fixture: Fixture, jobs: Optional[int] = None, stream: bool = False
+) -> Dict[str, float]:
+    """Run each `create` stage once in *fixture*; return seconds per stage."""
+    timings: Dict[str, float] = {}
+    g_dynamic_var = FVC_h.BuildContext()
+    ls_ffs: List = []
+    state: Dict[str, object] = {}
+
+    with open(FV_UPDATE_XML_FILE, "wb") as f:
+        f.write(fixture.fv_xml)
+    _reset_config(fixture)
+
+    def sysfw_version():
+        version_data = SYSFW.build_version_data(FW_VERSION, LOWEST_FW_VERSION)
+        if version_data is None:
+            return False
+        state["version_data"] = version_data
+        return SYSFW.write_binary_file(version_data, SYSFW_VERSION_FILE)
+
+    def version_parse():
+        fw_ver_binary_data = FVC.get_versions_from_sys_fw_ver_binary_file(
+            SYSFW_VERSION_FILE, None
+        )
+        state["fw_ver_binary_data"] = fw_ver_binary_data
+        return bool(fw_ver_binary_data) and FVC.validate_sys_fw_ver_binary_file(
+            fw_ver_binary_data
+        )
+
+    _timed(timings, "sysfw_version", sysfw_version)
+    _timed(timings, "version_parse", version_parse)
+    _timed(
+        timings,
+        "xml_parse",
+        lambda: xp.parse_input_xml(FV_UPDATE_XML_FILE, "0", g_dynamic_var),
+    )
+    _timed(
+        timings,
+        "validation",
+        lambda: XFEV.fw_entry_list_validation_main(g_dynamic_var),
+    )
+    _timed(
+        timings,
+        "metadata",
+        lambda: FVC.generate_sys_fw_meta_data_file(
+            state["fw_ver_binary_data"], "0", g_dynamic_var
+        ),
+    )
+    _timed(
+        timings,
+        "ffs",
+        lambda: FVC.generate_sys_fw_ffs_list(
+            ls_ffs,
+            "GenFfs.exe",
+            [fixture.images],
+            g_dynamic_var,
+            jobs=jobs,
+            stream=stream,
+        ),
+    )
+    _timed(
+        timings,
+        "fv",
+        lambda: FVC.generate_fv(FIRMWARE_FV_FILE, ls_ffs, "GenFv.exe"),
+    )
+    _timed(
+        timings,
+        "json_update",
+        lambda: UJP.UpdateJsonFile(_json_args(fixture, state["version_data"])),
+    )
+
+    def capsule():
+        fmp_capsule.generate_capsule(CONFIG_FILE, CAPSULE_FILE, ["PersistAcrossReset"])
+        return True
+
+    _timed(timings, "capsule", capsule)
+    return timings
+
+
+def run_create(
+    fixture: Fixture, jobs: Optional[int] = None, stream: bool = False
+) -> float:
+    """Run the whole CapsulePipeline once in *fixture*; return seconds."""
+    _reset_config(fixture)
+    pipeline = CapsulePipeline(
+        fwver=FW_VERSION,
+        lfwver=LOWEST_FW_VERSION,
+        config=CONFIG_FILE,
+        p=fixture.p,
+        x=fixture.x,
+        oc=fixture.oc,
+        guid=FMP_GUID,
+        capsule=CAPSULE_FILE,
+        images=fixture.images,
+        storage_type="UFS",
+        target="bench",
+        jobs=jobs,
+        fv_xml=fixture.fv_xml,
+        stream=stream,
+    )
+    start = time.perf_counter()
+    try:
+        pipeline.run()
+    except CapsulePipelineError as e:
+        raise BenchmarkError(f"stage create failed: {e}")
+    return time.perf_counter() - start
+
+
+def _summarize(runs: List[float]) -> Dict[str, object]:
+    return {
+        "min": min(runs),
+        "median": statistics.median(runs),
+        "runs": runs,
+    }
+
+
+def run_case(
+    fixture: Fixture,
+    repeat: int = DEFAULT_REPEAT,
+    jobs: Optional[int] = None,
+    stream: bool = False,
+) -> Dict[str, object]:
+    """Time every stage *repeat* times; return the case's result record."""
+    runs: Dict[str, List[float]] = {name: [] for name in STAGES}
+    with _chdir(fixture.work_dir):
+        for _ in range(repeat):
+            # The stages log every entry; keep that out of the timings'
+            # output, but not out of the timings themselves.
+            with contextlib.redirect_stdout(io.StringIO()):
+                for name, seconds in run_stages(fixture, jobs, stream).items():
+                    runs[name].append(seconds)
+                runs["create"].append(run_create(fixture, jobs, stream))
+        capsule_size = os.path.getsize(CAPSULE_FILE)
+
+    return {
+        "entries": fixture.entries,
+        "image_size": fixture.image_size,
+        "signed": fixture.signed,
+        "capsule_size": capsule_size,
+        "stages": {name: _summarize(runs[name]) for name in STAGES},
+    }
+
+
+def run_benchmark(
+    entries: Sequence[int] = DEFAULT_ENTRIES,
+    image_size: int = DEFAULT_IMAGE_SIZE,
+    repeat: int = DEFAULT_REPEAT,
+    work_dir: Optional[str] = None,
+    jobs: Optional[int] = None,
+    stream: bool = False,
+    sign: bool = True,
+    seed: int = 0,
+    micro: Sequence[str] = (),
+    micro_size: int = DEFAULT_MICRO_SIZE,
+) -> Dict[str, Any]:
+    """Run one case per entry count and one per *micro* benchmark name;
+    return the full results document.
+
+    Fixtures go to *work_dir* (kept) or to a temporary directory that is
+    removed afterwards.
+    """
+    results: Dict[str, Any] = {
+        "format": RESULTS_FORMAT,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "params": {
+            "image_size": image_size,
+            "repeat": repeat,
+            "jobs": jobs,
+            "stream": stream,
+            "seed": seed,
+            "micro_size": micro_size,
+        },
+        "cases": [],
+    }
+    cases: List[Dict[str, object]] = []
+    with contextlib.ExitStack() as stack:
+        if work_dir is None:
+            work_dir = stack.enter_context(
+                tempfile.TemporaryDirectory(prefix="qct-bench-")
+            )
+        for n in entries:
+            case_dir = os.path.abspath(os.path.join(work_dir, f"entries_{n}"))
+            print(f"INFO: {n} entries x {image_size} bytes in {case_dir}")
+            fixture = make_fixture(case_dir, n, image_size, seed, sign)
+            cases.append(run_case(fixture, repeat, jobs, stream))
+    for name in micro:
+        cases.append(run_micro(name, micro_size, repeat, seed))
+    results["cases"] = cases
+    return results
+
+
+# ============================================================
+# Microbenchmarks
+# ============================================================
+#
+# Each microbenchmark builds its input, checks the current code against
+# a copy of the loop it replaced, and returns the callables to time.
+
+
+def _scan_dtbs_loop(data: bytes) -> List[tuple]:
+    """patch_capsule_cert._scan_dtbs before the bytes.find() scanner."""
+    results = []
+    i = 0
+    while i <= len(data) - 8:
+        if struct.unpack(">I", data[i : i + 4])[0] == 0xD00DFEED:
+            size = struct.unpack(">I", data[i + 4 : i + 8])[0]
+            if size >= 8 and i + size <= len(data):
+                results.append((i, size))
+                i = (i + size + 3) & ~3
+                continue
+        i += 4
+    return results
+
+
+def _has_dtb_loop(data: bytes) -> bool:
+    """patch_capsule_cert._has_dtb_segment's per-segment loop, before."""
+    for i in range(0, len(data) - 3, 4):
+        if struct.unpack(">I", data[i : i + 4])[0] == 0xD00DFEED:
+            return True
+    return False
+
+
+def _micro_dtb_scan(size: int, rng: random.Random) -> Dict[str, Callable[[], object]]:
+    from . import patch_capsule_cert as pcc
+
+    # A segment with no DTB is the worst case for both scans (detection
+    # reads it all); the second one has a DTB header every 1 MiB plus
+    # unaligned decoys and a bogus totalsize.
+    magic = struct.pack(">I", pcc.DTB_MAGIC)
+    plain = rng.randbytes(size).replace(magic, b"\0" * 4)
+    dtbs = bytearray(plain)
+    for off in range(0, size - 16392, 1024 * 1024):
+        dtbs[off : off + 8] = magic + struct.pack(">I", 4096)
+        dtbs[off + 8193 : off + 8197] = magic
+        dtbs[off + 16384 : off + 16392] = magic + struct.pack(">I", size)
+    segment = bytes(dtbs)
+
+    if pcc._scan_dtbs(segment) != _scan_dtbs_loop(segment):
+        raise BenchmarkError("dtb_scan: _scan_dtbs differs from the reference loop")
+    if (pcc._find_dtb_magic(plain) != -1) != _has_dtb_loop(plain):
+        raise BenchmarkError("dtb_scan: _find_dtb_magic differs from the reference")
+    return {
+        "scan_dtbs": lambda: pcc._scan_dtbs(segment),
+        "scan_dtbs_loop": lambda: _scan_dtbs_loop(segment),
+        "find_magic": lambda: pcc._find_dtb_magic(plain),
+        "find_magic_loop": lambda: _has_dtb_loop(plain),
+    }
+
+
+def _patch_dtb_tempfile(
+    dtb_bytes: bytes, node_path: str, cert_inc_path: str, prop_name: str
+) -> bytes:
+    """patch_capsule_cert._patch_dtb before in-memory patching."""
+    from . import patch_capsule_cert as pcc
+
+    tmp_in = tmp_out = ""
+    try:
+        tmp_in_fd, tmp_in = tempfile.mkstemp(suffix=".dtb")
+        os.close(tmp_in_fd)
+        with open(tmp_in, "wb") as f:
+            f.write(dtb_bytes)
+        tmp_out_fd, tmp_out = tempfile.mkstemp(suffix=".dtb")
+        os.close(tmp_out_fd)
+        os.unlink(tmp_out)
+        pcc._set_dtb_property(
+            tmp_in, node_path, prop_name, f"@list:{cert_inc_path}", tmp_out
+        )
+        with open(tmp_out, "rb") as f:
+            return f.read()
+    finally:
+        for p in (tmp_in, tmp_out):
+            try:
+                os.unlink(p)
+            except OSError:
+                pass
+
+
+def _micro_dtb_patch(size: int, rng: random.Random) -> Dict[str, Callable[[], object]]:
+    import libfdt
+
+    from . import patch_capsule_cert as pcc
+    from .BinToHex import bin_to_hex
+
+    # A *size*-byte DTB whose cert property grows from 600 bytes to a
+    # 1.5 KiB certificate, so every patch also takes the resize path.
+    prop = pcc._DEFAULT_PROP_NAME
+    sw = libfdt.FdtSw()
+    sw.finish_reservemap()
+    sw.begin_node("")
+    sw.property("blob", rng.randbytes(max(size - 1024, 0) & ~3))
+    sw.begin_node("sw")
+    sw.begin_node("uefi")
+    sw.begin_node("uefiplat")
+    sw.property(prop, rng.randbytes(600))
+    sw.end_node()
+    sw.end_node()
+    sw.end_node()
+    sw.end_node()
+    fdt = sw.as_fdt()
+    fdt.pack()
+    dtb = bytes(fdt.as_bytearray())
+    node_path = "/sw/uefi/uefiplat"
+
+    scratch = tempfile.TemporaryDirectory(prefix="qct-micro-")
+    cer_path = os.path.join(scratch.name, "cert.cer")
+    inc_path = os.path.join(scratch.name, "cert.inc")
+    cert = rng.randbytes(1537)
+    with open(cer_path, "wb") as f:
+        f.write(cert)
+    with contextlib.redirect_stdout(io.StringIO()):
+        bin_to_hex(cer_path, inc_path)
+    value = pcc.encode_cert_value(cert)
+
+    if value != pcc._encode_dtb_value(f"@list:{inc_path}"):
+        raise BenchmarkError("dtb_patch: encode_cert_value differs from bin_to_hex")
+    patched = pcc.set_dtb_property(dtb, node_path, prop, value)
+    if patched != _patch_dtb_tempfile(dtb, node_path, inc_path, prop):
+        raise BenchmarkError("dtb_patch: set_dtb_property differs from the reference")
+
+    def via_tempfiles() -> bytes:
+        # Referencing *scratch* keeps the directory alive while timed.
+        inc = os.path.join(scratch.name, "cert.inc")
+        return _patch_dtb_tempfile(dtb, node_path, inc, prop)
+
+    return {
+        "in_memory": lambda: pcc.set_dtb_property(dtb, node_path, prop, value),
+        "tempfile": via_tempfiles,
+    }
+
+
+def _crc32_loop(data: bytes) -> int:
+    """checksum.crc32 before zlib: the bit-by-bit CalcCRC32_i."""
+
+    def reflect(value: int, bits: int) -> int:
+        result = 0
+        for i in range(bits):
+            if value & 1:
+                result |= 1 << (bits - 1 - i)
+            value >>= 1
+        return result
+
+    regs = 0xFFFFFFFF
+    for byte in data:
+        byte = reflect(byte, 8)
+        for _ in range(8):
+            msb = (byte >> 7) & 1
+            regs_msb = (regs >> 31) & 1
+            regs = (regs << 1) & 0xFFFFFFFF
+            if regs_msb ^ msb:
+                regs ^= 0x04C11DB7
+            byte <<= 1
+    return reflect(regs, 32) ^ 0xFFFFFFFF
+
+
+def _checksum16_loop(data: bytes) -> int:
+    """checksum.checksum16 before struct.unpack: one word at a time."""
+    total = 0
+    for i in range(0, len(data) - 1, 2):
+        total += data[i] | data[i + 1] << 8
+    return -total & 0xFFFF
+
+
+def _micro_checksum(size: int, rng: random.Random) -> Dict[str, Callable[[], object]]:
+    from . import checksum
+
+    # The bit loop is far too slow for --micro-size, so CRC-32 is timed on
+    # what it is used for: the 28-byte SYSFW_VERSION.bin payload.
+    version_blob = rng.randbytes(28)
+    data = rng.randbytes(size & ~1)
+
+    if checksum.crc32(version_blob) != _crc32_loop(version_blob):
+        raise BenchmarkError("checksum: crc32 differs from the bit loop")
+    if checksum.checksum8(data) != -sum(data) & 0xFF:
+        raise BenchmarkError("checksum: checksum8 differs from sum()")
+    if checksum.checksum16(data) != _checksum16_loop(data):
+        raise BenchmarkError("checksum: checksum16 differs from the word loop")
+    return {
+        "crc32_28b": lambda: checksum.crc32(version_blob),
+        "crc32_28b_loop": lambda: _crc32_loop(version_blob),
+        "sum8": lambda: checksum.sum8(data),
+        "sum8_builtin": lambda: sum(data) & 0xFF,
+        "checksum16": lambda: checksum.checksum16(data),
+        "checksum16_loop": lambda: _checksum16_loop(data),
+    }
+
+
+MICROBENCHMARKS: Dict[
+    str, Callable[[int, random.Random], Dict[str, Callable[[], object]]]
+] = {
+    "dtb_scan": _micro_dtb_scan,
+    "dtb_patch": _micro_dtb_patch,
+    "checksum": _micro_checksum,
+}
+
+
+def run_micro(
+    name: str, size: int, repeat: int = DEFAULT_REPEAT, seed: int = 0
+) -> Dict[str, object]:
+    """Run microbenchmark *name* on a *size*-byte input; return its record."""
+    print(f"INFO: {name} on {size} bytes")
+    timed = MICROBENCHMARKS[name](size, random.Random(seed))
+    runs: Dict[str, List[float]] = {label: [] for label in timed}
+    for _ in range(repeat):
+        for label, fn in timed.items():
+            start = time.perf_counter()
+            fn()
+            runs[label].append(time.perf_counter() - start)
+    return {
+        "micro": name,
+        "size": size,
+        "stages": {label: _summarize(runs[label]) for label in timed},
+    }
+
+
+# ============================================================
+# Reporting
+# ============================================================
+
+
+def _case_key(case: Dict) -> tuple:
+    if "micro" in case:
+        return ("micro", case["micro"], case["size"])
+    return ("create", case["entries"], case["image_size"])
+
+
+def _case_label(case: Dict) -> str:
+    if "micro" in case:
+        return f"{case['micro']} on {case['size']} bytes"
+    return f"{case['entries']} entries x {case['image_size']} bytes"
+
+
+def print_results(results: Dict) -> None:
+    for case in results["cases"]:
+        print()
+        label = _case_label(case)
+        if "signed" in case:
+            label += f" ({'signed' if case['signed'] else 'unsigned'})"
+        print(label)
+        print(f"  {'Stage':<16} {'min':>10} {'median':>10}")
+        for name, stage in case["stages"].items():
+            print(
+                f"  {name:<16} {stage['min'] * 1000:>8.1f}ms"
+                f" {stage['median'] * 1000:>8.1f}ms"
+            )
+
+
+def compare_results(
+    baseline: Dict, current: Dict, threshold: float = DEFAULT_THRESHOLD
+) -> List[str]:
+    """Print baseline vs current best times; return the regressed stages."""
+    regressions = []
+    base_cases = {_case_key(case): case for case in baseline["cases"]}
+    for case in current["cases"]:
+        base = base_cases.get(_case_key(case))
+        label = _case_label(case)
+        print()
+        if base is None:
+            print(f"{label}: not in baseline")
+            continue
+        if base.get("signed") != case.get("signed"):
+            label += " (signing differs from baseline)"
+        print(label)
+        print(f"  {'Stage':<16} {'baseline':>10} {'current':>10} {'change':>8}")
+        for name, stage in case["stages"].items():
+            if name not in base["stages"]:
+                continue
+            old = base["stages"][name]["min"]
+            new = stage["min"]
+            change = (new - old) / old * 100 if old else 0.0
+            flag = ""
+            if change > threshold and new - old > MIN_REGRESSION_SECONDS:
+                flag = "  REGRESSION"
+                regressions.append(f"{label}: {name} {change:+.1f}%")
+            print(
+                f"  {name:<16} {old * 1000:>8.1f}ms {new * 1000:>8.1f}ms"
+                f" {change:>+7.1f}%{flag}"
+            )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="qcom-capsule-tool bench",
+        description="Time capsule generation on synthetic inputs.",
+    )
+    parser.add_argument(
+        "--entries",
+        type=int,
+        nargs="+",
+        help=f"FwEntry counts to benchmark (default: {DEFAULT_ENTRIES}, "
+        "or none with --micro)",
+    )
+    parser.add_argument(
+        "--image-size",
+        type=parse_size,
+        default=DEFAULT_IMAGE_SIZE,
+        help="Size of each synthetic image, e.g. 256K or 4M (default: 1M)",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=DEFAULT_REPEAT,
+        help=f"Runs per case; the best and median are reported (default: {DEFAULT_REPEAT})",
+    )
+    parser.add_argument(
+        "--jobs", type=int, help="Parallel FFS jobs (default: one per CPU)"
+    )
+    parser.add_argument(
+        "--stream", action="store_true", help="Benchmark the streaming FV mode"
+    )
+    parser.add_argument(
+        "--no-sign",
+        action="store_true",
+        help="Encode unsigned capsules (no openssl needed)",
+    )
+    parser.add_argument(
+        "--micro",
+        action="append",
+        default=[],
+        choices=sorted(MICROBENCHMARKS),
+        help="Run a microbenchmark (may be repeated)",
+    )
+    parser.add_argument(
+        "--micro-size",
+        type=parse_size,
+        default=DEFAULT_MICRO_SIZE,
+        help="Input size for --micro (default: 64M)",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="Seed for the synthetic inputs"
+    )
+    parser.add_argument(
+        "--work-dir", help="Keep the fixtures here instead of a temporary directory"
+    )
+    parser.add_argument("-o", "--output", help="Write the results to this JSON file")
+    parser.add_argument(
+        "--compare", metavar="BASELINE", help="Compare against a results JSON file"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f"Regression threshold in percent for --compare (default: {DEFAULT_THRESHOLD})",
+    )
+    args = parser.parse_args()
+
+    if args.entries is None:
+        args.entries = [] if args.micro else DEFAULT_ENTRIES
+    if args.repeat < 1 or any(n < 1 for n in args.entries):
+        parser.error("--repeat and --entries must be positive")
+
+    baseline = None
+    if args.compare:
+        try:
+            with open(args.compare) as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error: Cannot read {args.compare}: {e}")
+            sys.exit(1)
+        if baseline.get("format") != RESULTS_FORMAT:
+            print(f"Error: {args.compare} is not a bench results file")
+            sys.exit(1)
+
+    try:
+        results = run_benchmark(
+            entries=args.entries,
+            image_size=args.image_size,
+            repeat=args.repeat,
+            work_dir=args.work_dir,
+            jobs=args.jobs,
+            stream=args.stream,
+            sign=not args.no_sign,
+            seed=args.seed,
+            micro=args.micro,
+            micro_size=args.micro_size,
+        )
+    except BenchmarkError as e:
+        print(f"Error: {str(e)}")
+        sys.exit(1)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4)
+        print(f"INFO: Results written to {args.output}")
+
+    if baseline is None:
+        print_results(results)
+        return
+
+    for key in ("stream", "jobs"):
+        old, new = baseline["params"].get(key), results["params"][key]
+        if old != new:
+            print(f"WARNING: baseline ran with {key}={old}, this run with {key}={new}.")
+    regressions = compare_results(baseline, results, args.threshold)
+    if regressions:
+        print()
+        print(f"{len(regressions)} stage(s) slower than {args.threshold}%:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,81 +4,47 @@
 # --------------------------------------------------------------------
 
 import argparse
-import os
-import subprocess
-import sys
 
+from .capsule_pipeline import CapsulePipeline, CapsulePipelineError
 
-def run_command(command, fail_on_error=False):
-    try:
-        result = subprocess.run(command, shell=True, capture_output=True, text=True)
-        if result.returncode != 0:
-            raise Exception(
-                f"Command failed with return code {result.returncode}: {result.stderr}"
-            )
-        print(result.stdout)
-    except Exception as e:
-        print(f"Error: {str(e)}")
-        exit(1)
-
-
-def _run(args):
 
-    python = sys.executable
+# Options that describe a single capsule; --matrix reads them from its spec.
+_SINGLE_BUILD_OPTIONS = (
+    ("fwver", "-fwver"),
+    ("lfwver", "-lfwver"),
+    ("config", "-config"),
+    ("p", "-p"),
+    ("x", "-x"),
+    ("oc", "-oc"),
+    ("guid", "-guid"),
+    ("capsule", "-capsule"),
+    ("images", "-images"),
+    ("StorageType", "-S/--StorageType"),
+    ("target", "-T/--target"),
+)
 
-    if args.setup:
-        run_command(f"{python} -m qcom_capsule_tool.capsule_setup", fail_on_error=True)
-    # Step 1: Generate SYSFW_VERSION.bin
-    run_command(
-        f"{python} -m qcom_capsule_tool.SYSFW_VERSION_program -Gen -FwVer {args.fwver} -LFwVer {args.lfwver} -O SYSFW_VERSION.bin"
-    )
 
-    # Step 2: Create FvUpdate.xml
-    ptool_path_arg = f"--ptool-path {args.ptool_path}" if args.ptool_path else ""
-    run_command(
-        f"{python} -m qcom_capsule_tool.UpdateFvXml -S {args.StorageType} -T {args.target} {ptool_path_arg}"
-    )
-
-    # Step 3: Create firmware volume
-    edk2_path_arg = f"--edk2-path {args.edk2_path}" if args.edk2_path else ""
-    glymur_arg = "--glymur" if args.target.lower() == "glymur" else ""
-    run_command(
-        f'{python} -m qcom_capsule_tool.FVCreation firmware.fv "-FvType" "SYS_FW" "FvUpdate.xml" SYSFW_VERSION.bin {args.images} {edk2_path_arg} {glymur_arg}'
-    )
-
-    # Step 4: Update JSON parameters
-    run_command(
-        f"{python} -m qcom_capsule_tool.UpdateJsonParameters -j {args.config} -f SYS_FW -b SYSFW_VERSION.bin -pf firmware.fv -p {args.p} -x {args.x} -oc {args.oc} -g {args.guid}"
-    )
-
-    # Step 5: Generate capsule. Resolve edk2 path explicitly so we never depend
-    # on cwd-relative GenerateCapsule.py copies; default to $PWD/edk2 (where
-    # `qcom-capsule-tool setup` clones it).
-    edk2 = args.edk2_path if args.edk2_path else os.path.join(os.getcwd(), "edk2")
-    generate_capsule = os.path.join(
-        edk2, "BaseTools", "Source", "Python", "Capsule", "GenerateCapsule.py"
-    )
-    pythonpath = os.path.join(edk2, "BaseTools", "Source", "Python")
-    run_command(
-        f"PYTHONPATH={pythonpath} python3 {generate_capsule} -e -j {args.config} -o {args.capsule} --capflag PersistAcrossReset -v"
-    )
+def _run(args):
+    try:
+        CapsulePipeline.from_args(args).run()
+    except CapsulePipelineError as e:
+        print(f"Error: {str(e)}")
+        exit(1)
 
 
 def main():
     parser = argparse.ArgumentParser(
         description="Combined script for Capsule generation"
     )
-    parser.add_argument("-fwver", required=True, help="Firmware version")
-    parser.add_argument(
-        "-lfwver", required=True, help="Lowest supported firmware version"
-    )
-    parser.add_argument("-config", required=True, help="Configuration JSON file")
-    parser.add_argument("-p", required=True, help="Certificate file")
-    parser.add_argument("-x", required=True, help="Root certificate file")
-    parser.add_argument("-oc", required=True, help="Sub certificate file")
-    parser.add_argument("-guid", required=True, help="FMP GUID")
-    parser.add_argument("-capsule", required=True, help="Output capsule file name")
-    parser.add_argument("-images", required=True, help="Images directory")
+    parser.add_argument("-fwver", help="Firmware version")
+    parser.add_argument("-lfwver", help="Lowest supported firmware version")
+    parser.add_argument("-config", help="Configuration JSON file")
+    parser.add_argument("-p", help="Certificate file")
+    parser.add_argument("-x", help="Root certificate file")
+    parser.add_argument("-oc", help="Sub certificate file")
+    parser.add_argument("-guid", help="FMP GUID")
+    parser.add_argument("-capsule", help="Output capsule file name")
+    parser.add_argument("-images", help="Images directory")
     parser.add_argument("-setup", action="store_true", help="Run capsule setup script")
     parser.add_argument(
         "--edk2-path",
@@ -94,18 +60,67 @@ def main():
         help="Path to an existing qcom-ptool directory; "
         "when provided, the repository is not cloned",
     )
+    parser.add_argument(
+        "--use-edk2-tools",
+        dest="use_edk2_tools",
+        action="store_true",
+        help="Run edk2 GenFfs/GenFv/GenerateCapsule.py instead of the "
+        "built-in encoders",
+    )
+    parser.add_argument(
+        "--jobs",
+        dest="jobs",
+        type=int,
+        default=None,
+        help="Number of FFS files to build in parallel, or with --matrix the "
+        "number of capsules (default: CPU count)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        dest="cache_dir",
+        default=None,
+        help="Directory for the FFS cache; unchanged images are not re-encoded",
+    )
+    parser.add_argument(
+        "--cache-size",
+        dest="cache_size",
+        type=int,
+        default=None,
+        help="FFS cache size limit in MiB (default: 4096)",
+    )
+    parser.add_argument(
+        "--stream",
+        dest="stream",
+        action="store_true",
+        help="Encode each image straight into firmware.fv in fixed size "
+        "chunks; memory use does not depend on the image sizes",
+    )
     parser.add_argument(
         "-S",
         "--StorageType",
         choices=["UFS", "EMMC", "NORUFS", "NORNVME"],
-        required=True,
         help="Specify storage type: UFS, EMMC, NORUFS, or NORNVME",
     )
     parser.add_argument(
-        "-T", "--target", required=True, help="Specify target platform (e.g., QCS6490)"
+        "-T", "--target", help="Specify target platform (e.g., QCS6490)"
+    )
+    parser.add_argument(
+        "--matrix",
+        metavar="SPEC",
+        default=None,
+        help="Build every (target, storage type, version) combination listed "
+        "in a JSON matrix spec instead of a single capsule",
     )
 
     args = parser.parse_args()
+    if args.matrix:
+        from . import capsule_matrix
+
+        capsule_matrix.main(args)
+        return
+    missing = [flag for dest, flag in _SINGLE_BUILD_OPTIONS if not getattr(args, dest)]
+    if missing:
+        parser.error(f"the following arguments are required: {', '.join(missing)}")
     _run(args)
 
 
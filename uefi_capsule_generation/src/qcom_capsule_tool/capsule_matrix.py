@@ -0,0 +1,403 @@
+# --------------------------------------------------------------------
+# Copyright (c) 2026 Qualcomm Innovation Center, Inc. All rights reserved.
+# SPDX-License-Identifier: BSD-3-Clause-Clear
+# --------------------------------------------------------------------
+
+"""Build many capsules in one run (`qcom-capsule-tool create --matrix`).
+
+A matrix spec is a JSON file. Top-level keys are defaults for every
+build; each entry of "builds" overrides them, and its "target",
+"storage_type" and "fwver" values may be lists, which expand to every
+combination:
+
+    {
+        "config": "config.json",
+        "p": "Certificates/QcFMPCert.pem",
+        "x": "Certificates/QcFMPRoot.pub.pem",
+        "oc": "Certificates/QcFMPSub.pub.pem",
+        "images": "Images",
+        "lfwver": "0.0.0.0",
+        "output_dir": "capsules",
+        "builds": [
+            {"target": "QCS6490",
+             "guid": "6F25BFD2-A165-468B-980F-AC51A0A45C52",
+             "storage_type": ["UFS", "EMMC"],
+             "fwver": ["0.0.1.2", "0.0.1.3"]},
+            {"target": "Glymur",
+             "guid": "6BA73695-DFDA-44E9-8699-36E1AE77E021",
+             "storage_type": "NORNVME", "fwver": "0.0.1.2",
+             "images": "GlymurImages"}
+        ]
+    }
+
+Relative paths are resolved against the directory of the spec file.
+Each combination is built by a CapsulePipeline in its own working
+directory, <output_dir>/<target>_<storage_type>_<fwver>/, with its output
+in build.log there.
+
+Work that does not depend on the combination is done once in the parent
+process: setup and edk2/qcom-ptool path resolution, checking that the
+certificate files exist, and FvUpdate.xml generation (one
+partitions.conf parse per target and storage type). Signing itself runs
+openssl on the certificate files in every build. Builds share a cache
+(<output_dir>/cache unless --cache-dir is given), so with
+--use-edk2-tools an image used by several builds goes through GenFfs
+once. Combinations are scheduled across a process pool.
+A build that fails, for whatever reason, is reported in the summary and
+does not stop the others.
+"""
+
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import shutil
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from . import UpdateFvXml, capsule_setup
+from .capsule_pipeline import CapsulePipeline, CapsulePipelineError
+
+DEFAULT_OUTPUT_DIR = "capsules"
+DEFAULT_CAPSULE_NAME = "capsule_file.cap"
+BUILD_LOG_FILE = "build.log"
+
+_REQUIRED_KEYS = ("fwver", "lfwver", "config", "p", "x", "oc", "guid", "images")
+_PATH_KEYS = ("config", "p", "x", "oc", "images")
+_EXPANDED_KEYS = ("target", "storage_type", "fwver")
+_STORAGE_TYPES = ("UFS", "EMMC", "NORUFS", "NORNVME")
+
+
+class MatrixSpecError(ValueError):
+    """Raised for an invalid matrix spec."""
+
+
+@dataclass
+class MatrixBuild:
+    """One (target, storage type, version) combination of the matrix."""
+
+    target: str
+    storage_type: str
+    fwver: str
+    lfwver: str
+    guid: str
+    config: str
+    p: str
+    x: str
+    oc: str
+    images: str
+    capsule: str
+    work_dir: str
+    fv_xml: bytes = b""
+
+    @property
+    def name(self) -> str:
+        return f"{self.target}_{self.storage_type}_{self.fwver}"
+
+
+@dataclass
+class MatrixResult:
+    name: str
+    capsule: str
+    seconds: float
+    error: Optional[str] = None
+
+
+def load_matrix_spec(spec_file: str) -> List[MatrixBuild]:
+    """Parse *spec_file* into the list of builds it describes."""
+    try:
+        with open(spec_file) as f:
+            spec = json.load(f)
+    except (OSError, ValueError) as e:
+        raise MatrixSpecError(f"Cannot read matrix spec {spec_file}: {e}")
+    if not isinstance(spec, dict) or not isinstance(spec.get("builds"), list):
+        raise MatrixSpecError(f'{spec_file}: a "builds" list is required')
+
+    base_dir = os.path.dirname(os.path.abspath(spec_file))
+    defaults = {k: v for k, v in spec.items() if k != "builds"}
+    output_dir = os.path.join(base_dir, defaults.pop("output_dir", DEFAULT_OUTPUT_DIR))
+
+    builds = []
+    names = set()
+    for index, entry in enumerate(spec["builds"]):
+        if not isinstance(entry, dict):
+            raise MatrixSpecError(f"{spec_file}: builds[{index}] is not an object")
+        values = dict(defaults, **entry)
+        for key in _REQUIRED_KEYS + _EXPANDED_KEYS:
+            if key not in values:
+                raise MatrixSpecError(f'{spec_file}: builds[{index}] has no "{key}"')
+        for key in _PATH_KEYS:
+            values[key] = os.path.join(base_dir, values[key])
+
+        axes = [
+            values[key] if isinstance(values[key], list) else [values[key]]
+            for key in _EXPANDED_KEYS
+        ]
+        for target, storage_type, fwver in itertools.product(*axes):
+            if storage_type not in _STORAGE_TYPES:
+                raise MatrixSpecError(
+                    f"{spec_file}: builds[{index}]: unknown storage type "
+                    f"{storage_type!r}"
+                )
+            build = MatrixBuild(
+                target=target,
+                storage_type=storage_type,
+                fwver=fwver,
+                lfwver=values["lfwver"],
+                guid=values["guid"],
+                config=values["config"],
+                p=values["p"],
+                x=values["x"],
+                oc=values["oc"],
+                images=values["images"],
+                capsule=values.get("capsule", DEFAULT_CAPSULE_NAME),
+                work_dir="",
+            )
+            if build.name in names:
+                raise MatrixSpecError(f"{spec_file}: {build.name} is listed twice")
+            names.add(build.name)
+            build.work_dir = os.path.join(output_dir, build.name)
+            builds.append(build)
+    return builds
+
+
+def _check_inputs(builds: List[MatrixBuild]) -> None:
+    checked = set()
+    for build in builds:
+        for path in (build.config, build.p, build.x, build.oc):
+            if path in checked:
+                continue
+            if not os.path.isfile(path):
+                raise MatrixSpecError(f"{build.name}: {path} not found")
+            checked.add(path)
+        if not os.path.isdir(build.images):
+            raise MatrixSpecError(f"{build.name}: {build.images} is not a directory")
+
+
+def _generate_fv_xmls(builds: List[MatrixBuild], ptool_path: str) -> Dict[str, str]:
+    """Parse each distinct partitions.conf once and share the FvUpdate.xml.
+
+    Returns the error of every build whose FvUpdate.xml could not be
+    generated, keyed by build name.
+    """
+    fv_xmls: Dict[Tuple[str, str], bytes] = {}
+    errors: Dict[Tuple[str, str], str] = {}
+    failed = {}
+    for build in builds:
+        key = (build.target, build.storage_type)
+        if key not in fv_xmls and key not in errors:
+            try:
+                doc = UpdateFvXml.generate_fv_xml(
+                    storage_type=build.storage_type,
+                    target=build.target,
+                    ptool_path=ptool_path,
+                    output_file=None,
+                )
+            except UpdateFvXml.FvXmlError as e:
+                errors[key] = f"Failed to generate FvUpdate.xml: {e}"
+            else:
+                fv_xmls[key] = doc.toprettyxml(indent="  ", encoding="utf-8")
+        if key in errors:
+            failed[build.name] = errors[key]
+        else:
+            build.fv_xml = fv_xmls[key]
+    return failed
+
+
+def build_one(
+    build: MatrixBuild,
+    edk2_path: Optional[str],
+    use_edk2_tools: bool,
+    jobs: Optional[int],
+    cache_dir: str,
+    cache_size: Optional[int],
+    stream: bool = False,
+) -> MatrixResult:
+    """Build a single combination in its working directory (worker process).
+
+    Any failure is recorded in the result (and its traceback in build.log)
+    rather than raised, so one broken build never stops the matrix.
+    """
+    start = time.monotonic()
+    capsule = os.path.join(build.work_dir, build.capsule)
+    log_file = os.path.join(build.work_dir, BUILD_LOG_FILE)
+    try:
+        os.makedirs(build.work_dir, exist_ok=True)
+        os.chdir(build.work_dir)
+        log = open(log_file, "w")
+    except OSError as e:
+        return MatrixResult(
+            build.name,
+            capsule,
+            time.monotonic() - start,
+            f"Cannot create {log_file}: {e}",
+        )
+
+    error: Optional[str] = None
+    with log, contextlib.redirect_stdout(log):
+        try:
+            # UpdateJsonFile rewrites the config in place; give every build
+            # its own.
+            config = os.path.join(build.work_dir, os.path.basename(build.config))
+            shutil.copyfile(build.config, config)
+            pipeline = CapsulePipeline(
+                fwver=build.fwver,
+                lfwver=build.lfwver,
+                config=config,
+                p=build.p,
+                x=build.x,
+                oc=build.oc,
+                guid=build.guid,
+                capsule=capsule,
+                images=build.images,
+                storage_type=build.storage_type,
+                target=build.target,
+                edk2_path=edk2_path,
+                use_edk2_tools=use_edk2_tools,
+                jobs=jobs,
+                cache_dir=cache_dir,
+                cache_size=cache_size,
+                fv_xml=build.fv_xml,
+                stream=stream,
+            )
+            pipeline.run()
+        except CapsulePipelineError as e:
+            error = str(e)
+        except SystemExit:
+            # Several of the older stages still exit on failure.
+            error = f"build failed, see {log_file}"
+        except Exception as e:
+            print(traceback.format_exc(), end="")
+            error = f"{type(e).__name__}: {e}, see {log_file}"
+        if error:
+            print(f"Error: {error}")
+    return MatrixResult(build.name, capsule, time.monotonic() - start, error)
+
+
+def run_matrix(
+    spec_file: str,
+    edk2_path: Optional[str] = None,
+    ptool_path: Optional[str] = None,
+    setup: bool = False,
+    use_edk2_tools: bool = False,
+    jobs: Optional[int] = None,
+    cache_dir: Optional[str] = None,
+    cache_size: Optional[int] = None,
+    stream: bool = False,
+) -> List[MatrixResult]:
+    """Build every combination of *spec_file*; return one result per build.
+
+    *jobs* bounds the number of combinations built at once (default: one
+    per CPU). The remaining CPUs are given to each build's FFS stage.
+    """
+    builds = load_matrix_spec(spec_file)
+    if not builds:
+        raise MatrixSpecError(f"{spec_file}: no builds listed")
+    _check_inputs(builds)
+
+    if setup:
+        capsule_setup.Main(argparse.Namespace(clean_build=False, full_build=False))
+
+    # Workers change directory, so every tool location must be absolute.
+    if edk2_path is None and os.path.isdir("edk2"):
+        edk2_path = "edk2"
+    if edk2_path is not None:
+        edk2_path = os.path.abspath(edk2_path)
+    if ptool_path is None:
+        UpdateFvXml.safe_clone(UpdateFvXml.DEFAULT_REPO_DIR)
+        ptool_path = UpdateFvXml.DEFAULT_REPO_DIR
+    ptool_path = os.path.abspath(ptool_path)
+
+    # A target without an FvUpdate.xml fails its own builds only.
+    failed = _generate_fv_xmls(builds, ptool_path)
+    results = []
+    for build in builds:
+        if build.name in failed:
+            capsule = os.path.join(build.work_dir, build.capsule)
+            results.append(MatrixResult(build.name, capsule, 0.0, failed[build.name]))
+    pending = [build for build in builds if build.name not in failed]
+
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(builds[0].work_dir), "cache")
+    cache_dir = os.path.abspath(cache_dir)
+
+    cpus = os.cpu_count() or 1
+    if jobs is None:
+        jobs = cpus
+    jobs = max(1, min(jobs, len(pending)))
+    ffs_jobs = max(1, cpus // jobs)
+
+    print(f"INFO: Building {len(pending)} capsules, {jobs} at a time.")
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {
+            executor.submit(
+                build_one,
+                build,
+                edk2_path,
+                use_edk2_tools,
+                ffs_jobs,
+                cache_dir,
+                cache_size,
+                stream,
+            ): build
+            for build in pending
+        }
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                # The worker itself died (e.g. BrokenProcessPool).
+                build = futures[future]
+                error = f"{type(e).__name__}: {e}"
+                result = MatrixResult(
+                    build.name,
+                    os.path.join(build.work_dir, build.capsule),
+                    0.0,
+                    error,
+                )
+            status = "FAILED" if result.error else "ok"
+            print(f"  [{status}] {result.name} ({result.seconds:.1f}s)")
+            results.append(result)
+
+    order = {build.name: i for i, build in enumerate(builds)}
+    results.sort(key=lambda r: order[r.name])
+    return results
+
+
+def print_summary(results: List[MatrixResult]) -> None:
+    width = max(len(r.name) for r in results)
+    print()
+    print(f"{'Build':<{width}}  {'Status':<6}  {'Time':>7}  Capsule / error")
+    for r in results:
+        status = "FAILED" if r.error else "ok"
+        detail = r.error if r.error else r.capsule
+        print(f"{r.name:<{width}}  {status:<6}  {r.seconds:>6.1f}s  {detail}")
+    failed = sum(1 for r in results if r.error)
+    print(f"{len(results) - failed} of {len(results)} capsules built.")
+
+
+def main(args: argparse.Namespace) -> None:
+    """Entry point for `create --matrix`."""
+    try:
+        results = run_matrix(
+            args.matrix,
+            edk2_path=args.edk2_path,
+            ptool_path=args.ptool_path,
+            setup=args.setup,
+            use_edk2_tools=args.use_edk2_tools,
+            jobs=args.jobs,
+            cache_dir=args.cache_dir,
+            cache_size=args.cache_size,
+            stream=args.stream,
+        )
+    except (MatrixSpecError, UpdateFvXml.FvXmlError) as e:
+        print(f"Error: {str(e)}")
+        sys.exit(1)
+    print_summary(results)
+    if any(r.error for r in results):
+        sys.exit(1)
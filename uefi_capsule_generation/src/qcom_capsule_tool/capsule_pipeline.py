@@ -0,0 +1,274 @@
+# --------------------------------------------------------------------
+# Copyright (c) 2026 Qualcomm Innovation Center, Inc. All rights reserved.
+# SPDX-License-Identifier: BSD-3-Clause-Clear
+# --------------------------------------------------------------------
+
+"""In-process capsule generation pipeline.
+
+CapsulePipeline runs the same steps as `qcom-capsule-tool create`
+(SYSFW_VERSION.bin, FvUpdate.xml, firmware.fv, config.json, capsule) inside
+a single interpreter. Each stage keeps its parsed result on the pipeline
+object and hands it to the next stage directly instead of re-reading the
+file the previous stage wrote. The files are still written to the working
+directory so the on-disk artifacts match the step-by-step CLI flow.
+
+Example:
+    pipeline = CapsulePipeline(
+        fwver="0.0.1.2", lfwver="0.0.0.0", config="config.json",
+        p="QcFMPCert.pem", x="QcFMPRoot.pub.pem", oc="QcFMPSub.pub.pem",
+        guid="6F25BFD2-A165-468B-980F-AC51A0A45C52",
+        capsule="capsule_file.cap", images="Images",
+        storage_type="UFS", target="QCS6490",
+    )
+    pipeline.run()
+"""
+
+import argparse
+import io
+import os
+import subprocess
+import sys
+from typing import Optional
+
+from . import FVCreation as FVC
+from . import SYSFW_VERSION_program as SYSFW
+from . import UpdateFvXml
+from . import UpdateJsonParameters as UJP
+from . import capsule_setup, fmp_capsule
+
+SYSFW_VERSION_FILE = "SYSFW_VERSION.bin"
+FV_UPDATE_XML_FILE = "FvUpdate.xml"
+FIRMWARE_FV_FILE = "firmware.fv"
+
+
+class CapsulePipelineError(Exception):
+    """Raised when a pipeline stage fails."""
+
+
+class CapsulePipeline:
+    """Run every capsule generation step in the current process.
+
+    Stage results are exposed as attributes once the stage has run:
+
+    - version_data: SYSFW_VERSION_program.QSYS_FW_VERSION_DATA
+    - fv_xml: FvUpdate.xml contents (bytes); may be passed in to skip
+      the partitions.conf lookup
+    - fv_path: path of the generated firmware volume
+    - config_data: the updated config.json contents (OrderedDict)
+    """
+
+    def __init__(
+        self,
+        fwver: str,
+        lfwver: str,
+        config: str,
+        p: str,
+        x: str,
+        oc: str,
+        guid: str,
+        capsule: str,
+        images: str,
+        storage_type: str,
+        target: str,
+        edk2_path: Optional[str] = None,
+        ptool_path: Optional[str] = None,
+        setup: bool = False,
+        use_edk2_tools: bool = False,
+        jobs: Optional[int] = None,
+        cache_dir: Optional[str] = None,
+        cache_size: Optional[int] = None,
+        fv_xml: Optional[bytes] = None,
+        stream: bool = False,
+    ):
+        self.fwver = fwver
+        self.lfwver = lfwver
+        self.config = config
+        self.p = p
+        self.x = x
+        self.oc = oc
+        self.guid = guid
+        self.capsule = capsule
+        self.images = images
+        self.storage_type = storage_type
+        self.target = target
+        self.edk2_path = edk2_path
+        self.ptool_path = ptool_path
+        self.setup = setup
+        self.use_edk2_tools = use_edk2_tools
+        self.jobs = jobs
+        self.cache_dir = cache_dir
+        self.cache_size = cache_size
+        self.stream = stream
+
+        self.version_data = None
+        self.fv_xml: Optional[bytes] = fv_xml
+        self.fv_path: Optional[str] = None
+        self.config_data = None
+
+    @classmethod
+    def from_args(cls, args: argparse.Namespace) -> "CapsulePipeline":
+        """Build a pipeline from the `create` subcommand's parsed arguments."""
+        return cls(
+            fwver=args.fwver,
+            lfwver=args.lfwver,
+            config=args.config,
+            p=args.p,
+            x=args.x,
+            oc=args.oc,
+            guid=args.guid,
+            capsule=args.capsule,
+            images=args.images,
+            storage_type=args.StorageType,
+            target=args.target,
+            edk2_path=args.edk2_path,
+            ptool_path=args.ptool_path,
+            setup=args.setup,
+            use_edk2_tools=args.use_edk2_tools,
+            jobs=args.jobs,
+            cache_dir=args.cache_dir,
+            cache_size=args.cache_size,
+            stream=args.stream,
+        )
+
+    @property
+    def tools_dir(self) -> Optional[str]:
+        if self.edk2_path is None:
+            return None
+        return os.path.join(self.edk2_path, "BaseTools", "Source", "C", "bin")
+
+    def run(self) -> None:
+        if self.setup:
+            self.run_setup()
+        self.generate_sysfw_version()
+        if self.fv_xml is None:
+            self.generate_fv_xml()
+        else:
+            self.write_fv_xml()
+        self.create_fv()
+        self.update_json()
+        self.generate_capsule()
+
+    def run_setup(self) -> None:
+        capsule_setup.Main(argparse.Namespace(clean_build=False, full_build=False))
+
+    # Step 1: Generate SYSFW_VERSION.bin
+    def generate_sysfw_version(self) -> None:
+        version_data = SYSFW.build_version_data(self.fwver, self.lfwver)
+        if version_data is None:
+            raise CapsulePipelineError("Failed to generate SYSFW_VERSION.bin")
+        SYSFW.write_binary_file(version_data, SYSFW_VERSION_FILE)
+        self.version_data = version_data
+
+    # Step 2: Create FvUpdate.xml
+    def generate_fv_xml(self) -> None:
+        try:
+            doc = UpdateFvXml.generate_fv_xml(
+                storage_type=self.storage_type,
+                target=self.target,
+                ptool_path=self.ptool_path,
+                output_file=FV_UPDATE_XML_FILE,
+            )
+        except UpdateFvXml.FvXmlError as e:
+            raise CapsulePipelineError(f"Failed to generate FvUpdate.xml: {e}")
+        self.fv_xml = doc.toprettyxml(indent="  ", encoding="utf-8")
+
+    def write_fv_xml(self) -> None:
+        """Write an FvUpdate.xml that was passed in instead of generated."""
+        assert self.fv_xml is not None
+        with open(FV_UPDATE_XML_FILE, "wb") as f:
+            f.write(self.fv_xml)
+
+    # Step 3: Create firmware volume
+    def create_fv(self) -> None:
+        if self.version_data is None:
+            self.generate_sysfw_version()
+        if self.fv_xml is None:
+            self.generate_fv_xml()
+        assert self.version_data is not None and self.fv_xml is not None
+
+        # FVCreation keeps its own (identically laid out) copy of the
+        # version structure; convert without going through the file.
+        fw_ver_binary_data = FVC.QSYS_FW_VERSION_DATA.from_bytes(
+            self.version_data.to_bytes()
+        )
+        if not FVC.create_sys_fw_fv(
+            s_output_file_name=FIRMWARE_FV_FILE,
+            s_xml_file_name=io.BytesIO(self.fv_xml),
+            ls_paths=[self.images],
+            fw_ver_binary_data=fw_ver_binary_data,
+            tools_dir=self.tools_dir,
+            glymur_mode=self.target.lower() == "glymur",
+            use_edk2_tools=self.use_edk2_tools,
+            jobs=self.jobs,
+            cache_dir=self.cache_dir,
+            cache_size=self.cache_size,
+            stream=self.stream,
+        ):
+            raise CapsulePipelineError("Failed to create firmware volume")
+        self.fv_path = FIRMWARE_FV_FILE
+
+    # Step 4: Update JSON parameters
+    def update_json(self) -> None:
+        if self.version_data is None:
+            self.generate_sysfw_version()
+        assert self.version_data is not None
+
+        json_args = argparse.Namespace(
+            JsonFile=self.config,
+            FwType="SYS_FW",
+            BinFile=SYSFW_VERSION_FILE,
+            SigningToolPath=None,
+            OpenSslSignerPrivateCertFile=self.p,
+            OpenSslTrustedPublicCertFile=self.x,
+            OpenSslOtherPublicCertFile=self.oc,
+            Payload=self.fv_path or FIRMWARE_FV_FILE,
+            Guid=self.guid,
+            FwVersion=hex(self.version_data.FwVersion),
+            LowestSupportedVersion=hex(self.version_data.LowestSupportedFwVersion),
+        )
+        self.config_data = UJP.UpdateJsonFile(json_args)
+
+    # Step 5: Generate capsule
+    def generate_capsule(self) -> None:
+        if self.use_edk2_tools:
+            self.run_generate_capsule_py()
+            return
+        try:
+            fmp_capsule.generate_capsule(
+                self.config, self.capsule, ["PersistAcrossReset"], verbose=True
+            )
+        except (fmp_capsule.CapsuleError, OSError) as e:
+            raise CapsulePipelineError(f"Failed to generate capsule: {e}")
+
+    # Resolve edk2 path explicitly so we never depend on cwd-relative
+    # GenerateCapsule.py copies; default to $PWD/edk2 (where
+    # `qcom-capsule-tool setup` clones it).
+    def run_generate_capsule_py(self) -> None:
+        edk2 = self.edk2_path if self.edk2_path else os.path.join(os.getcwd(), "edk2")
+        generate_capsule = os.path.join(
+            edk2, "BaseTools", "Source", "Python", "Capsule", "GenerateCapsule.py"
+        )
+        env = os.environ.copy()
+        env["PYTHONPATH"] = os.path.join(edk2, "BaseTools", "Source", "Python")
+        result = subprocess.run(
+            [
+                sys.executable,
+                generate_capsule,
+                "-e",
+                "-j",
+                self.config,
+                "-o",
+                self.capsule,
+                "--capflag",
+                "PersistAcrossReset",
+                "-v",
+            ],
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            raise CapsulePipelineError(
+                f"Command failed with return code {result.returncode}: {result.stderr}"
+            )
+        print(result.stdout)
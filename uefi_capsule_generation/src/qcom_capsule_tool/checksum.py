@@ -0,0 +1,87 @@
+# --------------------------------------------------------------------
+# Copyright (c) 2026 Qualcomm Innovation Center, Inc. All rights reserved.
+# SPDX-License-Identifier: BSD-3-Clause-Clear
+# --------------------------------------------------------------------
+
+"""Checksums and digests shared by the capsule tools.
+
+- crc32: CRC-32 (IEEE 802.3, reflected, init/xorout 0xFFFFFFFF) as used
+  by SYSFW_VERSION.bin, backed by zlib.
+- sum8 / checksum8 / checksum16: the FFS and FV header checksums.
+- sha384 / sha384_file / sha256_file: digests for certificate hashes and
+  cache keys; the file variants read in fixed size chunks.
+
+tests/test_checksum.py checks these against the original bit-by-bit and
+byte-summing implementations.
+"""
+
+import hashlib
+import struct
+import zlib
+from typing import Optional, Union
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+FILE_CHUNK_SIZE = 1024 * 1024
+
+# zlib.adler32 keeps A = 1 + sum(bytes) mod 65521. For at most 256 bytes
+# the sum (<= 65280) never wraps, so A - 1 is the exact byte sum.
+_ADLER_SUM_BLOCK = 256
+
+
+def crc32(data: Buffer, size: Optional[int] = None) -> int:
+    """Return the CRC-32 of the first *size* bytes of *data* (default: all)."""
+    view = memoryview(data)
+    if size is not None:
+        view = view[:size]
+    return zlib.crc32(view) & 0xFFFFFFFF
+
+
+def sum8(data: Buffer, value: int = 0) -> int:
+    """Return (*value* + sum of the bytes of *data*) mod 256.
+
+    Pass the previous result as *value* to sum data that arrives in chunks.
+    """
+    view = memoryview(data).cast("B")
+    total = value
+    for i in range(0, len(view), _ADLER_SUM_BLOCK):
+        total += (zlib.adler32(view[i : i + _ADLER_SUM_BLOCK]) & 0xFFFF) - 1
+    return total & 0xFF
+
+
+def checksum8(data: Buffer) -> int:
+    """Return the byte that makes *data* sum to zero (CalculateChecksum8)."""
+    return -sum8(data) & 0xFF
+
+
+def checksum16(data: Buffer) -> int:
+    """Return the word that makes *data* (UINT16 LE words) sum to zero."""
+    words = struct.unpack(f"<{len(data) // 2}H", data)
+    return -sum(words) & 0xFFFF
+
+
+def sha384(data: Buffer) -> bytes:
+    return hashlib.sha384(data).digest()
+
+
+def _file_digest(path: str, name: str, chunk_size: int) -> bytes:
+    h = hashlib.new(name)
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    with open(path, "rb") as f:
+        while True:
+            n = f.readinto(buffer)
+            if not n:
+                break
+            h.update(view[:n])
+    return h.digest()
+
+
+def sha384_file(path: str, chunk_size: int = FILE_CHUNK_SIZE) -> bytes:
+    """Return the SHA-384 of the file *path*, read in *chunk_size* pieces."""
+    return _file_digest(path, "sha384", chunk_size)
+
+
+def sha256_file(path: str, chunk_size: int = FILE_CHUNK_SIZE) -> bytes:
+    """Return the SHA-256 of the file *path*, read in *chunk_size* pieces."""
+    return _file_digest(path, "sha256", chunk_size)
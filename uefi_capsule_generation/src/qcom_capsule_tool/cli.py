@@ -76,6 +76,20 @@ def _cmd_patch_capsule_cert(argv):
     main()
 
 
+def _cmd_generate_capsule(argv):
+    sys.argv = ["qcom-capsule-tool generate-capsule"] + argv
+    from qcom_capsule_tool.fmp_capsule import main
+
+    main()
+
+
+def _cmd_bench(argv):
+    sys.argv = ["qcom-capsule-tool bench"] + argv
+    from qcom_capsule_tool.benchmark import main
+
+    main()
+
+
 SUBCOMMANDS = {
     "setup": ("Set up edk2 build environment", _cmd_setup),
     "create": ("Run the full capsule generation pipeline", _cmd_create),
@@ -86,11 +100,16 @@ SUBCOMMANDS = {
         "Generate or inspect SYSFW_VERSION.bin",
         _cmd_sysfw_version_create,
     ),
+    "generate-capsule": (
+        "Encode a signed FMP capsule from config.json",
+        _cmd_generate_capsule,
+    ),
     "bin-to-hex": ("Convert a binary file to hex format", _cmd_bin_to_hex),
     "patch-capsule-cert": (
         "Patch QcCapsuleRootCert in a uefi_dtbs or xbl_config ELF (auto-detected)",
         _cmd_patch_capsule_cert,
     ),
+    "bench": ("Benchmark capsule generation on synthetic inputs", _cmd_bench),
 }
 
 
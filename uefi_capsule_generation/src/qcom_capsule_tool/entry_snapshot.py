@@ -0,0 +1,259 @@
+# --------------------------------------------------------------------
+# Copyright (c) 2026 Qualcomm Innovation Center, Inc. All rights reserved.
+# SPDX-License-Identifier: BSD-3-Clause-Clear
+# --------------------------------------------------------------------
+
+"""On-disk snapshots of validated FvUpdate.xml entries.
+
+Snapshots live in <cache_dir>/snapshots/ and are named after the SHA-256
+of the XML contents, the Glymur mode, the tool version and
+SNAPSHOT_VERSION. A snapshot holds everything XmlParser.parse_input_xml
+and XmlFwEntryValidation.fw_entry_list_validation_main leave in the
+BuildContext:
+
+  header        magic, SNAPSHOT_VERSION, the isMatchIdentifierInXML /
+                isBinaryTypeInXML / isGlymurMode flags, DeviceFlashType
+                and the two entry counts
+
+followed by a zlib stream (the fixed-size metadata entries are mostly
+zero padding) of
+
+  metadata      every QpayloadFwEntryList entry as its raw
+                QPAYLOAD_METADATA_FWENTRY bytes
+  raw entries   every XmlRawFwEntryList entry: its FileGuid, then its
+                text fields and ARValidation images as length-prefixed
+                UTF-8 strings
+
+On a hit fv-create restores these and skips parsing and validation. The
+FwEntry FileGuids are then those of the run that wrote the snapshot,
+which the FFS cache does not care about (it re-stamps GUIDs anyway).
+
+A snapshot is written to a temp file and renamed, so concurrent builds
+never see a partial one; one that cannot be read is treated as a miss.
+Hits touch their snapshot, and ffs_cache.FfsCache.evict() removes the
+least recently used ones together with FFS entries, within the same
+--cache-size budget.
+"""
+
+import ctypes
+import hashlib
+import os
+import struct
+import tempfile
+import zlib
+from typing import BinaryIO, List, Optional, Union
+
+from . import FVCreation_header as FVC_h
+from . import checksum
+
+SNAPSHOT_VERSION = 1
+SNAPSHOT_MAGIC = b"QFWSNAP\0"
+SNAPSHOT_DIR = "snapshots"
+SNAPSHOT_SUFFIX = ".snap"
+
+# magic, version, flags, DeviceFlashType (-1: none), raw and metadata counts
+_HEADER = struct.Struct("<8sIBiII")
+_STR_LEN = struct.Struct("<I")
+_COUNT = struct.Struct("<i")
+_NONE = 0xFFFFFFFF
+
+_FLAG_MATCH_IDENTIFIER = 0x01
+_FLAG_BINARY_TYPE = 0x02
+_FLAG_GLYMUR = 0x04
+
+# XML_RAW_FWENTRY text fields, in snapshot order.
+_RAW_FIELDS = (
+    "InputBinary",
+    "InputPath",
+    "Operation",
+    "UpdateType",
+    "BackupType",
+    "MatchIdentifier",
+    "BinaryType",
+)
+_PATH_FIELDS = ("DiskType", "PartitionName", "PartitionTypeGUID", "FileName")
+
+
+class SnapshotError(ValueError):
+    """Raised for a snapshot that cannot be decoded."""
+
+
+def xml_digest(xml_source: Union[str, BinaryIO]) -> str:
+    """SHA-256 (hex) of an XML path or binary file object.
+
+    A file object is read from its current position, which is restored.
+    """
+    if isinstance(xml_source, str):
+        return checksum.sha256_file(xml_source).hex()
+    pos = xml_source.tell()
+    data = xml_source.read()
+    xml_source.seek(pos)
+    return hashlib.sha256(data).hexdigest()
+
+
+def _put_str(out: List[bytes], text: Optional[str]) -> None:
+    if text is None:
+        out.append(_STR_LEN.pack(_NONE))
+        return
+    data = text.encode("utf-8")
+    out.append(_STR_LEN.pack(len(data)))
+    out.append(data)
+
+
+class _Reader:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.pos = 0
+
+    def take(self, size: int) -> bytes:
+        end = self.pos + size
+        if end > len(self.data):
+            raise SnapshotError("truncated snapshot")
+        chunk = self.data[self.pos : end]
+        self.pos = end
+        return chunk
+
+    def unpack(self, fmt: struct.Struct) -> tuple:
+        return fmt.unpack(self.take(fmt.size))
+
+    def str(self) -> Optional[str]:
+        (size,) = self.unpack(_STR_LEN)
+        if size == _NONE:
+            return None
+        return self.take(size).decode("utf-8")
+
+
+def encode_snapshot(g_dynamic_var: FVC_h.BuildContext) -> bytes:
+    """Serialize the validated entries and flags of *g_dynamic_var*."""
+    flags = 0
+    if g_dynamic_var.isMatchIdentifierInXML:
+        flags |= _FLAG_MATCH_IDENTIFIER
+    if g_dynamic_var.isBinaryTypeInXML:
+        flags |= _FLAG_BINARY_TYPE
+    if g_dynamic_var.isGlymurMode:
+        flags |= _FLAG_GLYMUR
+    flash_type = g_dynamic_var.DeviceFlashType
+    header = _HEADER.pack(
+        SNAPSHOT_MAGIC,
+        SNAPSHOT_VERSION,
+        flags,
+        -1 if flash_type is None else int(flash_type),
+        len(g_dynamic_var.XmlRawFwEntryList),
+        len(g_dynamic_var.QpayloadFwEntryList),
+    )
+    out: List[bytes] = []
+    for fw_entry in g_dynamic_var.QpayloadFwEntryList:
+        out.append(bytes(fw_entry))
+
+    for raw_fwentry in g_dynamic_var.XmlRawFwEntryList:
+        out.append(bytes(raw_fwentry.FileGuid))
+        for name in _RAW_FIELDS:
+            _put_str(out, getattr(raw_fwentry, name))
+        for path in (raw_fwentry.UpdatePath, raw_fwentry.BackupPath):
+            for name in _PATH_FIELDS:
+                _put_str(out, getattr(path, name))
+        if raw_fwentry.ARValidation is None:
+            out.append(_COUNT.pack(-1))
+            continue
+        images = raw_fwentry.ARValidation.Images
+        out.append(_COUNT.pack(len(images)))
+        for image in images:
+            _put_str(out, image.FileName)
+            _put_str(out, image.ARValidationType)
+    return header + zlib.compress(b"".join(out), 1)
+
+
+def decode_snapshot(data: bytes, g_dynamic_var: FVC_h.BuildContext) -> None:
+    """
+    Restore a snapshot into *g_dynamic_var*; raises SnapshotError (or
+    ValueError for a bad field) and leaves *g_dynamic_var* untouched if
+    *data* cannot be decoded.
+    """
+    magic, version, flags, flash_type, raw_count, meta_count = _Reader(data).unpack(
+        _HEADER
+    )
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+        raise SnapshotError("not a version %d snapshot" % SNAPSHOT_VERSION)
+    stream = zlib.decompressobj()
+    try:
+        reader = _Reader(stream.decompress(data[_HEADER.size :]))
+    except zlib.error as e:
+        raise SnapshotError(str(e))
+    if not stream.eof or stream.unused_data:
+        raise SnapshotError("truncated or trailing data in snapshot")
+
+    meta_size = ctypes.sizeof(FVC_h.QPAYLOAD_METADATA_FWENTRY)
+    fw_entries = [
+        FVC_h.QPAYLOAD_METADATA_FWENTRY.from_buffer_copy(reader.take(meta_size))
+        for _ in range(meta_count)
+    ]
+
+    raw_entries = []
+    for _ in range(raw_count):
+        raw_fwentry = FVC_h.XML_RAW_FWENTRY()
+        raw_fwentry.FileGuid = (ctypes.c_byte * 16).from_buffer_copy(reader.take(16))
+        for name in _RAW_FIELDS:
+            setattr(raw_fwentry, name, reader.str())
+        for path in (raw_fwentry.UpdatePath, raw_fwentry.BackupPath):
+            for name in _PATH_FIELDS:
+                setattr(path, name, reader.str())
+        (image_count,) = reader.unpack(_COUNT)
+        if image_count >= 0:
+            raw_fwentry.ARValidation = FVC_h.XML_RAW_FWENTRY_ARVALIDATION(
+                [
+                    FVC_h.XML_RAW_FWENTRY_IMAGE(reader.str(), reader.str())
+                    for _ in range(image_count)
+                ]
+            )
+        raw_entries.append(raw_fwentry)
+    if reader.pos != len(reader.data):
+        raise SnapshotError("trailing data in snapshot")
+
+    g_dynamic_var.isMatchIdentifierInXML = bool(flags & _FLAG_MATCH_IDENTIFIER)
+    g_dynamic_var.isBinaryTypeInXML = bool(flags & _FLAG_BINARY_TYPE)
+    g_dynamic_var.isGlymurMode = bool(flags & _FLAG_GLYMUR)
+    g_dynamic_var.DeviceFlashType = (
+        None if flash_type < 0 else FVC_h.FlashType(flash_type)
+    )
+    g_dynamic_var.XmlRawFwEntryList.extend(raw_entries)
+    g_dynamic_var.QpayloadFwEntryList.extend(fw_entries)
+
+
+class SnapshotCache:
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self.snapshot_dir = os.path.join(cache_dir, SNAPSHOT_DIR)
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+
+    def snapshot_path(
+        self, xml_source: Union[str, BinaryIO], glymur_mode: bool, tool_version: str
+    ) -> str:
+        name = (
+            f"{xml_digest(xml_source)}-g{int(bool(glymur_mode))}"
+            f"-t{tool_version}-v{SNAPSHOT_VERSION}{SNAPSHOT_SUFFIX}"
+        )
+        return os.path.join(self.snapshot_dir, name)
+
+    def load(self, path: str, g_dynamic_var: FVC_h.BuildContext) -> bool:
+        """Restore the snapshot at *path*; False on a miss."""
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return False
+        try:
+            decode_snapshot(data, g_dynamic_var)
+        except (struct.error, ValueError) as e:
+            print(f"WARNING: Ignoring unreadable entry snapshot {path}: {e}")
+            return False
+        os.utime(path)
+        return True
+
+    def store(self, path: str, g_dynamic_var: FVC_h.BuildContext) -> None:
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.snapshot_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(encode_snapshot(g_dynamic_var))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"WARNING: Failure writing entry snapshot {path}: {e}")
@@ -0,0 +1,284 @@
+# --------------------------------------------------------------------
+# Copyright (c) 2026 Qualcomm Innovation Center, Inc. All rights reserved.
+# SPDX-License-Identifier: BSD-3-Clause-Clear
+# --------------------------------------------------------------------
+
+"""Native FFS file encoder.
+
+Produces the same bytes as edk2 `GenFfs -t EFI_FV_FILETYPE_RAW -g <guid> -s
+-i <file>` without spawning the tool, so a capsule can be built without an
+edk2 BaseTools C build.
+
+EFI_FFS_FILE_HEADER (24 bytes), EFI_FFS_FILE_HEADER2 (32 bytes):
+  Name[16] HeaderChecksum[1] FileChecksum[1] Type[1] Attributes[1]
+  Size[3] State[1] (ExtendedSize[8], large files only)
+
+StreamedFfsFile encodes an input file straight into an open output
+(normally the firmware volume) in fixed size chunks, so neither the input
+nor the FFS image is ever held in memory.
+"""
+
+import os
+import struct
+import uuid
+from typing import BinaryIO, Optional, Union
+
+from . import checksum
+from .checksum import checksum8
+
+# Bump whenever the encoded bytes change; it is part of the FFS cache key.
+ENCODER_VERSION = 1
+
+EFI_FV_FILETYPE_RAW = 0x01
+EFI_SECTION_RAW = 0x19
+
+FFS_ATTRIB_LARGE_FILE = 0x01
+FFS_ATTRIB_CHECKSUM = 0x40
+FFS_FIXED_CHECKSUM = 0xAA
+
+EFI_FILE_HEADER_CONSTRUCTION = 0x01
+EFI_FILE_HEADER_VALID = 0x02
+EFI_FILE_DATA_VALID = 0x04
+
+FFS_FILE_HEADER_SIZE = 24
+FFS_FILE_HEADER2_SIZE = 32
+MAX_FFS_SIZE = 0x1000000
+
+SECTION_HEADER_SIZE = 4
+SECTION_HEADER2_SIZE = 8
+MAX_SECTION_SIZE = 0x1000000
+
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+_FFS_HEADER = struct.Struct("<16sBBBB3sB")
+_SECTION_HEADER = struct.Struct("<3sB")
+
+
+def guid_to_bytes(guid: Union[str, uuid.UUID]) -> bytes:
+    """Return the on-disk EFI_GUID encoding of a registry-format GUID string."""
+    if not isinstance(guid, uuid.UUID):
+        guid = uuid.UUID(guid.strip("{}"))
+    return guid.bytes_le
+
+
+def is_large_file(data_size: int) -> bool:
+    return data_size + FFS_FILE_HEADER_SIZE >= MAX_FFS_SIZE
+
+
+def raw_section(data: bytes) -> bytes:
+    """Wrap *data* in an EFI_SECTION_RAW leaf section (GenSec -s EFI_SECTION_RAW)."""
+    size = len(data) + SECTION_HEADER_SIZE
+    if size >= MAX_SECTION_SIZE:
+        size = len(data) + SECTION_HEADER2_SIZE
+        header = _SECTION_HEADER.pack(b"\xff\xff\xff", EFI_SECTION_RAW)
+        header += struct.pack("<I", size)
+    else:
+        header = _SECTION_HEADER.pack(size.to_bytes(3, "little"), EFI_SECTION_RAW)
+    return header + data
+
+
+def ffs_header_size(data_size: int) -> int:
+    if is_large_file(data_size):
+        return FFS_FILE_HEADER2_SIZE
+    return FFS_FILE_HEADER_SIZE
+
+
+def ffs_header(
+    guid: Union[str, uuid.UUID],
+    data_size: int,
+    data_checksum: int,
+    file_type: int = EFI_FV_FILETYPE_RAW,
+    checksum: bool = True,
+) -> bytes:
+    """Build the FFS file header for a payload of *data_size* bytes.
+
+    *data_checksum* is checksum8() of the payload and is only used when
+    *checksum* is set (GenFfs -s); otherwise FFS_FIXED_CHECKSUM is stored.
+    """
+    attributes = FFS_ATTRIB_CHECKSUM if checksum else 0
+    if is_large_file(data_size):
+        attributes |= FFS_ATTRIB_LARGE_FILE
+        size_field = b"\x00\x00\x00"
+        extended = struct.pack("<Q", data_size + FFS_FILE_HEADER2_SIZE)
+    else:
+        size_field = (data_size + FFS_FILE_HEADER_SIZE).to_bytes(3, "little")
+        extended = b""
+
+    name = guid_to_bytes(guid)
+
+    # Both checksums and State are zero while the header checksum is computed.
+    header_checksum = checksum8(
+        _FFS_HEADER.pack(name, 0, 0, file_type, attributes, size_field, 0) + extended
+    )
+    file_checksum = data_checksum if checksum else FFS_FIXED_CHECKSUM
+    state = EFI_FILE_HEADER_CONSTRUCTION | EFI_FILE_HEADER_VALID | EFI_FILE_DATA_VALID
+    return (
+        _FFS_HEADER.pack(
+            name,
+            header_checksum,
+            file_checksum,
+            file_type,
+            attributes,
+            size_field,
+            state,
+        )
+        + extended
+    )
+
+
+def set_ffs_name(image: bytes, guid: Union[str, uuid.UUID]) -> bytes:
+    """Return *image* with its Name replaced by *guid* and the header checksum fixed."""
+    if image[19] & FFS_ATTRIB_LARGE_FILE:
+        header_size = FFS_FILE_HEADER2_SIZE
+    else:
+        header_size = FFS_FILE_HEADER_SIZE
+    header = bytearray(image[:header_size])
+    header[:16] = guid_to_bytes(guid)
+    file_checksum, state = header[17], header[23]
+    header[16] = header[17] = header[23] = 0
+    header[16] = checksum8(header)
+    header[17], header[23] = file_checksum, state
+    return bytes(header) + image[header_size:]
+
+
+def build_ffs(
+    guid: Union[str, uuid.UUID],
+    data: bytes,
+    file_type: int = EFI_FV_FILETYPE_RAW,
+    checksum: bool = True,
+    wrap_raw_section: bool = False,
+) -> bytes:
+    """Return a complete FFS file image for *data*.
+
+    By default *data* is stored as-is, matching GenFfs fed a plain binary.
+    Set *wrap_raw_section* to place it inside an EFI_SECTION_RAW first.
+    """
+    if wrap_raw_section:
+        data = raw_section(data)
+    return ffs_header(guid, len(data), checksum8(data), file_type, checksum) + data
+
+
+class FfsFile:
+    """An FFS file destined for a firmware volume.
+
+    *name* is the .ffs file name GenFfs writes; *guid* and *input_file*
+    record how the file was produced so it can be regenerated with GenFfs.
+    *data* holds the encoded image, or None when the file only exists on
+    disk under *name* (the edk2 tools path). *from_cache* is set when the
+    image came from an FfsCache entry.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        guid: Union[str, uuid.UUID],
+        input_file: str,
+        data: Optional[bytes] = None,
+        from_cache: bool = False,
+    ):
+        self.name = name
+        self.guid = guid
+        self.input_file = input_file
+        self.data = data
+        self.from_cache = from_cache
+
+    @classmethod
+    def from_input_file(
+        cls,
+        name: str,
+        guid: Union[str, uuid.UUID],
+        input_file: str,
+        file_type: int = EFI_FV_FILETYPE_RAW,
+    ) -> "FfsFile":
+        with open(input_file, "rb") as f:
+            data = f.read()
+        return cls(name, guid, input_file, build_ffs(guid, data, file_type))
+
+    def read(self) -> bytes:
+        """Return the encoded image, loading it from *name* if needed."""
+        if self.data is not None:
+            return self.data
+        with open(self.name, "rb") as f:
+            return f.read()
+
+
+def write_ffs_file(
+    s_output_file: str,
+    guid: Union[str, uuid.UUID],
+    s_input_file: str,
+    file_type: int = EFI_FV_FILETYPE_RAW,
+) -> None:
+    """File-to-file equivalent of `GenFfs -o <out> -t <type> -g <guid> -s -i <in>`."""
+    with open(s_input_file, "rb") as f:
+        data = f.read()
+    with open(s_output_file, "wb") as f:
+        f.write(build_ffs(guid, data, file_type))
+
+
+class StreamedFfsFile(FfsFile):
+    """An FFS file that is encoded from *input_file* while it is written.
+
+    The size is taken from the file system up front, which is all the FV
+    layout needs. write_to() copies the payload in STREAM_CHUNK_SIZE
+    chunks, summing the FFS data checksum as it goes, and then seeks back
+    to fill in the header.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        guid: Union[str, uuid.UUID],
+        input_file: str,
+        file_type: int = EFI_FV_FILETYPE_RAW,
+    ):
+        super().__init__(name, guid, input_file)
+        self.file_type = file_type
+        self.data_size = os.path.getsize(input_file)
+
+    @property
+    def header_size(self) -> int:
+        return ffs_header_size(self.data_size)
+
+    @property
+    def size(self) -> int:
+        return self.header_size + self.data_size
+
+    def read(self) -> bytes:
+        """Return the encoded image in memory (for comparisons only)."""
+        with open(self.input_file, "rb") as f:
+            return build_ffs(self.guid, f.read(), self.file_type)
+
+    def write_to(self, fs: BinaryIO, erase_polarity: bool = False) -> None:
+        """Write the FFS file at the current position of the seekable *fs*.
+
+        Set *erase_polarity* to store the State byte inverted, as an FV
+        with EFI_FVB2_ERASE_POLARITY expects.
+        """
+        start = fs.tell()
+        fs.write(bytes(self.header_size))
+
+        data_sum = 0
+        total = 0
+        buffer = bytearray(STREAM_CHUNK_SIZE)
+        view = memoryview(buffer)
+        with open(self.input_file, "rb") as f:
+            while True:
+                n = f.readinto(buffer)
+                if not n:
+                    break
+                chunk = view[:n]
+                data_sum = checksum.sum8(chunk, data_sum)
+                fs.write(chunk)
+                total += n
+        if total != self.data_size:
+            raise ValueError(f"{self.input_file} changed size while being read")
+
+        header = bytearray(
+            ffs_header(self.guid, total, -data_sum & 0xFF, self.file_type)
+        )
+        if erase_polarity:
+            header[23] = ~header[23] & 0xFF
+        end = fs.tell()
+        fs.seek(start)
+        fs.write(header)
+        fs.seek(end)
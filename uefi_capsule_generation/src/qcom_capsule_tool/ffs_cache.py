@@ -0,0 +1,151 @@
+# --------------------------------------------------------------------
+# Copyright (c) 2026 Qualcomm Innovation Center, Inc. All rights reserved.
+# SPDX-License-Identifier: BSD-3-Clause-Clear
+# --------------------------------------------------------------------
+
+"""Content-addressed on-disk cache of edk2 GenFfs output.
+
+Used with --use-edk2-tools, where every FFS file costs a GenFfs process.
+The native encoder (ffs_builder) is not cached: it is a file read and a
+checksum, about what a cache hit costs anyway.
+
+Entries live in <cache_dir>/ffs/ and are named after the SHA-256 of the
+input binary, the FFS file type and ffs_builder.ENCODER_VERSION.
+
+The file GUID is not part of the key: FwEntry FileGuids are generated
+fresh on every fv-create run, so a GUID-keyed entry would never be hit.
+The GUID only affects the FFS header, so hits are re-stamped with the
+current GUID (ffs_builder.set_ffs_name) instead.
+
+Eviction is LRU by mtime: hits touch their entry, and evict() removes the
+oldest entries until the cache fits in max_bytes. The entry snapshots in
+<cache_dir>/snapshots/ (entry_snapshot) share that budget.
+"""
+
+import os
+import shutil
+import tempfile
+from typing import Callable, Iterable, Optional
+
+from . import checksum, entry_snapshot, ffs_builder
+
+DEFAULT_MAX_BYTES = 4 * 1024 * 1024 * 1024
+
+
+class FfsCache:
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.ffs_dir = os.path.join(cache_dir, "ffs")
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        os.makedirs(self.ffs_dir, exist_ok=True)
+
+    def _entry_path(self, digest: str, file_type: int) -> str:
+        name = f"{digest}-{file_type:02x}-v{ffs_builder.ENCODER_VERSION}.ffs"
+        return os.path.join(self.ffs_dir, name)
+
+    def build(
+        self,
+        name: str,
+        guid: str,
+        input_file: str,
+        gen_ffs: Callable[[str, str, str], None],
+        file_type: int = ffs_builder.EFI_FV_FILETYPE_RAW,
+    ) -> ffs_builder.FfsFile:
+        """Write the FFS file for *input_file* to *name*.
+
+        *gen_ffs(name, guid, input_file)* (GenFfs) only runs on a miss; a
+        hit is re-stamped with *guid* and written out instead. Safe to call
+        from worker threads; counters are updated by the caller through
+        record().
+        """
+        digest = checksum.sha256_file(input_file).hex()
+        path = self._entry_path(digest, file_type)
+
+        image = self._load(path)
+        if image is not None:
+            with open(name, "wb") as f:
+                f.write(ffs_builder.set_ffs_name(image, guid))
+            return ffs_builder.FfsFile(name, guid, input_file, from_cache=True)
+
+        # A stale file from an earlier run must not be cached if GenFfs fails.
+        if os.path.exists(name):
+            os.remove(name)
+        gen_ffs(name, guid, input_file)
+        if os.path.exists(name):
+            self._store(path, name)
+        return ffs_builder.FfsFile(name, guid, input_file)
+
+    def _load(self, path: str) -> Optional[bytes]:
+        try:
+            with open(path, "rb") as f:
+                image = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+        return image
+
+    def _store(self, path: str, ffs_file: str) -> None:
+        # Copy to a temp file and rename so concurrent builds never see a
+        # partial entry.
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.ffs_dir, suffix=".tmp")
+            os.close(fd)
+            shutil.copyfile(ffs_file, tmp_path)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"WARNING: Failure writing FFS cache entry {path}: {e}")
+
+    def record(self, ls_ffs: Iterable[ffs_builder.FfsFile]) -> None:
+        for ffs in ls_ffs:
+            if ffs.from_cache:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def evict(self) -> None:
+        """Remove least recently used FFS entries and snapshots until the
+        cache fits max_bytes."""
+        entries = []
+        total = 0
+        snapshot_dir = os.path.join(self.cache_dir, entry_snapshot.SNAPSHOT_DIR)
+        for directory, suffix in (
+            (self.ffs_dir, ".ffs"),
+            (snapshot_dir, entry_snapshot.SNAPSHOT_SUFFIX),
+        ):
+            try:
+                scan = list(os.scandir(directory))
+            except FileNotFoundError:
+                continue
+            for entry in scan:
+                if not entry.is_file() or not entry.name.endswith(suffix):
+                    continue
+                st = entry.stat()
+                entries.append((st.st_mtime, st.st_size, entry.path))
+                total += st.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self.evicted += 1
+
+    def print_stats(self, use_edk2_tools: bool = True) -> None:
+        if not use_edk2_tools:
+            print(
+                "INFO: FFS cache: not used by the native encoder "
+                f"(only with --use-edk2-tools), {self.evicted} evicted "
+                f"({self.cache_dir})."
+            )
+            return
+        print(
+            f"INFO: FFS cache: {self.hits} hits, {self.misses} misses, "
+            f"{self.evicted} evicted ({self.ffs_dir})."
+        )
@@ -0,0 +1,524 @@
+# --------------------------------------------------------------------
+# Copyright (c) 2026 Qualcomm Innovation Center, Inc. All rights reserved.
+# SPDX-License-Identifier: BSD-3-Clause-Clear
+# --------------------------------------------------------------------
+
+"""
+generate-capsule: Encode a signed UEFI FMP capsule from a config.json.
+
+In-process replacement for `GenerateCapsule.py -e -j config.json`
+from edk2 BaseTools. It reads the same JSON payload descriptors and
+writes the same layout:
+
+  EFI_CAPSULE_HEADER
+  EFI_FIRMWARE_MANAGEMENT_CAPSULE_HEADER + ItemOffsetList[]
+  EFI_FIRMWARE_MANAGEMENT_CAPSULE_IMAGE_HEADER (version 3), per payload
+    EFI_FIRMWARE_IMAGE_AUTHENTICATION (when signed)
+      MonotonicCount + WIN_CERTIFICATE_UEFI_GUID (PKCS7 CertData)
+    FMP_PAYLOAD_HEADER ('MSS1')
+      payload
+
+Signing is pluggable: encode_capsule() takes any callable with the
+Signer signature. The default, OpenSslSigner, runs the local openssl
+CLI exactly as GenerateCapsule.py does (smime -sign -binary -outform DER
+-md sha256). Capsule dependency expressions and signtool signing are not
+supported.
+
+Usage:
+    qcom-capsule-tool generate-capsule -j config.json -o capsule_file.cap \\
+        --capflag PersistAcrossReset [-v]
+    qcom-capsule-tool generate-capsule --dump-info capsule_file.cap
+"""
+
+import argparse
+import json
+import os
+import struct
+import subprocess
+import sys
+import uuid
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence, Tuple
+
+# ============================================================
+# Structure layouts
+# ============================================================
+
+EFI_FIRMWARE_MANAGEMENT_CAPSULE_ID_GUID = uuid.UUID(
+    "6DCBD5ED-E82D-4C44-BDA1-7194199AD92A"
+)
+EFI_CERT_TYPE_PKCS7_GUID = uuid.UUID("4aafd29d-68df-49ee-8aa9-347d375665a7")
+
+CAPSULE_FLAGS_PERSIST_ACROSS_RESET = 0x00010000
+CAPSULE_FLAGS_POPULATE_SYSTEM_TABLE = 0x00020000
+CAPSULE_FLAGS_INITIATE_RESET = 0x00040000
+CAPSULE_FLAGS = {
+    "PersistAcrossReset": CAPSULE_FLAGS_PERSIST_ACROSS_RESET,
+    "InitiateReset": CAPSULE_FLAGS_INITIATE_RESET,
+}
+
+EFI_FIRMWARE_MANAGEMENT_CAPSULE_HEADER_INIT_VERSION = 0x00000001
+EFI_FIRMWARE_MANAGEMENT_CAPSULE_IMAGE_HEADER_INIT_VERSION = 0x00000003
+CAPSULE_SUPPORT_AUTHENTICATION = 0x0000000000000001
+
+WIN_CERT_REVISION = 0x0200
+WIN_CERT_TYPE_EFI_GUID = 0x0EF1
+
+FMP_PAYLOAD_HEADER_SIGNATURE = 0x3153534D  # 'MSS1'
+
+# EFI_CAPSULE_HEADER: CapsuleGuid HeaderSize Flags CapsuleImageSize (+ pad to 32)
+_CAPSULE_HEADER = struct.Struct("<16sIIII")
+# EFI_FIRMWARE_MANAGEMENT_CAPSULE_HEADER: Version EmbeddedDriverCount PayloadItemCount
+_FMP_CAPSULE_HEADER = struct.Struct("<IHH")
+_ITEM_OFFSET = struct.Struct("<Q")
+# EFI_FIRMWARE_MANAGEMENT_CAPSULE_IMAGE_HEADER (version 3)
+_FMP_IMAGE_HEADER = struct.Struct("<I16sB3BIIQQ")
+# EFI_FIRMWARE_IMAGE_AUTHENTICATION up to CertData
+_FMP_AUTH_HEADER = struct.Struct("<QIHH16s")
+_WIN_CERTIFICATE_UEFI_GUID_SIZE = struct.calcsize("<IHH16s")
+# FMP_PAYLOAD_HEADER: Signature HeaderSize FwVersion LowestSupportedVersion
+_FMP_PAYLOAD_HEADER = struct.Struct("<IIII")
+
+
+class CapsuleError(ValueError):
+    """Raised for invalid capsule input or a failed signing step."""
+
+
+@dataclass
+class CapsulePayload:
+    """One FMP payload, mirroring a "Payloads" entry of config.json."""
+
+    payload: bytes
+    guid: uuid.UUID
+    fw_version: int
+    lowest_supported_version: int
+    monotonic_count: int = 0
+    hardware_instance: int = 0
+    update_image_index: int = 1
+    signer_private_cert: Optional[str] = None
+    other_public_cert: Optional[str] = None
+    trusted_public_cert: Optional[str] = None
+    signing_tool_path: Optional[str] = None
+
+    @property
+    def signed(self) -> bool:
+        return None not in (
+            self.signer_private_cert,
+            self.other_public_cert,
+            self.trusted_public_cert,
+        )
+
+
+# A signer receives the bytes to sign (the FMP payload followed by the
+# 64-bit MonotonicCount) and returns DER encoded PKCS7 SignedData.
+Signer = Callable[[bytes, CapsulePayload], bytes]
+
+
+class OpenSslSigner:
+    """Sign with the openssl CLI, as GenerateCapsule.py SignPayloadOpenSsl does."""
+
+    def __init__(self, tool_path: Optional[str] = None):
+        self.tool_path = tool_path
+
+    def __call__(self, data: bytes, payload: CapsulePayload) -> bytes:
+        tool_path = self.tool_path
+        if tool_path is None:
+            tool_path = payload.signing_tool_path or ""
+        command = [
+            os.path.join(tool_path, "openssl"),
+            "smime",
+            "-sign",
+            "-binary",
+            "-outform",
+            "DER",
+            "-md",
+            "sha256",
+            "-signer",
+            str(payload.signer_private_cert),
+            "-certfile",
+            str(payload.other_public_cert),
+        ]
+        try:
+            result = subprocess.run(command, input=data, capture_output=True)
+        except OSError as e:
+            raise CapsuleError(f"can not run openssl: {e}") from e
+        if result.returncode != 0:
+            raise CapsuleError(
+                f"openssl failed: {result.stderr.decode(errors='replace')}"
+            )
+        return result.stdout
+
+
+# ============================================================
+# Encoder
+# ============================================================
+
+
+def fmp_payload_header(payload: CapsulePayload) -> bytes:
+    return _FMP_PAYLOAD_HEADER.pack(
+        FMP_PAYLOAD_HEADER_SIGNATURE,
+        _FMP_PAYLOAD_HEADER.size,
+        payload.fw_version,
+        payload.lowest_supported_version,
+    )
+
+
+def fmp_auth_header(monotonic_count: int, cert_data: bytes) -> bytes:
+    return (
+        _FMP_AUTH_HEADER.pack(
+            monotonic_count,
+            _WIN_CERTIFICATE_UEFI_GUID_SIZE + len(cert_data),
+            WIN_CERT_REVISION,
+            WIN_CERT_TYPE_EFI_GUID,
+            EFI_CERT_TYPE_PKCS7_GUID.bytes_le,
+        )
+        + cert_data
+    )
+
+
+def encode_image(payload: CapsulePayload, signer: Optional[Signer] = None) -> bytes:
+    """Return the FMP capsule image (image header + auth + payload) for *payload*."""
+    image = fmp_payload_header(payload) + payload.payload
+    capsule_support = 0
+
+    if payload.signed:
+        if signer is None:
+            signer = OpenSslSigner()
+        cert_data = signer(image + struct.pack("<Q", payload.monotonic_count), payload)
+        image = fmp_auth_header(payload.monotonic_count, cert_data) + image
+        capsule_support |= CAPSULE_SUPPORT_AUTHENTICATION
+
+    header = _FMP_IMAGE_HEADER.pack(
+        EFI_FIRMWARE_MANAGEMENT_CAPSULE_IMAGE_HEADER_INIT_VERSION,
+        payload.guid.bytes_le,
+        payload.update_image_index,
+        0,
+        0,
+        0,
+        len(image),
+        0,
+        payload.hardware_instance,
+        capsule_support,
+    )
+    return header + image
+
+
+def encode_capsule(
+    payloads: Sequence[CapsulePayload],
+    signer: Optional[Signer] = None,
+    flags: int = 0,
+    oem_flags: int = 0,
+    embedded_drivers: Sequence[bytes] = (),
+) -> bytes:
+    """Return a complete FMP capsule for *payloads*."""
+    if flags & CAPSULE_FLAGS_INITIATE_RESET and not (
+        flags & CAPSULE_FLAGS_PERSIST_ACROSS_RESET
+    ):
+        raise CapsuleError("InitiateReset also requires PersistAcrossReset")
+    if oem_flags > 0xFFFF:
+        raise CapsuleError("OEM flags must be between 0x0000 and 0xffff")
+    for payload in payloads:
+        _validate_payload(payload)
+
+    items = list(embedded_drivers) + [encode_image(p, signer) for p in payloads]
+    offset = _FMP_CAPSULE_HEADER.size + len(items) * _ITEM_OFFSET.size
+    offsets = []
+    for item in items:
+        offsets.append(_ITEM_OFFSET.pack(offset))
+        offset += len(item)
+
+    body = (
+        _FMP_CAPSULE_HEADER.pack(
+            EFI_FIRMWARE_MANAGEMENT_CAPSULE_HEADER_INIT_VERSION,
+            len(embedded_drivers),
+            len(payloads),
+        )
+        + b"".join(offsets)
+        + b"".join(items)
+    )
+    header = _CAPSULE_HEADER.pack(
+        EFI_FIRMWARE_MANAGEMENT_CAPSULE_ID_GUID.bytes_le,
+        _CAPSULE_HEADER.size,
+        flags | oem_flags,
+        _CAPSULE_HEADER.size + len(body),
+        0,
+    )
+    return header + body
+
+
+def _validate_payload(payload: CapsulePayload) -> None:
+    if payload.fw_version > 0xFFFFFFFF:
+        raise CapsuleError("FwVersion must be an integer in range 0x0..0xffffffff")
+    if payload.lowest_supported_version > 0xFFFFFFFF:
+        raise CapsuleError(
+            "LowestSupportedVersion must be an integer in range 0x0..0xffffffff"
+        )
+    if payload.hardware_instance > 0xFFFFFFFFFFFFFFFF:
+        raise CapsuleError(
+            "HardwareInstance must be an integer in range 0x0..0xffffffffffffffff"
+        )
+    if payload.monotonic_count > 0xFFFFFFFFFFFFFFFF:
+        raise CapsuleError(
+            "MonotonicCount must be an integer in range 0x0..0xffffffffffffffff"
+        )
+    if payload.update_image_index > 0xFF:
+        raise CapsuleError("UpdateImageIndex must be an integer in range 0x0..0xff")
+    certs = (
+        payload.signer_private_cert,
+        payload.other_public_cert,
+        payload.trusted_public_cert,
+    )
+    if any(c is not None for c in certs) and not payload.signed:
+        raise CapsuleError(
+            "the following JSON fields are required for OpenSSL: "
+            "OpenSslSignerPrivateCertFile, OpenSslOtherPublicCertFile, "
+            "OpenSslTrustedPublicCertFile"
+        )
+
+
+# ============================================================
+# config.json parsing  (GenerateCapsule.py EncodeJsonFileParse)
+# ============================================================
+
+
+def _json_int(config: dict, key: str, default: Optional[int] = None) -> int:
+    if key not in config:
+        if default is None:
+            raise CapsuleError(f"Could not find {key} in payload descriptor.")
+        return default
+    value = config[key]
+    try:
+        result = value if isinstance(value, int) else int(value, 0)
+    except (TypeError, ValueError):
+        raise CapsuleError(f"{key} in payload descriptor has invalid syntax.")
+    if result < 0:
+        raise CapsuleError(f"{key} in payload descriptor is a negative value.")
+    return result
+
+
+def _json_path(config: dict, key: str) -> Optional[str]:
+    if key not in config:
+        return None
+    path = os.path.expandvars(config[key])
+    if not os.path.isfile(path):
+        raise CapsuleError(f"can not open file {key} ({path})")
+    return path
+
+
+def load_json_config(json_file: str) -> Tuple[List[CapsulePayload], List[bytes]]:
+    """Parse a GenerateCapsule.py JSON file into payloads and embedded drivers."""
+    try:
+        with open(json_file) as f:
+            config = json.load(f)
+    except (OSError, ValueError) as e:
+        raise CapsuleError(f"{json_file} loads failure: {e}")
+
+    drivers = []
+    for entry in config.get("EmbeddedDrivers", []):
+        driver_path = _json_path(entry, "Driver")
+        if driver_path is None:
+            raise CapsuleError("Could not find Driver in embedded driver descriptor.")
+        with open(driver_path, "rb") as f:
+            drivers.append(f.read())
+
+    if "Payloads" not in config:
+        raise CapsuleError(f'"Payloads" section not found in JSON file {json_file}')
+
+    payloads = []
+    for entry in config["Payloads"]:
+        if "Dependencies" in entry:
+            raise CapsuleError("Capsule dependency expressions are not supported.")
+        if "SignToolPfxFile" in entry or "SignToolSubjectName" in entry:
+            raise CapsuleError("signtool signing is not supported.")
+        payload_path = _json_path(entry, "Payload")
+        if payload_path is None:
+            raise CapsuleError("Could not find Payload in payload descriptor.")
+        try:
+            guid = uuid.UUID(entry["Guid"])
+        except KeyError:
+            raise CapsuleError("Could not find Guid in payload descriptor.")
+        except (TypeError, ValueError):
+            raise CapsuleError("Guid in payload descriptor has invalid syntax.")
+        with open(payload_path, "rb") as f:
+            data = f.read()
+
+        signing_tool_path = entry.get("SigningToolPath")
+        payloads.append(
+            CapsulePayload(
+                payload=data,
+                guid=guid,
+                fw_version=_json_int(entry, "FwVersion"),
+                lowest_supported_version=_json_int(entry, "LowestSupportedVersion"),
+                monotonic_count=_json_int(entry, "MonotonicCount", 0),
+                hardware_instance=_json_int(entry, "HardwareInstance", 0),
+                update_image_index=_json_int(entry, "UpdateImageIndex", 1),
+                signer_private_cert=_json_path(entry, "OpenSslSignerPrivateCertFile"),
+                other_public_cert=_json_path(entry, "OpenSslOtherPublicCertFile"),
+                trusted_public_cert=_json_path(entry, "OpenSslTrustedPublicCertFile"),
+                signing_tool_path=(
+                    os.path.expandvars(signing_tool_path)
+                    if signing_tool_path is not None
+                    else None
+                ),
+            )
+        )
+    return payloads, drivers
+
+
+def generate_capsule(
+    json_file: str,
+    output_file: str,
+    capflags: Sequence[str] = ("PersistAcrossReset",),
+    oem_flags: int = 0,
+    signer: Optional[Signer] = None,
+    verbose: bool = False,
+) -> bytes:
+    """Encode the capsule described by *json_file* and write it to *output_file*."""
+    payloads, drivers = load_json_config(json_file)
+    flags = 0
+    for name in capflags:
+        flags |= CAPSULE_FLAGS[name]
+    capsule = encode_capsule(payloads, signer, flags, oem_flags, drivers)
+    with open(output_file, "wb") as f:
+        f.write(capsule)
+    if verbose:
+        dump_info(capsule)
+        print(f"Write binary output file {output_file}")
+    return capsule
+
+
+# ============================================================
+# Decoder (--dump-info)
+# ============================================================
+
+
+def _guid_str(guid: bytes) -> str:
+    return str(uuid.UUID(bytes_le=guid)).upper()
+
+
+def dump_info(capsule: bytes) -> None:
+    """Print the header fields of an FMP capsule."""
+    if len(capsule) < _CAPSULE_HEADER.size:
+        raise CapsuleError("Capsule is smaller than EFI_CAPSULE_HEADER")
+    guid, header_size, flags, image_size, _ = _CAPSULE_HEADER.unpack_from(capsule)
+    print(f"EFI_CAPSULE_HEADER.CapsuleGuid      = {_guid_str(guid)}")
+    print(f"EFI_CAPSULE_HEADER.HeaderSize       = {header_size:08X}")
+    print(f"EFI_CAPSULE_HEADER.Flags            = {flags:08X}")
+    print(f"EFI_CAPSULE_HEADER.CapsuleImageSize = {image_size:08X}")
+    if image_size != len(capsule):
+        raise CapsuleError("CapsuleImageSize does not match the file size")
+
+    fmp = capsule[header_size:]
+    version, driver_count, payload_count = _FMP_CAPSULE_HEADER.unpack_from(fmp)
+    print(f"EFI_FIRMWARE_MANAGEMENT_CAPSULE_HEADER.Version             = {version:08X}")
+    print(
+        f"EFI_FIRMWARE_MANAGEMENT_CAPSULE_HEADER.EmbeddedDriverCount = {driver_count:08X}"
+    )
+    print(
+        f"EFI_FIRMWARE_MANAGEMENT_CAPSULE_HEADER.PayloadItemCount    = {payload_count:08X}"
+    )
+
+    count = driver_count + payload_count
+    offsets = [
+        _ITEM_OFFSET.unpack_from(fmp, _FMP_CAPSULE_HEADER.size + i * _ITEM_OFFSET.size)[
+            0
+        ]
+        for i in range(count)
+    ]
+    for index in range(driver_count, count):
+        offset = offsets[index]
+        (
+            image_version,
+            type_id,
+            image_index,
+            _,
+            _,
+            _,
+            update_size,
+            vendor_size,
+            hw_instance,
+            capsule_support,
+        ) = _FMP_IMAGE_HEADER.unpack_from(fmp, offset)
+        print(f"Payload {index - driver_count}:")
+        print(f"  UpdateImageTypeId      = {_guid_str(type_id)}")
+        print(f"  Version                = {image_version:08X}")
+        print(f"  UpdateImageIndex       = {image_index:08X}")
+        print(f"  UpdateImageSize        = {update_size:08X}")
+        print(f"  UpdateVendorCodeSize   = {vendor_size:08X}")
+        print(f"  UpdateHardwareInstance = {hw_instance:016X}")
+        print(f"  ImageCapsuleSupport    = {capsule_support:016X}")
+
+        image = fmp[offset + _FMP_IMAGE_HEADER.size :][:update_size]
+        if capsule_support & CAPSULE_SUPPORT_AUTHENTICATION:
+            monotonic_count, dw_length, _, _, cert_type = _FMP_AUTH_HEADER.unpack_from(
+                image
+            )
+            if uuid.UUID(bytes_le=cert_type) != EFI_CERT_TYPE_PKCS7_GUID:
+                raise CapsuleError("Unsupported certificate type")
+            print(f"  MonotonicCount         = {monotonic_count:016X}")
+            print(
+                f"  sizeof (CertData)      = {dw_length - _WIN_CERTIFICATE_UEFI_GUID_SIZE:08X}"
+            )
+            image = image[8 + dw_length :]
+
+        signature, _, fw_version, lsv = _FMP_PAYLOAD_HEADER.unpack_from(image)
+        if signature != FMP_PAYLOAD_HEADER_SIGNATURE:
+            raise CapsuleError("FMP_PAYLOAD_HEADER signature mismatch")
+        print(f"  FwVersion              = {fw_version:08X}")
+        print(f"  LowestSupportedVersion = {lsv:08X}")
+        print(f"  sizeof (Payload)       = {len(image) - _FMP_PAYLOAD_HEADER.size:08X}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Encode a UEFI FMP capsule from a GenerateCapsule.py JSON file"
+    )
+    parser.add_argument(
+        "-e",
+        "--encode",
+        action="store_true",
+        help="Encode a capsule (default; accepted for GenerateCapsule.py compatibility)",
+    )
+    parser.add_argument("-j", "--json-file", dest="json_file", help="JSON config file")
+    parser.add_argument("-o", "--output", dest="output", help="Output capsule file")
+    parser.add_argument(
+        "--capflag",
+        action="append",
+        default=[],
+        choices=sorted(CAPSULE_FLAGS),
+        help="Capsule flag; may be given more than once",
+    )
+    parser.add_argument(
+        "--capoemflag",
+        type=lambda s: int(s, 0),
+        default=0,
+        help="Capsule OEM flags (0x0000-0xffff)",
+    )
+    parser.add_argument(
+        "--dump-info", metavar="CAPSULE", help="Print the headers of a capsule file"
+    )
+    parser.add_argument("-v", "--verbose", action="store_true", help="Verbose output")
+    args = parser.parse_args()
+
+    try:
+        if args.dump_info:
+            with open(args.dump_info, "rb") as f:
+                dump_info(f.read())
+            return
+        if not args.json_file or not args.output:
+            parser.error("-j/--json-file and -o/--output are required")
+        generate_capsule(
+            args.json_file,
+            args.output,
+            args.capflag,
+            args.capoemflag,
+            None,
+            args.verbose,
+        )
+    except (CapsuleError, OSError) as e:
+        print(f"generate-capsule: error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+# --------------------------------------------------------------------
+# Copyright (c) 2026 Qualcomm Innovation Center, Inc. All rights reserved.
+# SPDX-License-Identifier: BSD-3-Clause-Clear
+# --------------------------------------------------------------------
+
+"""Native firmware volume assembler.
+
+Lays out FFS images the way edk2 GenFv does for the FvMain.inf written by
+FVCreation.generate_fv_main_file (0x40 byte blocks, EFI_NUM_BLOCKS = 0,
+erase polarity 1, EFI_FVB2_ALIGNMENT_8), so the FV can be built without
+FvMain.inf, .ffs temp files or a GenFv subprocess.
+
+EFI_FIRMWARE_VOLUME_HEADER (0x38 bytes) + block map:
+  ZeroVector[16] FileSystemGuid[16] FvLength[8] Signature[4] Attributes[4]
+  HeaderLength[2] Checksum[2] ExtHeaderOffset[2] Reserved[1] Revision[1]
+  {NumBlocks[4] Length[4]}... {0, 0}
+"""
+
+import struct
+import uuid
+from typing import BinaryIO, List, Optional, Sequence, Tuple, Union
+
+from . import ffs_builder
+from .checksum import checksum8, checksum16
+
+EFI_FIRMWARE_FILE_SYSTEM2_GUID = uuid.UUID("8c8ce578-8a3d-4f1c-9935-896185c32dd3")
+EFI_FIRMWARE_FILE_SYSTEM3_GUID = uuid.UUID("5473c07a-3dcb-4dca-bd6f-1e9689e7349a")
+EFI_FVH_SIGNATURE = 0x4856465F  # "_FVH"
+EFI_FVH_REVISION = 0x02
+
+EFI_FV_FILETYPE_FFS_PAD = 0xF0
+
+EFI_FVB2_READ_DISABLED_CAP = 0x00000001
+EFI_FVB2_READ_ENABLED_CAP = 0x00000002
+EFI_FVB2_READ_STATUS = 0x00000004
+EFI_FVB2_WRITE_DISABLED_CAP = 0x00000008
+EFI_FVB2_WRITE_ENABLED_CAP = 0x00000010
+EFI_FVB2_WRITE_STATUS = 0x00000020
+EFI_FVB2_LOCK_CAP = 0x00000040
+EFI_FVB2_LOCK_STATUS = 0x00000080
+EFI_FVB2_STICKY_WRITE = 0x00000200
+EFI_FVB2_MEMORY_MAPPED = 0x00000400
+EFI_FVB2_ERASE_POLARITY = 0x00000800
+EFI_FVB2_READ_LOCK_CAP = 0x00001000
+EFI_FVB2_READ_LOCK_STATUS = 0x00002000
+EFI_FVB2_WRITE_LOCK_CAP = 0x00004000
+EFI_FVB2_WRITE_LOCK_STATUS = 0x00008000
+EFI_FVB2_ALIGNMENT = 0x001F0000
+EFI_FVB2_ALIGNMENT_8 = 0x00030000
+
+# Attribute set listed in FvMain.inf.
+FV_ATTRIBUTES = (
+    EFI_FVB2_READ_DISABLED_CAP
+    | EFI_FVB2_READ_ENABLED_CAP
+    | EFI_FVB2_READ_STATUS
+    | EFI_FVB2_WRITE_DISABLED_CAP
+    | EFI_FVB2_WRITE_ENABLED_CAP
+    | EFI_FVB2_WRITE_STATUS
+    | EFI_FVB2_LOCK_CAP
+    | EFI_FVB2_LOCK_STATUS
+    | EFI_FVB2_STICKY_WRITE
+    | EFI_FVB2_MEMORY_MAPPED
+    | EFI_FVB2_ERASE_POLARITY
+    | EFI_FVB2_READ_LOCK_CAP
+    | EFI_FVB2_READ_LOCK_STATUS
+    | EFI_FVB2_WRITE_LOCK_CAP
+    | EFI_FVB2_WRITE_LOCK_STATUS
+    | EFI_FVB2_ALIGNMENT_8
+)
+FV_BLOCK_SIZE = 0x40
+
+FV_HEADER_SIZE = 0x38
+FV_BLOCK_MAP_ENTRY_SIZE = 8
+# Header, one block map entry and the {0, 0} terminator.
+FV_HEADER_LENGTH = FV_HEADER_SIZE + 2 * FV_BLOCK_MAP_ENTRY_SIZE
+FFS_FILE_HEADER_ALIGNMENT = 8
+
+_FV_HEADER = struct.Struct("<16s16sQIIHHHBB")
+
+# FFS_ATTRIB_DATA_ALIGNMENT (bits 3-5) to log2(alignment), as in GenFv.
+_FFS_ALIGNMENT_LOG2 = (0, 4, 7, 9, 10, 12, 15, 16)
+
+_WRITE_CHUNK = 1024 * 1024
+
+# An encoded FFS image, or a file that is encoded while the FV is written.
+FfsSource = Union[bytes, ffs_builder.StreamedFfsFile]
+
+
+class FvLayoutError(ValueError):
+    """Raised when the FFS files cannot be placed in a firmware volume."""
+
+
+def _align_up(x: int, a: int) -> int:
+    return (x + a - 1) & ~(a - 1)
+
+
+def _ffs_header_size(image: bytes) -> int:
+    if image[19] & ffs_builder.FFS_ATTRIB_LARGE_FILE:
+        return ffs_builder.FFS_FILE_HEADER2_SIZE
+    return ffs_builder.FFS_FILE_HEADER_SIZE
+
+
+def _ffs_alignment_log2(image: bytes) -> int:
+    return _FFS_ALIGNMENT_LOG2[(image[19] >> 3) & 0x07]
+
+
+def _ffs_layout_info(ffs: FfsSource) -> Tuple[bytes, int, int, int]:
+    """Return (name, size, header size, log2 alignment) of an FFS source."""
+    if isinstance(ffs, ffs_builder.StreamedFfsFile):
+        # Streamed files never set FFS_ATTRIB_DATA_ALIGNMENT.
+        return ffs_builder.guid_to_bytes(ffs.guid), ffs.size, ffs.header_size, 0
+    return (
+        bytes(ffs[:16]),
+        len(ffs),
+        _ffs_header_size(ffs),
+        _ffs_alignment_log2(ffs),
+    )
+
+
+def pad_file_header(size: int) -> bytes:
+    """Build an EFI_FV_FILETYPE_FFS_PAD header for a pad file of *size* bytes.
+
+    The State byte is already inverted for erase polarity 1.
+    """
+    if size >= ffs_builder.MAX_FFS_SIZE:
+        raise FvLayoutError(f"Pad file of {size:#x} bytes is too large")
+    state = (
+        ffs_builder.EFI_FILE_HEADER_CONSTRUCTION
+        | ffs_builder.EFI_FILE_HEADER_VALID
+        | ffs_builder.EFI_FILE_DATA_VALID
+    )
+    fields = [bytes(16), 0, 0, EFI_FV_FILETYPE_FFS_PAD, 0, size.to_bytes(3, "little")]
+    header_checksum = checksum8(struct.pack("<16sBBBB3sB", *fields, 0))
+    fields[1] = header_checksum
+    fields[2] = ffs_builder.FFS_FIXED_CHECKSUM
+    return struct.pack("<16sBBBB3sB", *fields, ~state & 0xFF)
+
+
+class FvLayout:
+    """Placement of every FFS file inside the volume.
+
+    *placements* holds (pad_offset, file_offset) per FFS image; pad_offset
+    is None when no pad file precedes the file.
+    """
+
+    def __init__(
+        self,
+        fv_length: int,
+        attributes: int,
+        large: bool,
+        placements: List[Tuple[Optional[int], int]],
+    ):
+        self.fv_length = fv_length
+        self.attributes = attributes
+        self.large = large
+        self.placements = placements
+
+
+def plan_fv(
+    ffs_images: Sequence[FfsSource],
+    block_size: int = FV_BLOCK_SIZE,
+    attributes: int = FV_ATTRIBUTES,
+) -> FvLayout:
+    """Compute the FV size and the offset of each FFS file (CalculateFvSize)."""
+    offset = FV_HEADER_LENGTH
+    placements: List[Tuple[Optional[int], int]] = []
+    names = set()
+    large = False
+    max_alignment_log2 = 0
+
+    for image in ffs_images:
+        name, size, header_size, alignment_log2 = _ffs_layout_info(image)
+        if name in names:
+            raise FvLayoutError(
+                f"The Ffs File Guid {uuid.UUID(bytes_le=name)} is duplicated"
+            )
+        names.add(name)
+
+        if size >= ffs_builder.MAX_FFS_SIZE:
+            large = True
+        max_alignment_log2 = max(max_alignment_log2, alignment_log2)
+        alignment = 1 << alignment_log2
+
+        pad_offset = None
+        if (offset + header_size) % alignment != 0:
+            # A pad file (plain EFI_FFS_FILE_HEADER) moves the data to the
+            # next aligned location.
+            pad_offset = offset
+            offset = _align_up(
+                offset + header_size + ffs_builder.FFS_FILE_HEADER_SIZE, alignment
+            )
+            offset -= header_size
+
+        placements.append((pad_offset, offset))
+        offset = _align_up(offset + size, FFS_FILE_HEADER_ALIGNMENT)
+
+    fv_length = _align_up(offset, block_size)
+
+    # GenFv raises the FV alignment to the largest FFS alignment.
+    if ((attributes & EFI_FVB2_ALIGNMENT) >> 16) < max_alignment_log2:
+        attributes = (max_alignment_log2 << 16) | (attributes & 0xFFFF)
+
+    return FvLayout(fv_length, attributes, large, placements)
+
+
+def fv_header(layout: FvLayout, block_size: int = FV_BLOCK_SIZE) -> bytes:
+    """Build the FV header and block map for *layout*."""
+    fs_guid = (
+        EFI_FIRMWARE_FILE_SYSTEM3_GUID
+        if layout.large
+        else EFI_FIRMWARE_FILE_SYSTEM2_GUID
+    )
+    block_map = struct.pack("<IIII", layout.fv_length // block_size, block_size, 0, 0)
+
+    def pack(checksum: int) -> bytes:
+        return (
+            _FV_HEADER.pack(
+                bytes(16),
+                fs_guid.bytes_le,
+                layout.fv_length,
+                EFI_FVH_SIGNATURE,
+                layout.attributes,
+                FV_HEADER_LENGTH,
+                checksum,
+                0,
+                0,
+                EFI_FVH_REVISION,
+            )
+            + block_map
+        )
+
+    return pack(checksum16(pack(0)))
+
+
+def _write_fill(fs: BinaryIO, size: int) -> None:
+    # Erase polarity 1: free space reads back as 0xFF.
+    chunk = b"\xff" * min(size, _WRITE_CHUNK)
+    while size > 0:
+        n = min(size, len(chunk))
+        fs.write(chunk[:n])
+        size -= n
+
+
+def write_fv(
+    fs: BinaryIO,
+    ffs_images: Sequence[FfsSource],
+    block_size: int = FV_BLOCK_SIZE,
+    attributes: int = FV_ATTRIBUTES,
+) -> FvLayout:
+    """Stream the firmware volume for *ffs_images* to the binary file *fs*.
+
+    Each image is a complete FFS file as written by GenFfs; its State byte
+    is inverted on the way out to match the FV erase polarity. A
+    StreamedFfsFile is encoded directly into *fs*, which must then be
+    seekable.
+    """
+    layout = plan_fv(ffs_images, block_size, attributes)
+    fs.write(fv_header(layout, block_size))
+    position = FV_HEADER_LENGTH
+
+    for image, (pad_offset, file_offset) in zip(ffs_images, layout.placements):
+        if pad_offset is not None:
+            _write_fill(fs, pad_offset - position)
+            pad_header = pad_file_header(file_offset - pad_offset)
+            fs.write(pad_header)
+            position = pad_offset + len(pad_header)
+
+        _write_fill(fs, file_offset - position)
+        if isinstance(image, ffs_builder.StreamedFfsFile):
+            image.write_to(fs, erase_polarity=True)
+            position = file_offset + image.size
+            continue
+        view = memoryview(image)
+        fs.write(view[:23])
+        fs.write(bytes([~image[23] & 0xFF]))
+        fs.write(view[24:])
+        position = file_offset + len(image)
+
+    _write_fill(fs, layout.fv_length - position)
+    return layout
+
+
+def create_fv_file(
+    s_output_file_name: str,
+    ffs_images: Sequence[FfsSource],
+    block_size: int = FV_BLOCK_SIZE,
+    attributes: int = FV_ATTRIBUTES,
+) -> FvLayout:
+    """Write *ffs_images* to *s_output_file_name* as a firmware volume."""
+    with open(s_output_file_name, "wb") as fs:
+        return write_fv(fs, ffs_images, block_size, attributes)
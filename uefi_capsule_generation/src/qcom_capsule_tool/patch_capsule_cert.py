@@ -13,29 +13,39 @@ Auto-detects the ELF type by scanning program-header payloads:
                  type tag + version + entry count).  The certificate is stored
                  as a DTB property inside one of the named DTB payload segments.
 
-Both paths accept a plain DER (.cer) certificate file.
+Both paths accept a plain DER (.cer) certificate file.  With --edits, a
+JSON spec lists several properties (certificates or plain values) that are
+all applied in the same pass; see load_edit_spec().
 
 Usage:
     qcom-capsule-tool patch-capsule-cert <input.elf> <cert.cer> <output.elf> \\
         [--prop-name QcCapsuleRootCert]
+    qcom-capsule-tool patch-capsule-cert --edits <spec.json> <input.elf> <output.elf>
+    qcom-capsule-tool patch-capsule-cert --cert <cert.cer> --output-dir <dir> \\
+        <input.elf> [<input.elf> ...] [--jobs N]
+    qcom-capsule-tool patch-capsule-cert --manifest <jobs.json> [--jobs N]
+
+The batch forms live in patch_capsule_cert_batch.
 """
 
 import argparse
-import hashlib
-import io
+import bisect
+import json
+import mmap
 import os
 import re
+import shutil
 import struct
 import sys
 import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from io import BytesIO
-from typing import List, Optional, Tuple
+from typing import BinaryIO, Dict, List, Optional, Tuple, Union, cast
 
 import libfdt
 from elftools.elf.elffile import ELFFile
 
-from qcom_capsule_tool.BinToHex import bin_to_hex
+from qcom_capsule_tool.checksum import sha384
 
 # ============================================================
 # ELF header read/write helpers  (was elf_utils.py)
@@ -67,62 +77,279 @@ def _pack(endian: str, size: int, value: int) -> bytes:
     return struct.pack(endian + {4: "I", 8: "Q"}[size], value)
 
 
-def _write_ph_field(
-    data: bytearray,
-    elf: ELFFile,
-    seg_idx: int,
-    field_off: int,
-    field_size: int,
-    value: int,
-) -> None:
-    endian = "<" if elf.little_endian else ">"
-    pos = elf.header["e_phoff"] + seg_idx * elf.header["e_phentsize"] + field_off
-    data[pos : pos + field_size] = _pack(endian, field_size, value)
+# Anything _scan_dtbs() / _apply_patch_plan() can read: file bytes or a map.
+_Buffer = Union[bytes, bytearray, mmap.mmap]
 
 
-def _write_sh_field(
-    data: bytearray,
-    elf: ELFFile,
-    sec_idx: int,
-    field_off: int,
-    field_size: int,
-    value: int,
-) -> None:
-    endian = "<" if elf.little_endian else ">"
-    pos = elf.header["e_shoff"] + sec_idx * elf.header["e_shentsize"] + field_off
-    data[pos : pos + field_size] = _pack(endian, field_size, value)
+class _MappedElf:
+    """
+    Read-only memory map of an ELF file.
 
+    Headers are parsed by ELFFile straight from the map and segment payloads
+    are handed out as memoryviews into it, so loading copies nothing; pages
+    are read from the page cache as they are touched.  Views must be
+    released before close() (the `with` block does this on success).
+    """
 
-def _update_elf_headers_for_growth(
-    data: bytearray, elf: ELFFile, seg_file_offset: int, grow: int
-) -> None:
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                raise ValueError(f"'{path}' is empty")
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        # mmap has read/seek/tell, which is all ELFFile needs of a stream.
+        self.elf = ELFFile(cast(BinaryIO, self.map))
+        self.segments = list(self.elf.iter_segments())
+
+    def __enter__(self) -> "_MappedElf":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            self.close()
+        except BufferError:
+            # Views still referenced from the failing frames pin the map;
+            # it is unmapped once they are collected.
+            if exc_type is None:
+                raise
+
+    def close(self) -> None:
+        self.map.close()
+
+    def bounds(self, ph_index: int) -> Tuple[int, int]:
+        """File offsets [start, end) of *ph_index*'s payload."""
+        seg = self.segments[ph_index]
+        return seg["p_offset"], seg["p_offset"] + seg["p_filesz"]
+
+    def view(self, ph_index: int) -> memoryview:
+        start, end = self.bounds(ph_index)
+        return memoryview(self.map)[start:end]
+
+    def read(self, ph_index: int, start: int, end: int) -> bytes:
+        """Copy bytes [start, end) of *ph_index*'s payload."""
+        base = self.segments[ph_index]["p_offset"]
+        return self.map[base + start : base + end]
+
+    def scan_dtbs(self, ph_index: int) -> List[Tuple[int, int]]:
+        """_scan_dtbs() of *ph_index*'s payload, without copying it."""
+        return _scan_dtbs(self.map, *self.bounds(ph_index))
+
+
+class _OutputImage:
     """
-    After splicing *grow* bytes at *seg_file_offset*, fix all ELF offsets that
-    point past the splice point (p_offset, sh_offset, e_shoff).
-    *elf* must be bound to the pre-splice bytes so header field positions are valid.
+    A patched ELF described as a list of pieces rather than one buffer.
+
+    Pieces are memoryview slices of the input map (unchanged or shifted
+    regions) and new segment payloads, in output order.  Header fixups and
+    hash-table updates are small overrides laid over them.  write_to()
+    streams the pieces straight to the destination file, so the output is
+    never assembled in memory.  Release the views (the `with` block does
+    this) before the input map is closed.
     """
-    is_64 = elf.elfclass == 64
-    endian = "<" if elf.little_endian else ">"
 
-    off_field, off_sz = _ph_file_offset_field(is_64)
-    for i, seg in enumerate(elf.iter_segments()):
-        if seg["p_offset"] > seg_file_offset:
-            _write_ph_field(data, elf, i, off_field, off_sz, seg["p_offset"] + grow)
+    def __init__(self) -> None:
+        self.size = 0
+        self._starts: List[int] = []
+        self._pieces: List[Union[bytes, memoryview]] = []
+        self._overrides: List[Tuple[int, bytes]] = []
+
+    def __enter__(self) -> "_OutputImage":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.release()
+
+    def release(self) -> None:
+        for piece in self._pieces:
+            if isinstance(piece, memoryview):
+                piece.release()
+        self._starts, self._pieces = [], []
+
+    def append(self, piece: Union[bytes, memoryview]) -> None:
+        if len(piece):
+            self._starts.append(self.size)
+            self._pieces.append(piece)
+            self.size += len(piece)
+
+    def write(self, pos: int, data: Union[bytes, bytearray]) -> None:
+        """Overwrite *len(data)* bytes at output offset *pos*."""
+        if pos < 0 or pos + len(data) > self.size:
+            raise ValueError(f"Write at 0x{pos:x} is outside the output image")
+        self._overrides.append((pos, bytes(data)))
+
+    def _base(self, start: int, end: int):
+        """Yield the unpatched bytes of [start, end) piece by piece."""
+        i = max(bisect.bisect_right(self._starts, start) - 1, 0)
+        while start < end and i < len(self._pieces):
+            piece_start = self._starts[i]
+            piece = self._pieces[i]
+            lo = start - piece_start
+            hi = min(end - piece_start, len(piece))
+            yield piece[lo:hi]
+            start = piece_start + hi
+            i += 1
+
+    def read(self, pos: int, size: int) -> bytearray:
+        """Copy [pos, pos + size) of the output, overrides applied."""
+        end = pos + size
+        buf = bytearray()
+        for chunk in self._base(pos, end):
+            buf += chunk
+        for o_pos, data in self._overrides:
+            lo, hi = max(pos, o_pos), min(end, o_pos + len(data))
+            if lo < hi:
+                buf[lo - pos : hi - pos] = data[lo - o_pos : hi - o_pos]
+        return buf
+
+    def write_to(self, f: BinaryIO) -> None:
+        # Overlapping or adjacent overrides are merged into windows that
+        # are materialized with read(); everything else is written as is.
+        windows: List[List[int]] = []
+        for o_pos, data in sorted(self._overrides):
+            if windows and o_pos <= windows[-1][1]:
+                windows[-1][1] = max(windows[-1][1], o_pos + len(data))
+            else:
+                windows.append([o_pos, o_pos + len(data)])
+        pos = 0
+        for start, end in windows:
+            for chunk in self._base(pos, start):
+                f.write(chunk)
+            f.write(self.read(start, end - start))
+            pos = end
+        for chunk in self._base(pos, self.size):
+            f.write(chunk)
+
+
+def _write_image(image: _OutputImage, output_path: str, mode_from: str) -> str:
+    """
+    Stream *image* to a temporary file next to *output_path* and return its
+    name.  The caller moves it into place with os.replace() once the input
+    map is closed, so an ELF can be patched onto itself.  The file gets the
+    mode of *output_path* if that exists, else of *mode_from*.
+    """
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=".", suffix=".tmp", dir=os.path.dirname(os.path.abspath(output_path))
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            image.write_to(f)
+        shutil.copymode(
+            output_path if os.path.exists(output_path) else mode_from, tmp_path
+        )
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return tmp_path
 
-    sh_off_field, sh_off_sz = _sh_offset_field(is_64)
-    for i, sec in enumerate(elf.iter_sections()):
-        if sec["sh_offset"] > seg_file_offset:
-            _write_sh_field(
-                data, elf, i, sh_off_field, sh_off_sz, sec["sh_offset"] + grow
-            )
 
-    e_shoff = elf.header["e_shoff"]
-    if e_shoff > seg_file_offset:
-        e_shoff_pos = 0x28 if is_64 else 0x20
-        e_shoff_sz = 8 if is_64 else 4
-        data[e_shoff_pos : e_shoff_pos + e_shoff_sz] = _pack(
-            endian, e_shoff_sz, e_shoff + grow
+# ============================================================
+# Hash-table segment
+# ============================================================
+
+# The hash segment is a PT_NULL program header (segment type 2 in p_flags
+# bits 24-26).  After a version-dependent header it holds one SHA-384 slot
+# per program header in PH order: PH#0 (ELF + program headers) first, a
+# zero slot for the hash segment itself, and zeros for empty segments.
+
+_HASH_SIZE = 48
+_PF_SEGMENT_TYPE_SHIFT = 24
+_PF_SEGMENT_TYPE_HASH = 2
+
+
+@dataclass
+class _HashTable:
+    """
+    Digest slots of an ELF's hash-table segment.
+
+    The table is anchored by PH#0's SHA-384 (its first slot), so the header
+    version does not matter; slot *i* of program header *i* is then at
+    *table_off* + 48 * i within the segment.
+    """
+
+    ph_index: int
+    table_off: int
+    size: int
+
+    @classmethod
+    def parse(cls, elf: ELFFile) -> "_HashTable":
+        segments = list(elf.iter_segments())
+        if not segments:
+            raise ValueError("ELF has no program headers")
+        anchor = sha384(segments[0].data())
+
+        candidates = [
+            i
+            for i, seg in enumerate(segments)
+            if i > 0 and seg["p_type"] == "PT_NULL" and seg["p_filesz"] >= _HASH_SIZE
+        ]
+        # Segments flagged as the hash segment first, any other PT_NULL after.
+        candidates.sort(
+            key=lambda i: (
+                (segments[i]["p_flags"] >> _PF_SEGMENT_TYPE_SHIFT) & 7
+                != _PF_SEGMENT_TYPE_HASH
+            )
         )
+        for i in candidates:
+            data = segments[i].data()
+            pos = data.find(anchor)
+            if pos == -1:
+                continue
+            if data.find(anchor, pos + 1) != -1:
+                raise ValueError(
+                    f"Hash table in PH#{i} is ambiguous: the SHA-384 of PH#0 "
+                    "appears more than once"
+                )
+            return cls(i, pos, len(data))
+        raise ValueError("No hash-table segment holds the SHA-384 of PH#0")
+
+    def slot(self, ph_index: int) -> int:
+        """Offset of *ph_index*'s digest slot within the hash segment."""
+        pos = self.table_off + ph_index * _HASH_SIZE
+        if ph_index == self.ph_index or pos + _HASH_SIZE > self.size:
+            raise ValueError(
+                f"Hash table in PH#{self.ph_index} has no slot for PH#{ph_index}"
+            )
+        return pos
+
+    def update(
+        self,
+        data: bytearray,
+        seg_file_off: int,
+        digests: Dict[int, Tuple[bytes, bytes]],
+    ) -> Dict[int, int]:
+        """
+        Write new digests into the table in *data*, whose hash segment starts
+        at *seg_file_off*.  *digests* maps PH index -> (old, new); every slot
+        is checked against its old digest before any is written.  Returns
+        PH index -> file offset of the slot.
+        """
+        positions = {}
+        for ph_index, (old, _) in sorted(digests.items()):
+            pos = seg_file_off + self.slot(ph_index)
+            found = bytes(data[pos : pos + _HASH_SIZE])
+            if found != old:
+                raise ValueError(
+                    f"Hash slot of PH#{ph_index} at file offset 0x{pos:x} does not "
+                    f"hold its SHA-384 (found {found.hex()[:16]}..., "
+                    f"expected {old.hex()[:16]}...)"
+                )
+            positions[ph_index] = pos
+        for ph_index, (_, new) in digests.items():
+            pos = positions[ph_index]
+            data[pos : pos + _HASH_SIZE] = new
+        return positions
+
+    def replace_extra(
+        self, data: bytearray, seg_file_off: int, old: bytes, new: bytes
+    ) -> int:
+        """
+        Replace a digest stored outside the per-PH slots (e.g. per-DTB
+        hashes).  Returns its file offset, or -1 if the table has none.
+        """
+        end = seg_file_off + self.size
+        pos = data.find(old, seg_file_off, end)
+        if pos != -1:
+            data[pos : pos + _HASH_SIZE] = new
+        return pos
 
 
 # ============================================================
@@ -168,6 +395,72 @@ def _encode_dtb_value(value: str) -> bytes:
     return value.encode("utf-8")
 
 
+def encode_cert_value(der: bytes) -> bytes:
+    """
+    Encode a DER certificate as the QcCapsuleRootCert property value.
+
+    Byte-for-byte the same as bin_to_hex() followed by "@list:" parsing: a
+    big-endian length word, then the certificate in 32-bit big-endian words
+    with a short last word zero-filled on the left.
+    """
+    aligned = len(der) & ~3
+    tail = der[aligned:]
+    if tail:
+        tail = b"\x00" * (4 - len(tail)) + tail
+    return struct.pack(">I", len(der)) + der[:aligned] + tail
+
+
+def load_cert_value(cert_cer_path: str) -> bytes:
+    """Read a DER certificate file and return its encoded property value."""
+    with open(cert_cer_path, "rb") as f:
+        return encode_cert_value(f.read())
+
+
+def set_dtb_properties(
+    dtb: bytes,
+    props: List[Tuple[str, str, bytes]],
+    extra_space: int = 1024,
+) -> bytes:
+    """
+    Set or add every (node path, property, value) of *props* in an
+    in-memory DTB and return the patched blob, automatically resizing if
+    needed.  The DTB is parsed and serialized once.  No files are touched.
+    """
+    fdt_obj = libfdt.Fdt(dtb)
+
+    for node_path, prop_name, value in props:
+        # Looked up per property: setprop() moves the nodes after the one
+        # it changes.
+        try:
+            node_off = fdt_obj.path_offset(node_path)
+        except libfdt.FdtException:
+            raise ValueError(f"Node path '{node_path}' not found in DTB")
+
+        try:
+            fdt_obj.setprop(node_off, prop_name, value)
+        except libfdt.FdtException as e:
+            if hasattr(e, "err") and e.err == -libfdt.FDT_ERR_NOSPACE:
+                fdt_obj.resize(
+                    len(fdt_obj.as_bytearray()) + max(len(value), extra_space)
+                )
+                fdt_obj.setprop(node_off, prop_name, value)
+            else:
+                raise
+
+    return bytes(fdt_obj.as_bytearray())
+
+
+def set_dtb_property(
+    dtb: bytes,
+    node_path: str,
+    prop_name: str,
+    value: bytes,
+    extra_space: int = 1024,
+) -> bytes:
+    """set_dtb_properties() for a single property."""
+    return set_dtb_properties(dtb, [(node_path, prop_name, value)], extra_space)
+
+
 def _set_dtb_property(
     dtb_path: str,
     node_path: str,
@@ -176,32 +469,16 @@ def _set_dtb_property(
     out_path: str,
     extra_space: int = 1024,
 ) -> None:
-    """Set or add a property in a DTB, automatically resizing if needed."""
+    """File-based wrapper around set_dtb_property() taking a value string."""
     with open(dtb_path, "rb") as f:
         dtb_data = f.read()
 
-    fdt_obj = libfdt.Fdt(dtb_data)
-
-    try:
-        node_off = fdt_obj.path_offset(node_path)
-    except libfdt.FdtException:
-        raise ValueError(f"Node path '{node_path}' not found in DTB")
-
-    value_bytes = _encode_dtb_value(value)
-
-    try:
-        fdt_obj.setprop(node_off, prop_name, value_bytes)
-    except libfdt.FdtException as e:
-        if hasattr(e, "err") and e.err == -libfdt.FDT_ERR_NOSPACE:
-            fdt_obj.resize(
-                len(fdt_obj.as_bytearray()) + max(len(value_bytes), extra_space)
-            )
-            fdt_obj.setprop(node_off, prop_name, value_bytes)
-        else:
-            raise
+    patched = set_dtb_property(
+        dtb_data, node_path, prop_name, _encode_dtb_value(value), extra_space
+    )
 
     with open(out_path, "wb") as f:
-        f.write(fdt_obj.as_bytearray())
+        f.write(patched)
 
 
 # ============================================================
@@ -212,18 +489,44 @@ DTB_MAGIC = 0xD00DFEED
 _DEFAULT_PROP_NAME = "QcCapsuleRootCert"
 
 
-def _scan_dtbs(data: bytes) -> List[Tuple[int, int]]:
-    """Return (offset, totalsize) for every DTB found in *data*."""
+_DTB_MAGIC_BYTES = struct.pack(">I", DTB_MAGIC)
+
+
+def _find_dtb_magic(
+    data: _Buffer, start: int = 0, end: Optional[int] = None, base: int = 0
+) -> int:
+    """
+    Return the first offset in [*start*, *end*) of the FDT magic in *data*
+    that is 4-byte aligned relative to *base*, or -1.  find() skips between
+    candidates in C; unaligned hits are stepped over.
+    """
+    if end is None:
+        end = len(data)
+    pos = data.find(_DTB_MAGIC_BYTES, start, end)
+    while (pos - base) & 3 and pos != -1:
+        pos = data.find(_DTB_MAGIC_BYTES, base + ((pos - base + 3) & ~3), end)
+    return pos
+
+
+def _scan_dtbs(
+    data: _Buffer, start: int = 0, end: Optional[int] = None
+) -> List[Tuple[int, int]]:
+    """
+    Return (offset, totalsize) for every DTB found in data[start:end];
+    offsets are relative to *start*.
+    """
+    if end is None:
+        end = len(data)
     results: List[Tuple[int, int]] = []
-    i = 0
-    while i <= len(data) - 8:
-        if struct.unpack(">I", data[i : i + 4])[0] == DTB_MAGIC:
-            size = struct.unpack(">I", data[i + 4 : i + 8])[0]
-            if size >= 8 and i + size <= len(data):
-                results.append((i, size))
-                i = (i + size + 3) & ~3
-                continue
-        i += 4
+    i = _find_dtb_magic(data, start, end, start)
+    while i != -1 and i <= end - 8:
+        size = struct.unpack_from(">I", data, i + 4)[0]
+        if size >= 8 and i + size <= end:
+            results.append((i - start, size))
+            next_off = start + ((i - start + size + 3) & ~3)
+            i = _find_dtb_magic(data, next_off, end, start)
+        else:
+            i = _find_dtb_magic(data, i + 4, end, start)
     return results
 
 
@@ -241,18 +544,8 @@ def _fdt_next_subnode(fdt: libfdt.Fdt, node_off: int) -> int:
         return -1
 
 
-def _find_cert_node(
-    dtb_bytes: bytes, prop_name: str = _DEFAULT_PROP_NAME
-) -> Optional[str]:
-    """
-    Walk *dtb_bytes* and return the first node path that owns *prop_name*.
-    Handles both regular DTBs (/sw/uefi/uefiplat) and overlay DTBs
-    (/fragment@N/__overlay__/.../uefiplat) without dtc dependency.
-    """
-    try:
-        fdt = libfdt.Fdt(dtb_bytes)
-    except Exception:
-        return None
+def _walk_cert_node(fdt: libfdt.Fdt, prop_name: str) -> Optional[str]:
+    """Return the first node path (depth first) of *fdt* that owns *prop_name*."""
 
     def _walk(node_off: int, path: str) -> Optional[str]:
         try:
@@ -281,33 +574,219 @@ def _find_cert_node(
         return None
 
 
-def _patch_dtb(
-    dtb_bytes: bytes,
-    node_path: str,
-    cert_inc_path: str,
-    prop_name: str = _DEFAULT_PROP_NAME,
-) -> bytes:
-    """Patch *prop_name* in a single DTB and return the patched bytes."""
-    tmp_in = tmp_out = ""
+def _find_cert_node(
+    dtb_bytes: bytes, prop_name: str = _DEFAULT_PROP_NAME
+) -> Optional[str]:
+    """
+    Walk *dtb_bytes* and return the first node path that owns *prop_name*.
+    Handles both regular DTBs (/sw/uefi/uefiplat) and overlay DTBs
+    (/fragment@N/__overlay__/.../uefiplat) without dtc dependency.
+    """
     try:
-        tmp_in_fd, tmp_in = tempfile.mkstemp(suffix=".dtb")
-        os.close(tmp_in_fd)
-        with open(tmp_in, "wb") as f:
-            f.write(dtb_bytes)
-        tmp_out_fd, tmp_out = tempfile.mkstemp(suffix=".dtb")
-        os.close(tmp_out_fd)
-        os.unlink(tmp_out)
-        _set_dtb_property(
-            tmp_in, node_path, prop_name, f"@list:{cert_inc_path}", tmp_out
-        )
-        with open(tmp_out, "rb") as f:
-            return f.read()
-    finally:
-        for p in (tmp_in, tmp_out):
+        fdt = libfdt.Fdt(dtb_bytes)
+    except Exception:
+        return None
+    return _walk_cert_node(fdt, prop_name)
+
+
+class _CertNodeLocator:
+    """
+    _walk_cert_node() for a run of similar DTBs.
+
+    Board-variant DTBs of one image share their node hierarchy, so the
+    paths found so far (most recent first) are tried with one
+    path_offset()/getprop() each before falling back to the full walk.
+    A DTB that carries *prop_name* at more than one node resolves to the
+    hinted one; certificate DTBs carry it once.
+    """
+
+    MAX_HINTS = 8
+
+    def __init__(self, prop_name: str = _DEFAULT_PROP_NAME):
+        self.prop_name = prop_name
+        self.hints: List[str] = []
+        self.lookups = 0
+        self.hits = 0
+        self.walks = 0
+        self.missing = 0
+
+    def locate(self, fdt: libfdt.Fdt) -> Optional[str]:
+        """Return the path of the node of *fdt* that owns the property."""
+        self.lookups += 1
+        for path in self.hints:
             try:
-                os.unlink(p)
-            except OSError:
-                pass
+                fdt.getprop(fdt.path_offset(path), self.prop_name)
+            except libfdt.FdtException:
+                continue
+            self.hits += 1
+            self._remember(path)
+            return path
+
+        self.walks += 1
+        found = _walk_cert_node(fdt, self.prop_name)
+        if found is None:
+            self.missing += 1
+        else:
+            self._remember(found)
+        return found
+
+    def merge(self, other: "_CertNodeLocator") -> None:
+        """Add the counters of a locator that ran in a worker process."""
+        self.lookups += other.lookups
+        self.hits += other.hits
+        self.walks += other.walks
+        self.missing += other.missing
+
+    def _remember(self, path: str) -> None:
+        if self.hints and self.hints[0] == path:
+            return
+        if path in self.hints:
+            self.hints.remove(path)
+        self.hints.insert(0, path)
+        del self.hints[self.MAX_HINTS :]
+
+    def stats(self) -> str:
+        rate = 100 * self.hits // self.lookups if self.lookups else 0
+        return (
+            f"{self.lookups} lookups, {self.hits} from path hints ({rate}%), "
+            f"{self.walks} full walks, {self.missing} without the property"
+        )
+
+
+# ============================================================
+# DTB edits  (patch-capsule-cert --edits)
+# ============================================================
+
+
+class DtbEditSpecError(ValueError):
+    """Raised for an invalid --edits spec."""
+
+
+@dataclass
+class DtbEdit:
+    """
+    Set *prop_name* to the encoded *value* in every DTB that has
+    *node_path*, or, when it is None, at the node that already carries
+    *prop_name* (found like the certificate node).
+    """
+
+    prop_name: str
+    value: bytes
+    node_path: Optional[str] = None
+
+
+def load_edit_spec(spec_file: str) -> List[DtbEdit]:
+    """
+    Parse a JSON edit spec:
+
+        {
+            "edits": [
+                {"property": "QcCapsuleRootCert", "cert": "QcFMPRoot.cer"},
+                {"property": "QcCapsuleBackupCert", "cert": "Backup.cer",
+                 "node": "/sw/uefi/uefiplat"},
+                {"property": "QcPlatformFlags", "value": "0x3",
+                 "node": "/sw/uefi/uefiplat"}
+            ]
+        }
+
+    "node" is a node path, or "auto" (the default) for the node that holds
+    the property already.  The value is a DER certificate ("cert", encoded
+    as for QcCapsuleRootCert) or a value string ("value", see
+    _encode_dtb_value()).  Relative paths, including those after @file: and
+    @list:, are resolved against the spec's directory.
+    """
+    try:
+        with open(spec_file) as f:
+            spec = json.load(f)
+    except (OSError, ValueError) as e:
+        raise DtbEditSpecError(f"Cannot read edit spec {spec_file}: {e}")
+    if not isinstance(spec, dict) or not isinstance(spec.get("edits"), list):
+        raise DtbEditSpecError(f'{spec_file}: an "edits" list is required')
+
+    base_dir = os.path.dirname(os.path.abspath(spec_file))
+    edits = []
+    seen = set()
+    for index, entry in enumerate(spec["edits"]):
+        where = f"{spec_file}: edits[{index}]"
+        if not isinstance(entry, dict) or not entry.get("property"):
+            raise DtbEditSpecError(f'{where}: a "property" name is required')
+        prop_name = str(entry["property"])
+        node = entry.get("node", "auto")
+        if not isinstance(node, str) or not (node == "auto" or node.startswith("/")):
+            raise DtbEditSpecError(f'{where}: "node" must be "auto" or a node path')
+        if ("cert" in entry) == ("value" in entry):
+            raise DtbEditSpecError(f'{where}: give one of "cert" or "value"')
+        try:
+            if "cert" in entry:
+                value = load_cert_value(os.path.join(base_dir, entry["cert"]))
+            else:
+                text = str(entry["value"]).strip()
+                if text.startswith(("@file:", "@list:")):
+                    text = text[:6] + os.path.join(base_dir, text[6:])
+                value = _encode_dtb_value(text)
+        except (OSError, ValueError) as e:
+            raise DtbEditSpecError(f"{where}: {e}")
+        if (node, prop_name) in seen:
+            raise DtbEditSpecError(f"{where}: '{prop_name}' at {node} is set twice")
+        seen.add((node, prop_name))
+        edits.append(DtbEdit(prop_name, value, None if node == "auto" else node))
+    if not edits:
+        raise DtbEditSpecError(f"{spec_file}: no edits listed")
+    return edits
+
+
+def _describe_props(edits: List[DtbEdit]) -> str:
+    names = ", ".join(f"'{e.prop_name}'" for e in edits)
+    return f"property {names}" if len(edits) == 1 else f"properties {names}"
+
+
+class _DtbEditor:
+    """
+    Applies a list of DtbEdits to DTBs: each DTB is parsed once to find
+    the nodes the edits apply to, then patched once with all of them.
+    """
+
+    def __init__(self, edits: List[DtbEdit]):
+        self.edits = edits
+        self.locators = {
+            e.prop_name: _CertNodeLocator(e.prop_name)
+            for e in edits
+            if e.node_path is None
+        }
+
+    def targets(self, dtb_bytes: bytes) -> List[Tuple[str, DtbEdit]]:
+        """(node path, edit) for every edit that applies to *dtb_bytes*."""
+        try:
+            fdt = libfdt.Fdt(dtb_bytes)
+        except Exception:
+            return []
+        found = []
+        for edit in self.edits:
+            if edit.node_path is None:
+                path = self.locators[edit.prop_name].locate(fdt)
+            else:
+                try:
+                    fdt.path_offset(edit.node_path)
+                    path = edit.node_path
+                except libfdt.FdtException:
+                    path = None
+            if path is not None:
+                found.append((path, edit))
+        return found
+
+    def apply(self, dtb_bytes: bytes, targets: List[Tuple[str, DtbEdit]]) -> bytes:
+        return set_dtb_properties(
+            dtb_bytes, [(path, e.prop_name, e.value) for path, e in targets]
+        )
+
+    def merge(self, other: "_DtbEditor") -> None:
+        """Add the locator counters of an editor that ran in a worker."""
+        for prop_name, locator in other.locators.items():
+            self.locators[prop_name].merge(locator)
+
+    def report(self, label: str) -> None:
+        for prop_name, locator in self.locators.items():
+            print(f"[i] {label}: '{prop_name}' node {locator.stats()}")
 
 
 # ============================================================
@@ -397,14 +876,6 @@ def _parse_meta_items_v2(
     return items, cur
 
 
-def _load_elf(elf_path: str) -> Tuple[bytearray, ELFFile, List]:
-    with open(elf_path, "rb") as f:
-        file_bytes = f.read()
-    data = bytearray(file_bytes)
-    elf = ELFFile(io.BytesIO(file_bytes))
-    return data, elf, list(elf.iter_segments())
-
-
 def _parse_metadata_from_ph(
     elf: ELFFile, meta_ph_index: int
 ) -> Tuple[_MetaHeader, List[_MetaItemV2], bytes, int]:
@@ -421,123 +892,215 @@ def _parse_metadata_from_ph(
     return hdr, items, meta_blob, meta_file_off
 
 
-def _replace_ph(
-    elf_path: str,
-    target_ph_index: int,
-    new_file: str,
-    output_file: str,
-    meta_ph_index: int,
-) -> None:
-    """
-    Replace the payload in *target_ph_index* with the contents of *new_file*,
-    then update p_filesz/p_memsz, metadata item_size, and SHA-384 hash.
-    """
-    data, elf, segments = _load_elf(elf_path)
-
-    if target_ph_index >= len(segments):
-        raise IndexError(f"Target program header #{target_ph_index} not found")
-
-    old_seg = segments[target_ph_index]
-    old_data = old_seg.data()
-    old_size = old_seg["p_filesz"]
-    seg_offset = old_seg["p_offset"]
-
-    with open(new_file, "rb") as f:
-        new_data = f.read()
-    new_size = len(new_data)
+@dataclass
+class _SegmentPatch:
+    """Replace bytes [start, end) of program header *ph_index*'s payload."""
 
-    old_hash = hashlib.sha384(old_data[:old_size]).digest()
-    new_hash = hashlib.sha384(new_data).digest()
+    ph_index: int
+    start: int
+    end: int
+    data: bytes
 
-    print(
-        f"[i] Replacing PH#{target_ph_index}: old size={old_size}, new size={new_size}"
-    )
-    print(f"[i] Old SHA-384: {old_hash.hex()}")
-    print(f"[i] New SHA-384: {new_hash.hex()}")
 
+def _apply_patch_plan(
+    raw: _Buffer,
+    elf: ELFFile,
+    plan: List[_SegmentPatch],
+    meta_ph_index: Optional[int],
+    extra_digests: Optional[List[Tuple[bytes, bytes]]] = None,
+) -> _OutputImage:
+    """
+    Apply every patch in *plan* to *raw* and return the new file as an
+    _OutputImage.  *elf* must be bound to *raw*, which may be a memory map:
+    only the patched segments are read out of it, every other region
+    (shifted or not) is referenced as a view and only copied when the image
+    is written out.  Header fields and hash slots are patched as overrides.
+
+    Each patched segment is rebuilt once.  A segment that shrinks keeps its
+    file footprint (zero padded); one that grows is spliced in and every
+    p_offset, sh_offset and e_shoff past it moves by the cumulative growth.
+    p_filesz/p_memsz, the XBLConfig metadata item_size and the hash-table
+    slots of each patched segment, PH#0 and the metadata PH (if any) are
+    then updated together.  *extra_digests* are (old, new) pairs stored
+    outside the per-PH slots, e.g. per-DTB hashes.
+    """
+    segments = list(elf.iter_segments())
     is_64 = elf.elfclass == 64
-    grow_size = new_size - old_size
-
-    # Save hashes of segments whose content will be modified by side effects:
-    # - PH#0 (ELF/program header segment): _write_ph_field and
-    #   _update_elf_headers_for_growth both write into the program header table,
-    #   which lives inside PH#0's file region.
-    # - PH#meta_ph_index (XBLConfig metadata segment): metadata item_size is
-    #   patched directly inside this segment's payload.
-    # These must be captured before any writes so the old hashes can be located
-    # and replaced in the hash table after all modifications are done.
-    side_effect_phs: List[Tuple[int, bytes]] = []
-    for ph_i in set([0, meta_ph_index]):
-        if ph_i == target_ph_index or ph_i >= len(segments):
+    endian = "<" if elf.little_endian else ">"
+    table = _HashTable.parse(elf)
+
+    by_segment: dict = {}
+    for patch in plan:
+        if patch.ph_index >= len(segments):
+            raise IndexError(f"Target program header #{patch.ph_index} not found")
+        by_segment.setdefault(patch.ph_index, []).append(patch)
+
+    # New payload for every patched segment, and the splices that put them
+    # into the file: (file offset, old size, replacement bytes, growth).
+    new_payloads = {}
+    old_hashes = {}
+    splices = []
+    for ph_index, patches in sorted(by_segment.items()):
+        seg = segments[ph_index]
+        old_data = seg.data()
+        old_hashes[ph_index] = sha384(old_data)
+        pieces = []
+        prev = 0
+        for patch in sorted(patches, key=lambda p: p.start):
+            if patch.start < prev:
+                raise ValueError(f"Overlapping patches in PH#{ph_index}")
+            pieces += [old_data[prev : patch.start], patch.data]
+            prev = patch.end
+        pieces.append(old_data[prev:])
+        new_data = b"".join(pieces)
+        new_payloads[ph_index] = new_data
+
+        old_size = seg["p_filesz"]
+        new_size = len(new_data)
+        print(f"[i] Replacing PH#{ph_index}: old size={old_size}, new size={new_size}")
+        print(f"[i] Old SHA-384: {old_hashes[ph_index].hex()}")
+        print(f"[i] New SHA-384: {sha384(new_data).hex()}")
+        if new_size <= old_size:
+            splices.append(
+                (
+                    seg["p_offset"],
+                    old_size,
+                    new_data + b"\x00" * (old_size - new_size),
+                    0,
+                )
+            )
+        else:
+            splices.append((seg["p_offset"], old_size, new_data, new_size - old_size))
+    splices.sort(key=lambda s: s[0])
+
+    def shifted(pos: int) -> int:
+        """Map an offset in *raw* to its offset in the output."""
+        return pos + sum(grow for off, _, _, grow in splices if off < pos)
+
+    # Hashes of the segments that change as a side effect: PH#0 holds the
+    # program header table, the metadata PH holds the item sizes.
+    side_effect_hashes = []
+    for ph_i in sorted({0} if meta_ph_index is None else {0, meta_ph_index}):
+        if ph_i in new_payloads or ph_i >= len(segments):
             continue
-        seg_i = segments[ph_i]
-        d = seg_i.data()
+        d = segments[ph_i].data()
         if d:
-            side_effect_phs.append((ph_i, hashlib.sha384(d).digest()))
+            side_effect_hashes.append((ph_i, sha384(d)))
 
-    if grow_size <= 0:
-        data[seg_offset : seg_offset + new_size] = new_data
-        if grow_size < 0:
-            data[seg_offset + new_size : seg_offset + old_size] = b"\x00" * (-grow_size)
-    else:
-        tail = bytes(data[seg_offset + old_size :])
-        data[seg_offset : seg_offset + new_size] = new_data
-        new_tail_start = seg_offset + new_size
-        data[new_tail_start : new_tail_start + len(tail)] = tail
-        data.extend(b"\x00" * grow_size)
-        _update_elf_headers_for_growth(data, elf, seg_offset, grow_size)
-
-    filesz_field, filesz_field_sz = _ph_filesz_field(is_64)
-    memsz_field, memsz_field_sz = _ph_memsz_field(is_64)
-    _write_ph_field(data, elf, target_ph_index, filesz_field, filesz_field_sz, new_size)
-    _write_ph_field(data, elf, target_ph_index, memsz_field, memsz_field_sz, new_size)
-
-    meta_item_index = target_ph_index - (meta_ph_index + 1)
-    if meta_item_index >= 0:
+    image = _OutputImage()
+    prev = 0
+    with memoryview(raw) as src:
+        for off, old_size, replacement, _ in splices:
+            image.append(src[prev:off])
+            image.append(replacement)
+            prev = off + old_size
+        image.append(src[prev:])
+
+    def write_field(pos: int, size: int, value: int) -> None:
+        image.write(shifted(pos), _pack(endian, size, value))
+
+    phoff, phentsize = elf.header["e_phoff"], elf.header["e_phentsize"]
+    off_field, off_sz = _ph_file_offset_field(is_64)
+    filesz_field, filesz_sz = _ph_filesz_field(is_64)
+    memsz_field, memsz_sz = _ph_memsz_field(is_64)
+    for i, seg in enumerate(segments):
+        base = phoff + i * phentsize
+        if shifted(seg["p_offset"]) != seg["p_offset"]:
+            write_field(base + off_field, off_sz, shifted(seg["p_offset"]))
+        if i in new_payloads:
+            write_field(base + filesz_field, filesz_sz, len(new_payloads[i]))
+            write_field(base + memsz_field, memsz_sz, len(new_payloads[i]))
+
+    shoff, shentsize = elf.header["e_shoff"], elf.header["e_shentsize"]
+    sh_off_field, sh_off_sz = _sh_offset_field(is_64)
+    for i, sec in enumerate(elf.iter_sections()):
+        if shifted(sec["sh_offset"]) != sec["sh_offset"]:
+            write_field(
+                shoff + i * shentsize + sh_off_field,
+                sh_off_sz,
+                shifted(sec["sh_offset"]),
+            )
+    if shifted(shoff) != shoff:
+        e_shoff_pos = 0x28 if is_64 else 0x20
+        write_field(e_shoff_pos, 8 if is_64 else 4, shifted(shoff))
+
+    meta_items: List[_MetaItemV2] = []
+    meta_file_off = 0
+    if meta_ph_index is not None:
         try:
-            _, items, _, meta_file_off = _parse_metadata_from_ph(elf, meta_ph_index)
-            if meta_item_index < len(items):
-                it = items[meta_item_index]
-                abs_field_off = meta_file_off + it.start_off + 8
-                data[abs_field_off : abs_field_off + 4] = struct.pack("<I", new_size)
-                print(
-                    f"[i] Updated metadata item[{meta_item_index}] ('{it.config_name}') "
-                    f"item_size: {it.item_size} -> {new_size}"
-                )
-            else:
-                print(
-                    f"[!] meta_item_index={meta_item_index} out of range; item_size not updated"
-                )
+            _, meta_items, _, meta_file_off = _parse_metadata_from_ph(
+                elf, meta_ph_index
+            )
         except Exception as exc:
             print(f"[!] Could not update metadata item_size: {exc}")
-
-    pos = bytes(data).find(old_hash)
-    if pos != -1:
-        print(f"[i] Found old SHA-384 at file offset 0x{pos:x}; replacing")
-        data[pos : pos + len(new_hash)] = new_hash
-    else:
-        print("[!] Old SHA-384 hash not found in ELF binary; hash table not updated")
-
-    # Update hashes for side-effect segments (PH#0 and metadata PH).
-    data_bytes = bytes(data)
-    for ph_i, old_h in side_effect_phs:
-        seg_i = segments[ph_i]
-        new_h = hashlib.sha384(
-            data_bytes[seg_i["p_offset"] : seg_i["p_offset"] + seg_i["p_filesz"]]
-        ).digest()
-        if old_h == new_h:
+    for ph_index, new_data in sorted(new_payloads.items()):
+        if meta_ph_index is None or not meta_items:
             continue
-        pos = data_bytes.find(old_h)
-        if pos != -1:
-            data[pos : pos + 48] = new_h
-            print(f"[i] PH#{ph_i} SHA-384 updated at file offset 0x{pos:x}")
+        meta_item_index = ph_index - (meta_ph_index + 1)
+        if meta_item_index < 0:
+            continue
+        if meta_item_index < len(meta_items):
+            it = meta_items[meta_item_index]
+            write_field(meta_file_off + it.start_off + 8, 4, len(new_data))
+            print(
+                f"[i] Updated metadata item[{meta_item_index}] ('{it.config_name}') "
+                f"item_size: {it.item_size} -> {len(new_data)}"
+            )
         else:
             print(
-                f"[!] PH#{ph_i} SHA-384 not found in ELF binary; hash table not updated"
+                f"[!] meta_item_index={meta_item_index} out of range; item_size not updated"
             )
 
-    with open(output_file, "wb") as out:
-        out.write(data)
+    digests = {
+        ph_index: (old_hashes[ph_index], sha384(new_data))
+        for ph_index, new_data in new_payloads.items()
+    }
+    for ph_i, old_h in side_effect_hashes:
+        seg = segments[ph_i]
+        start = shifted(seg["p_offset"])
+        new_h = sha384(image.read(start, seg["p_filesz"]))
+        if new_h != old_h:
+            digests[ph_i] = (old_h, new_h)
+
+    # The hash segment is updated in a copy and laid over the image whole.
+    hash_off = shifted(segments[table.ph_index]["p_offset"])
+    hash_seg = image.read(hash_off, table.size)
+    for ph_i, pos in sorted(table.update(hash_seg, 0, digests).items()):
+        print(f"[i] PH#{ph_i} SHA-384 updated at file offset 0x{hash_off + pos:x}")
+
+    # After the slots, so a DTB that fills its segment is not matched in
+    # the segment's own slot.
+    for old_h, new_h in extra_digests or []:
+        pos = table.replace_extra(hash_seg, 0, old_h, new_h)
+        if pos != -1:
+            print(f"[i] Per-DTB SHA-384 updated at file offset 0x{hash_off + pos:x}")
+    image.write(hash_off, hash_seg)
+
+    return image
+
+
+def _replace_ph(
+    elf_path: str,
+    target_ph_index: int,
+    new_file: str,
+    output_file: str,
+    meta_ph_index: int,
+) -> None:
+    """
+    Replace the payload in *target_ph_index* with the contents of *new_file*,
+    then update p_filesz/p_memsz, metadata item_size, and SHA-384 hash.
+    """
+    with open(new_file, "rb") as f:
+        new_data = f.read()
+    with _MappedElf(elf_path) as m:
+        if target_ph_index >= len(m.segments):
+            raise IndexError(f"Target program header #{target_ph_index} not found")
+        old_size = m.segments[target_ph_index]["p_filesz"]
+        plan = [_SegmentPatch(target_ph_index, 0, old_size, new_data)]
+        with _apply_patch_plan(m.map, m.elf, plan, meta_ph_index) as image:
+            tmp_path = _write_image(image, output_file, elf_path)
+
+    os.replace(tmp_path, output_file)
     print(f"[+] Written patched ELF to '{output_file}'")
 
 
@@ -556,171 +1119,164 @@ def _get_dtb_model(dtb_bytes: bytes) -> str:
         return "unknown"
 
 
-def _patch_uefi_dtbs(
-    elf_path: str,
-    cert_inc_path: str,
-    output_path: str,
-    prop_name: str = _DEFAULT_PROP_NAME,
-) -> List[dict]:
-    """
-    Patch *prop_name* in every DTB embedded in a uefi_dtbs ELF.
-
-    Returns a list of result dicts (one per DTB found) with keys:
-    segment, dtb_index, offset, model, node_path, status.
-    """
-    with open(elf_path, "rb") as f:
-        raw = bytearray(f.read())
+# Below this many DTBs a uefi_dtbs ELF is patched without a process pool.
+_MIN_PARALLEL_DTBS = 8
 
-    elf0 = ELFFile(BytesIO(bytes(raw)))
-    seg_indices_with_dtbs = [
-        i for i, seg in enumerate(elf0.iter_segments()) if _scan_dtbs(seg.data())
-    ]
 
-    results: List[dict] = []
-
-    for seg_idx in seg_indices_with_dtbs:
-        elf = ELFFile(BytesIO(bytes(raw)))
-        is_64 = elf.elfclass == 64
-
-        seg = list(elf.iter_segments())[seg_idx]
-        seg_data = bytearray(seg.data())
-        seg_file_offset = seg["p_offset"]
-        orig_seg_size = len(seg_data)
-
-        dtbs = _scan_dtbs(bytes(seg_data))
-        old_seg_hash = hashlib.sha384(bytes(seg_data)).digest()
+@dataclass
+class _DtbPatch:
+    """
+    Outcome of patching one DTB: the (node path, property) pairs it was
+    edited at, none if no edit applies.  *data* is None unless it was
+    patched.
+    """
 
-        delta = 0
-        seg_modified = False
-        per_dtb_hash_pairs: List[Tuple[bytes, bytes]] = []
+    model: str
+    targets: List[Tuple[str, str]]
+    data: Optional[bytes] = None
+    error: Optional[str] = None
+    old_hash: bytes = b""
+    new_hash: bytes = b""
 
-        for dtb_idx, (dtb_off_orig, dtb_sz) in enumerate(dtbs):
-            dtb_off = dtb_off_orig + delta
-            dtb_bytes = bytes(seg_data[dtb_off : dtb_off + dtb_sz])
 
+def _patch_dtb_spans(
+    elf_path: str,
+    spans: List[Tuple[int, int]],
+    edits: List[DtbEdit],
+) -> Tuple[List[_DtbPatch], _DtbEditor]:
+    """
+    Read, edit and hash the DTBs at file *spans* (offset, size) of
+    *elf_path*.  Runs in a worker process when DTBs are patched in parallel.
+    """
+    editor = _DtbEditor(edits)
+    outcomes = []
+    with open(elf_path, "rb") as f:
+        for offset, size in spans:
+            f.seek(offset)
+            dtb_bytes = f.read(size)
             model = _get_dtb_model(dtb_bytes)
-            node_path = _find_cert_node(dtb_bytes, prop_name)
-
-            if node_path is None:
-                results.append(
-                    dict(
-                        segment=seg_idx,
-                        dtb_index=dtb_idx,
-                        offset=dtb_off,
-                        model=model,
-                        node_path=None,
-                        status=f"skip (no {prop_name})",
-                    )
-                )
+            targets = editor.targets(dtb_bytes)
+            where = [(path, e.prop_name) for path, e in targets]
+            if not targets:
+                outcomes.append(_DtbPatch(model, where))
                 continue
-
             try:
-                old_dtb_hash = hashlib.sha384(dtb_bytes).digest()
-                patched = _patch_dtb(dtb_bytes, node_path, cert_inc_path, prop_name)
-                new_dtb_hash = hashlib.sha384(patched).digest()
+                patched = editor.apply(dtb_bytes, targets)
             except Exception as exc:
-                results.append(
-                    dict(
-                        segment=seg_idx,
-                        dtb_index=dtb_idx,
-                        offset=dtb_off,
-                        model=model,
-                        node_path=node_path,
-                        status=f"error: {exc}",
-                    )
-                )
+                outcomes.append(_DtbPatch(model, where, error=str(exc)))
                 continue
-
-            per_dtb_hash_pairs.append((old_dtb_hash, new_dtb_hash))
-            seg_data = (
-                seg_data[:dtb_off] + bytearray(patched) + seg_data[dtb_off + dtb_sz :]
-            )
-            delta += len(patched) - dtb_sz
-            seg_modified = True
-
-            results.append(
-                dict(
-                    segment=seg_idx,
-                    dtb_index=dtb_idx,
-                    offset=dtb_off,
-                    model=model,
-                    node_path=node_path,
-                    status="patched",
+            outcomes.append(
+                _DtbPatch(
+                    model,
+                    where,
+                    patched,
+                    old_hash=sha384(dtb_bytes),
+                    new_hash=sha384(patched),
                 )
             )
+    return outcomes, editor
 
-        if not seg_modified:
-            continue
-
-        new_seg_hash = hashlib.sha384(bytes(seg_data)).digest()
-        grow = len(seg_data) - orig_seg_size
-
-        # Save PH#0 hash before ELF headers are modified by growth fixup.
-        # _update_elf_headers_for_growth() rewrites p_offset fields inside
-        # PH#0's payload, so its SHA-384 changes and must be updated too.
-        ph0_seg = list(elf.iter_segments())[0]
-        ph0_off = ph0_seg["p_offset"]
-        ph0_filesz = ph0_seg["p_filesz"]
-        old_ph0_hash = (
-            hashlib.sha384(bytes(raw[ph0_off : ph0_off + ph0_filesz])).digest()
-            if grow != 0 and ph0_filesz > 0
-            else None
-        )
 
-        raw[seg_file_offset : seg_file_offset + orig_seg_size] = seg_data
+def _run_dtb_patches(
+    elf_path: str,
+    spans: List[Tuple[int, int]],
+    edits: List[DtbEdit],
+    jobs: Optional[int],
+) -> Tuple[List[_DtbPatch], _DtbEditor]:
+    """
+    _patch_dtb_spans() over all *spans*, split into *jobs* contiguous chunks
+    on a process pool (default: one per CPU).  Neighbouring DTBs are mostly
+    variants of one board, so each chunk's locators still hit their hints.
+    """
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    jobs = max(1, min(jobs, len(spans)))
+    if jobs == 1 or len(spans) < _MIN_PARALLEL_DTBS:
+        return _patch_dtb_spans(elf_path, spans, edits)
+
+    per_chunk = -(-len(spans) // jobs)
+    chunks = [spans[i : i + per_chunk] for i in range(0, len(spans), per_chunk)]
+    print(f"[i] Patching {len(spans)} DTBs in {len(chunks)} worker processes")
+    editor = _DtbEditor(edits)
+    outcomes: List[_DtbPatch] = []
+    with ProcessPoolExecutor(max_workers=len(chunks)) as executor:
+        futures = [
+            executor.submit(_patch_dtb_spans, elf_path, chunk, edits)
+            for chunk in chunks
+        ]
+        for future in futures:
+            chunk_outcomes, chunk_editor = future.result()
+            outcomes += chunk_outcomes
+            editor.merge(chunk_editor)
+    return outcomes, editor
 
-        if grow != 0:
-            _update_elf_headers_for_growth(raw, elf, seg_file_offset, grow)
 
-        filesz_f, filesz_sz = _ph_filesz_field(is_64)
-        memsz_f, memsz_sz = _ph_memsz_field(is_64)
-        _write_ph_field(raw, elf, seg_idx, filesz_f, filesz_sz, len(seg_data))
-        _write_ph_field(raw, elf, seg_idx, memsz_f, memsz_sz, len(seg_data))
+def _patch_uefi_dtbs(
+    elf_path: str,
+    edits: List[DtbEdit],
+    output_path: str,
+    jobs: Optional[int] = None,
+) -> List[dict]:
+    """
+    Apply *edits* to every DTB embedded in a uefi_dtbs ELF.
 
-        raw_bytes = bytes(raw)
-        segs_now = list(ELFFile(BytesIO(raw_bytes)).iter_segments())
-        hash_seg = next(
-            (s for s in segs_now[seg_idx + 1 :] if s["p_type"] == "PT_NULL"),
-            None,
-        )
-        if hash_seg is not None:
-            h_start = hash_seg["p_offset"]
-            h_end = h_start + hash_seg["p_filesz"]
-        else:
-            h_start, h_end = 0, len(raw_bytes)
+    The DTBs are patched and hashed independently (on *jobs* worker
+    processes, see _run_dtb_patches()), then every patched segment is
+    rebuilt once and the hash table updated by _apply_patch_plan().
 
-        for old_h, new_h in per_dtb_hash_pairs:
-            pos = raw_bytes.find(old_h, h_start, h_end)
-            if pos != -1:
-                raw[pos : pos + 48] = new_h
-                print(f"[i] Per-DTB SHA-384 updated at file 0x{pos:x}")
+    Returns a list of result dicts (one per DTB found) with keys:
+    segment, dtb_index, offset, model, targets, status.
+    """
+    results: List[dict] = []
+    plan: List[_SegmentPatch] = []
+    per_dtb_hash_pairs: List[Tuple[bytes, bytes]] = []
+
+    with _MappedElf(elf_path) as m:
+        found = [
+            (seg_idx, dtb_idx, dtb_off, dtb_sz)
+            for seg_idx in range(len(m.segments))
+            for dtb_idx, (dtb_off, dtb_sz) in enumerate(m.scan_dtbs(seg_idx))
+        ]
+        spans = [
+            (m.segments[seg_idx]["p_offset"] + dtb_off, dtb_sz)
+            for seg_idx, _, dtb_off, dtb_sz in found
+        ]
+        outcomes, editor = _run_dtb_patches(elf_path, spans, edits, jobs)
+
+        for (seg_idx, dtb_idx, dtb_off, dtb_sz), outcome in zip(found, outcomes):
+            if not outcome.targets:
+                status = f"skip (no {_describe_props(edits)})"
+            elif outcome.data is None:
+                status = f"error: {outcome.error}"
             else:
-                print("[!] Per-DTB SHA-384 not found in hash segment (non-fatal)")
-
-        pos = raw_bytes.find(old_seg_hash, h_start, h_end)
-        if pos != -1:
-            raw[pos : pos + 48] = new_seg_hash
-            print(f"[i] Segment SHA-384 updated at file 0x{pos:x}")
-        else:
-            print("[!] Segment SHA-384 not found in hash segment (non-fatal)")
-
-        if old_ph0_hash is not None:
-            new_ph0_hash = hashlib.sha384(
-                raw_bytes[ph0_off : ph0_off + ph0_filesz]
-            ).digest()
-            pos = raw_bytes.find(old_ph0_hash, h_start, h_end)
-            if pos != -1:
-                raw[pos : pos + 48] = new_ph0_hash
-                print(
-                    f"[i] ELF-header segment (PH#0) SHA-384 updated at file 0x{pos:x}"
+                status = "patched"
+                per_dtb_hash_pairs.append((outcome.old_hash, outcome.new_hash))
+                plan.append(
+                    _SegmentPatch(seg_idx, dtb_off, dtb_off + dtb_sz, outcome.data)
                 )
-            else:
-                print(
-                    "[!] ELF-header segment (PH#0) SHA-384 not found in hash segment (non-fatal)"
+            results.append(
+                dict(
+                    segment=seg_idx,
+                    dtb_index=dtb_idx,
+                    offset=dtb_off,
+                    model=outcome.model,
+                    targets=outcome.targets,
+                    status=status,
                 )
+            )
+
+        editor.report("uefi_dtbs")
+        if plan:
+            image = _apply_patch_plan(m.map, m.elf, plan, None, per_dtb_hash_pairs)
+        else:
+            image = _OutputImage()
+            image.append(memoryview(m.map))
+        with image:
+            tmp_path = _write_image(image, output_path, elf_path)
 
-    with open(output_path, "wb") as f:
-        f.write(raw)
+    # Moved into place after the map is closed, so *output_path* may be
+    # *elf_path*.
+    os.replace(tmp_path, output_path)
 
     return results
 
@@ -733,13 +1289,11 @@ ELF_TYPE_UEFI_DTBS = "uefi_dtbs"
 ELF_TYPE_XBL_CONFIG = "xbl_config"
 
 
-def _has_dtb_segment(elf: ELFFile) -> bool:
-    for seg in elf.iter_segments():
-        data = seg.data()
-        for i in range(0, len(data) - 3, 4):
-            if struct.unpack(">I", data[i : i + 4])[0] == DTB_MAGIC:
-                return True
-    return False
+def _has_dtb_segment(m: _MappedElf) -> bool:
+    return any(
+        _find_dtb_magic(m.map, start, end, start) != -1
+        for start, end in map(m.bounds, range(len(m.segments)))
+    )
 
 
 def _has_xblconfig_metadata(elf: ELFFile, meta_ph_index: int = 1) -> bool:
@@ -759,11 +1313,10 @@ def _has_xblconfig_metadata(elf: ELFFile, meta_ph_index: int = 1) -> bool:
 
 
 def detect_elf_type(elf_path: str, meta_ph_index: int = 1) -> str:
-    with open(elf_path, "rb") as f:
-        elf = ELFFile(f)
-        if _has_xblconfig_metadata(elf, meta_ph_index):
+    with _MappedElf(elf_path) as m:
+        if _has_xblconfig_metadata(m.elf, meta_ph_index):
             return ELF_TYPE_XBL_CONFIG
-        if _has_dtb_segment(elf):
+        if _has_dtb_segment(m):
             return ELF_TYPE_UEFI_DTBS
     raise ValueError(
         f"Cannot determine ELF type for '{elf_path}': "
@@ -778,101 +1331,73 @@ def detect_elf_type(elf_path: str, meta_ph_index: int = 1) -> str:
 
 def _patch_xbl_config(
     elf_path: str,
-    cert_cer_path: str,
+    edits: List[DtbEdit],
     output_path: str,
-    prop_name: str,
     meta_ph_index: int,
-) -> None:
+) -> Tuple[int, int, int]:
     """
-    Patch *prop_name* in xbl_config ELFs:
-      1. Find which named segment contains a DTB with *prop_name*.
-      2. Patch the DTB property with the new certificate.
-      3. Call _replace_ph() to write back and update p_filesz/p_memsz,
-         xblconfig item_size, and SHA-384.
+    Apply *edits* to xbl_config ELFs:
+      1. Find every DTB in the named segments that any edit applies to.
+      2. Patch all of its properties at once and record the result in a
+         patch plan (segment, byte range, new bytes).
+      3. Apply the whole plan with _apply_patch_plan() -- p_offset/p_filesz/
+         p_memsz, xblconfig item_size and SHA-384 -- and write the output once.
+
+    Returns (patched, skipped, errors); nothing is written if any DTB failed.
     """
-    inc_fd, inc_path = tempfile.mkstemp(suffix=".inc")
-    os.close(inc_fd)
-    try:
-        bin_to_hex(cert_cer_path, inc_path)
-
-        with open(elf_path, "rb") as f:
-            raw = f.read()
-        elf = ELFFile(io.BytesIO(raw))
-        segs = list(elf.iter_segments())
-        _, items, _, _ = _parse_metadata_from_ph(elf, meta_ph_index)
+    editor = _DtbEditor(edits)
+    with _MappedElf(elf_path) as m:
+        _, items, _, _ = _parse_metadata_from_ph(m.elf, meta_ph_index)
 
+        plan: List[_SegmentPatch] = []
         patched = skipped = errors = 0
-        for idx, item in enumerate(list(items)):
+        for idx, item in enumerate(items):
             ph_index = idx + meta_ph_index + 1
-            if ph_index >= len(segs):
-                continue
-
-            seg_data = segs[ph_index].data()
-            dtbs = _scan_dtbs(seg_data)
-            if not dtbs:
+            if ph_index >= len(m.segments):
                 continue
 
-            for dtb_off, dtb_sz in dtbs:
-                dtb_bytes = seg_data[dtb_off : dtb_off + dtb_sz]
-                node_path = _find_cert_node(dtb_bytes, prop_name)
-                if node_path is None:
+            for dtb_off, dtb_sz in m.scan_dtbs(ph_index):
+                dtb_bytes = m.read(ph_index, dtb_off, dtb_off + dtb_sz)
+                targets = editor.targets(dtb_bytes)
+                if not targets:
                     skipped += 1
                     continue
 
-                print(
-                    f"[+] xbl_config: found '{prop_name}' in "
-                    f"'{item.config_name}' (PH#{ph_index}) at {node_path}"
-                )
+                for node_path, edit in targets:
+                    print(
+                        f"[+] xbl_config: found '{edit.prop_name}' in "
+                        f"'{item.config_name}' (PH#{ph_index}) at {node_path}"
+                    )
 
                 try:
-                    patched_dtb = _patch_dtb(dtb_bytes, node_path, inc_path, prop_name)
+                    patched_dtb = editor.apply(dtb_bytes, targets)
                 except Exception as exc:
                     print(f"[!] xbl_config: error patching '{item.config_name}': {exc}")
                     errors += 1
                     continue
 
-                # Always splice patched_dtb back into a copy of seg_data so
-                # any tail-padding bytes beyond the DTB totalsize are preserved.
-                new_seg = bytearray(seg_data)
-                new_seg[dtb_off : dtb_off + dtb_sz] = patched_dtb
-                new_seg_bytes = bytes(new_seg)
-
-                tmp_fd, tmp_seg_path = tempfile.mkstemp(suffix=".dtb")
-                os.close(tmp_fd)
-                try:
-                    with open(tmp_seg_path, "wb") as f:
-                        f.write(new_seg_bytes)
-                    _replace_ph(
-                        elf_path=elf_path,
-                        target_ph_index=ph_index,
-                        new_file=tmp_seg_path,
-                        output_file=output_path,
-                        meta_ph_index=meta_ph_index,
-                    )
-                    elf_path = output_path
-                    with open(elf_path, "rb") as f:
-                        raw = f.read()
-                    elf = ELFFile(io.BytesIO(raw))
-                    segs = list(elf.iter_segments())
-                    patched += 1
-                finally:
-                    try:
-                        os.unlink(tmp_seg_path)
-                    except OSError:
-                        pass
+                # Only the DTB's own bytes are replaced, so any tail padding
+                # beyond its totalsize is preserved.
+                plan.append(
+                    _SegmentPatch(ph_index, dtb_off, dtb_off + dtb_sz, patched_dtb)
+                )
+                patched += 1
 
+        editor.report("xbl_config")
         print(f"[+] xbl_config: patched={patched}  skipped={skipped}  errors={errors}")
         if errors:
-            sys.exit(1)
+            return patched, skipped, errors
         if patched == 0:
             raise ValueError(
-                f"No DTB segment in '{elf_path}' contains property '{prop_name}'"
+                f"No DTB segment in '{elf_path}' contains {_describe_props(edits)}"
             )
-    finally:
-        try:
-            os.unlink(inc_path)
-        except OSError:
-            pass
+
+        with _apply_patch_plan(m.map, m.elf, plan, meta_ph_index) as image:
+            tmp_path = _write_image(image, output_path, elf_path)
+
+    os.replace(tmp_path, output_path)
+    print(f"[+] Written patched ELF to '{output_path}'")
+    return patched, skipped, errors
 
 
 # ============================================================
@@ -880,58 +1405,105 @@ def _patch_xbl_config(
 # ============================================================
 
 
-def patch_capsule_cert(
+@dataclass
+class PatchSummary:
+    """What patch_elf() did to one ELF."""
+
+    elf_type: str
+    patched: int
+    skipped: int
+    errors: int
+
+
+def edit_elf(
     elf_path: str,
-    cert_cer_path: str,
+    edits: List[DtbEdit],
     output_path: str,
-    prop_name: str = _DEFAULT_PROP_NAME,
     meta_ph_index: int = 1,
-) -> str:
+    jobs: Optional[int] = None,
+) -> PatchSummary:
     """
-    Patch the capsule root certificate in *elf_path* and write to *output_path*.
-
-    Args:
-        elf_path:       Input ELF (uefi_dtbs or xbl_config).
-        cert_cer_path:  DER certificate file (.cer).
-        output_path:    Path for the patched output ELF.
-        prop_name:      DTB property name to patch (default: QcCapsuleRootCert).
-        meta_ph_index:  PH index of the XBLConfig metadata blob (default: 1).
-
-    Returns:
-        Detected ELF type string ("uefi_dtbs" or "xbl_config").
+    Apply every DtbEdit in *edits* to the DTBs of *elf_path* and write to
+    *output_path*.  Each DTB is patched once with all edits that apply to
+    it and the ELF is rebuilt and rehashed once.
+
+    DTB-level failures are counted, not raised: a uefi_dtbs ELF is still
+    written with the DTBs that did patch, an xbl_config ELF is not written.
+    *jobs* worker processes patch the DTBs of a uefi_dtbs ELF (default: one
+    per CPU).
     """
     elf_type = detect_elf_type(elf_path, meta_ph_index)
     print(f"[+] Detected ELF type : {elf_type}")
 
     if elf_type == ELF_TYPE_UEFI_DTBS:
-        inc_fd, inc_path = tempfile.mkstemp(suffix=".inc")
-        os.close(inc_fd)
-        try:
-            bin_to_hex(cert_cer_path, inc_path)
-            results = _patch_uefi_dtbs(elf_path, inc_path, output_path, prop_name)
-        finally:
-            try:
-                os.unlink(inc_path)
-            except OSError:
-                pass
+        results = _patch_uefi_dtbs(elf_path, edits, output_path, jobs)
 
         patched = sum(1 for r in results if "patched" in r["status"])
         skipped = sum(1 for r in results if "skip" in r["status"])
         errors = sum(1 for r in results if "error" in r["status"])
         print(f"[+] uefi_dtbs: patched={patched}  skipped={skipped}  errors={errors}")
-        if errors:
-            sys.exit(1)
 
     else:
-        _patch_xbl_config(
+        patched, skipped, errors = _patch_xbl_config(
             elf_path=elf_path,
-            cert_cer_path=cert_cer_path,
+            edits=edits,
             output_path=output_path,
-            prop_name=prop_name,
             meta_ph_index=meta_ph_index,
         )
 
-    return elf_type
+    return PatchSummary(elf_type, patched, skipped, errors)
+
+
+def patch_elf(
+    elf_path: str,
+    cert_value: bytes,
+    output_path: str,
+    prop_name: str = _DEFAULT_PROP_NAME,
+    meta_ph_index: int = 1,
+    jobs: Optional[int] = None,
+) -> PatchSummary:
+    """
+    Patch *prop_name* in *elf_path* with an already encoded certificate
+    (see load_cert_value()) and write to *output_path*; see edit_elf().
+    """
+    return edit_elf(
+        elf_path, [DtbEdit(prop_name, cert_value)], output_path, meta_ph_index, jobs
+    )
+
+
+def patch_capsule_cert(
+    elf_path: str,
+    cert_cer_path: str,
+    output_path: str,
+    prop_name: str = _DEFAULT_PROP_NAME,
+    meta_ph_index: int = 1,
+    jobs: Optional[int] = None,
+) -> str:
+    """
+    Patch the capsule root certificate in *elf_path* and write to *output_path*.
+
+    Args:
+        elf_path:       Input ELF (uefi_dtbs or xbl_config).
+        cert_cer_path:  DER certificate file (.cer).
+        output_path:    Path for the patched output ELF.
+        prop_name:      DTB property name to patch (default: QcCapsuleRootCert).
+        meta_ph_index:  PH index of the XBLConfig metadata blob (default: 1).
+        jobs:           Worker processes for uefi_dtbs DTBs (default: CPU count).
+
+    Returns:
+        Detected ELF type string ("uefi_dtbs" or "xbl_config").
+    """
+    summary = patch_elf(
+        elf_path,
+        load_cert_value(cert_cer_path),
+        output_path,
+        prop_name,
+        meta_ph_index,
+        jobs,
+    )
+    if summary.errors:
+        sys.exit(1)
+    return summary.elf_type
 
 
 # ============================================================
@@ -942,14 +1514,27 @@ def patch_capsule_cert(
 def main() -> None:
     ap = argparse.ArgumentParser(
         prog="qcom-capsule-tool patch-capsule-cert",
+        usage=(
+            "%(prog)s [options] elf_file cert_cer output_elf\n"
+            "       %(prog)s [options] --edits SPEC.json elf_file output_elf\n"
+            "       %(prog)s [options] --cert CER --output-dir DIR ELF [ELF ...]\n"
+            "       %(prog)s [options] --manifest JOBS.json"
+        ),
         description=(
             "Patch QcCapsuleRootCert in a uefi_dtbs or xbl_config ELF. "
-            "The ELF type is detected automatically."
+            "The ELF type is detected automatically. With --edits, several "
+            "DTB properties are set in one pass. With --cert or --manifest, "
+            "many ELFs are patched on a process pool."
         ),
     )
-    ap.add_argument("elf_file", help="Input ELF file (uefi_dtbs or xbl_config)")
-    ap.add_argument("cert_cer", help="DER certificate file (.cer)")
-    ap.add_argument("output_elf", help="Output patched ELF file")
+    ap.add_argument(
+        "paths",
+        nargs="*",
+        metavar="elf_file cert_cer output_elf",
+        help="Input ELF file (uefi_dtbs or xbl_config), DER certificate file "
+        "(.cer) and output patched ELF file; with --edits, no certificate; "
+        "with --cert, the input ELFs",
+    )
     ap.add_argument(
         "--prop-name",
         default=_DEFAULT_PROP_NAME,
@@ -961,21 +1546,88 @@ def main() -> None:
         default=1,
         help="XBLConfig metadata program-header index (default: %(default)s)",
     )
+    ap.add_argument(
+        "--edits",
+        metavar="SPEC",
+        default=None,
+        help="Apply every property edit of a JSON spec in one pass instead of "
+        "patching --prop-name",
+    )
+    ap.add_argument(
+        "--manifest",
+        metavar="JOBS",
+        default=None,
+        help="Patch every ELF listed in a JSON manifest",
+    )
+    ap.add_argument(
+        "--cert",
+        metavar="CER",
+        default=None,
+        help="DER certificate for the ELFs given as arguments (batch mode)",
+    )
+    ap.add_argument(
+        "--output-dir",
+        dest="output_dir",
+        default=None,
+        help="Output directory in batch mode (default: patched/, next to the "
+        "manifest or in the current directory)",
+    )
+    ap.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Number of ELFs patched in parallel in batch mode, otherwise of "
+        "DTBs in a uefi_dtbs ELF (default: CPU count)",
+    )
     args = ap.parse_args()
 
-    print(f"[+] Input ELF  : {args.elf_file}")
-    print(f"[+] Cert (.cer): {args.cert_cer}")
-    print(f"[+] Output ELF : {args.output_elf}")
+    if args.edits:
+        if args.manifest or args.cert:
+            ap.error("--edits cannot be combined with --manifest or --cert")
+        if len(args.paths) != 2:
+            ap.error("expected --edits SPEC elf_file output_elf")
+        elf_file, output_elf = args.paths
+        try:
+            edits = load_edit_spec(args.edits)
+        except DtbEditSpecError as e:
+            print(f"Error: {str(e)}")
+            sys.exit(1)
+
+        print(f"[+] Input ELF  : {elf_file}")
+        print(f"[+] Edits      : {args.edits} ({len(edits)} properties)")
+        print(f"[+] Output ELF : {output_elf}")
+        summary = edit_elf(elf_file, edits, output_elf, args.meta_ph, args.jobs)
+        if summary.errors:
+            sys.exit(1)
+        print(f"[+] Done. Output written to: {output_elf}")
+        return
+    if args.manifest or args.cert:
+        if args.manifest and args.paths:
+            ap.error("--manifest does not take ELF arguments")
+        if args.cert and not (args.manifest or args.paths):
+            ap.error("--cert needs at least one ELF argument")
+        from . import patch_capsule_cert_batch
+
+        patch_capsule_cert_batch.main(args)
+        return
+    if len(args.paths) != 3:
+        ap.error("expected elf_file cert_cer output_elf")
+    elf_file, cert_cer, output_elf = args.paths
+
+    print(f"[+] Input ELF  : {elf_file}")
+    print(f"[+] Cert (.cer): {cert_cer}")
+    print(f"[+] Output ELF : {output_elf}")
 
     patch_capsule_cert(
-        elf_path=args.elf_file,
-        cert_cer_path=args.cert_cer,
-        output_path=args.output_elf,
+        elf_path=elf_file,
+        cert_cer_path=cert_cer,
+        output_path=output_elf,
         prop_name=args.prop_name,
         meta_ph_index=args.meta_ph,
+        jobs=args.jobs,
     )
 
-    print(f"[+] Done. Output written to: {args.output_elf}")
+    print(f"[+] Done. Output written to: {output_elf}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,271 @@
+# --------------------------------------------------------------------
+# Copyright (c) 2026 Qualcomm Innovation Center, Inc. All rights reserved.
+# SPDX-License-Identifier: BSD-3-Clause-Clear
+# --------------------------------------------------------------------
+
+"""Patch many ELFs in one run (`qcom-capsule-tool patch-capsule-cert` with
+--manifest or --cert).
+
+The ELFs are either given on the command line,
+
+    qcom-capsule-tool patch-capsule-cert --cert QcFMPRoot.cer \\
+        --output-dir patched SKU1/xbl_config.elf SKU2/uefi_dtbs.elf
+
+or listed in a JSON manifest. Top-level keys are defaults for every
+file; each entry of "files" is an input path or an object overriding
+them:
+
+    {
+        "cert": "Certificates/QcFMPRoot.cer",
+        "output_dir": "patched",
+        "meta_ph": 1,
+        "files": [
+            "QCS6490/xbl_config.elf",
+            {"input": "QCS9100/xbl_config.elf",
+             "output": "out/qcs9100_xbl_config.elf"},
+            {"input": "SM8750/uefi_dtbs.elf"}
+        ]
+    }
+
+Relative paths in a manifest are resolved against its directory. An ELF
+without an explicit "output" is written to <output_dir>/<its path
+relative to the manifest or current directory> (just its file name when
+it lies outside).
+
+The certificate is read and encoded once in the parent process. Each
+ELF is then type-detected and patched on a process pool, and a per-file
+summary of the patched/skipped/error counts is printed.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from .patch_capsule_cert import load_cert_value, patch_elf
+
+DEFAULT_OUTPUT_DIR = "patched"
+
+
+class PatchManifestError(ValueError):
+    """Raised for an invalid manifest or batch command line."""
+
+
+@dataclass
+class PatchJob:
+    """One ELF to patch."""
+
+    input: str
+    output: str
+    meta_ph: int
+
+
+@dataclass
+class PatchJobResult:
+    input: str
+    output: str
+    seconds: float
+    elf_type: str = "-"
+    patched: int = 0
+    skipped: int = 0
+    errors: int = 0
+    error: Optional[str] = None
+    log: str = ""
+
+    @property
+    def failed(self) -> bool:
+        return self.error is not None or self.errors > 0
+
+
+def _default_output(path: str, base_dir: str, output_dir: str) -> str:
+    rel = os.path.relpath(os.path.abspath(path), base_dir)
+    if rel.startswith(os.pardir):
+        rel = os.path.basename(path)
+    return os.path.join(output_dir, rel)
+
+
+def _check_jobs(jobs: List[PatchJob], where: str) -> None:
+    outputs = set()
+    for job in jobs:
+        if not os.path.isfile(job.input):
+            raise PatchManifestError(f"{where}: {job.input} not found")
+        output = os.path.abspath(job.output)
+        if output in outputs:
+            raise PatchManifestError(f"{where}: {job.output} is written twice")
+        outputs.add(output)
+
+
+def jobs_from_paths(
+    paths: List[str], output_dir: Optional[str], meta_ph: int
+) -> List[PatchJob]:
+    """One job per input ELF given on the command line."""
+    base_dir = os.getcwd()
+    output_dir = os.path.abspath(output_dir or DEFAULT_OUTPUT_DIR)
+    jobs = [
+        PatchJob(path, _default_output(path, base_dir, output_dir), meta_ph)
+        for path in paths
+    ]
+    _check_jobs(jobs, "command line")
+    return jobs
+
+
+def load_manifest(
+    manifest_file: str,
+    cert: Optional[str] = None,
+    output_dir: Optional[str] = None,
+    meta_ph: int = 1,
+) -> Tuple[str, List[PatchJob]]:
+    """
+    Parse *manifest_file*; return (certificate path, jobs).  *cert*,
+    *output_dir* and *meta_ph* are used where the manifest has no value.
+    """
+    try:
+        with open(manifest_file) as f:
+            spec = json.load(f)
+    except (OSError, ValueError) as e:
+        raise PatchManifestError(f"Cannot read manifest {manifest_file}: {e}")
+    if not isinstance(spec, dict) or not isinstance(spec.get("files"), list):
+        raise PatchManifestError(f'{manifest_file}: a "files" list is required')
+
+    base_dir = os.path.dirname(os.path.abspath(manifest_file))
+    if "cert" in spec:
+        cert = os.path.join(base_dir, spec["cert"])
+    if cert is None:
+        raise PatchManifestError(f'{manifest_file}: no "cert" given')
+    output_dir = os.path.join(
+        base_dir, spec.get("output_dir", output_dir or DEFAULT_OUTPUT_DIR)
+    )
+    meta_ph = spec.get("meta_ph", meta_ph)
+
+    jobs = []
+    for index, entry in enumerate(spec["files"]):
+        if isinstance(entry, str):
+            entry = {"input": entry}
+        if not isinstance(entry, dict) or "input" not in entry:
+            raise PatchManifestError(
+                f'{manifest_file}: files[{index}] needs an "input" path'
+            )
+        path = os.path.join(base_dir, entry["input"])
+        if "output" in entry:
+            output = os.path.join(base_dir, entry["output"])
+        else:
+            output = _default_output(path, base_dir, output_dir)
+        meta = entry.get("meta_ph", meta_ph)
+        if not isinstance(meta, int):
+            raise PatchManifestError(
+                f"{manifest_file}: files[{index}]: meta_ph must be an integer"
+            )
+        jobs.append(PatchJob(path, output, meta))
+    if not jobs:
+        raise PatchManifestError(f"{manifest_file}: no files listed")
+    _check_jobs(jobs, manifest_file)
+    return cert, jobs
+
+
+def patch_one(job: PatchJob, cert_value: bytes, prop_name: str) -> PatchJobResult:
+    """Patch a single ELF, capturing its output (worker process)."""
+    start = time.monotonic()
+    result = PatchJobResult(job.input, job.output, 0.0)
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log):
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(job.output)), exist_ok=True)
+            # The pool already runs one ELF per CPU; patch its DTBs serially.
+            summary = patch_elf(
+                job.input, cert_value, job.output, prop_name, job.meta_ph, jobs=1
+            )
+            result.elf_type = summary.elf_type
+            result.patched = summary.patched
+            result.skipped = summary.skipped
+            result.errors = summary.errors
+        except Exception as e:
+            result.error = str(e) or type(e).__name__
+    result.log = log.getvalue()
+    result.seconds = time.monotonic() - start
+    return result
+
+
+def run_batch(
+    jobs: List[PatchJob],
+    cert_value: bytes,
+    prop_name: str,
+    workers: Optional[int] = None,
+) -> List[PatchJobResult]:
+    """Patch every job, *workers* at a time (default: one per CPU)."""
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(jobs)))
+
+    print(f"INFO: Patching {len(jobs)} ELFs, {workers} at a time.")
+    results = []
+
+    def report(result: PatchJobResult) -> None:
+        status = "FAILED" if result.failed else "ok"
+        print(f"  [{status}] {result.input} ({result.seconds:.2f}s)")
+        results.append(result)
+
+    if workers == 1:
+        for job in jobs:
+            report(patch_one(job, cert_value, prop_name))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(patch_one, job, cert_value, prop_name) for job in jobs
+            ]
+            for future in as_completed(futures):
+                report(future.result())
+
+    order = {job.output: i for i, job in enumerate(jobs)}
+    results.sort(key=lambda r: order[r.output])
+    return results
+
+
+def print_summary(results: List[PatchJobResult]) -> None:
+    width = max(len(r.input) for r in results)
+    print()
+    print(
+        f"{'ELF':<{width}}  {'Type':<10}  {'Patched':>7}  {'Skipped':>7}  "
+        f"{'Errors':>6}  {'Time':>7}  Output / error"
+    )
+    for r in results:
+        detail = r.error if r.error else r.output
+        print(
+            f"{r.input:<{width}}  {r.elf_type:<10}  {r.patched:>7}  {r.skipped:>7}  "
+            f"{r.errors:>6}  {r.seconds:>6.2f}s  {detail}"
+        )
+    failed = [r for r in results if r.failed]
+    print(f"{len(results) - len(failed)} of {len(results)} ELFs patched.")
+    for r in failed:
+        print()
+        print(f"--- {r.input} ---")
+        print(r.log, end="")
+
+
+def main(args: argparse.Namespace) -> None:
+    """Entry point for `patch-capsule-cert --manifest / --cert`."""
+    try:
+        if args.manifest:
+            cert, jobs = load_manifest(
+                args.manifest, args.cert, args.output_dir, args.meta_ph
+            )
+        else:
+            cert = args.cert
+            jobs = jobs_from_paths(args.paths, args.output_dir, args.meta_ph)
+        try:
+            cert_value = load_cert_value(cert)
+        except OSError as e:
+            raise PatchManifestError(f"Cannot read certificate {cert}: {e}")
+    except PatchManifestError as e:
+        print(f"Error: {str(e)}")
+        sys.exit(1)
+
+    results = run_batch(jobs, cert_value, args.prop_name, args.jobs)
+    print_summary(results)
+    if any(r.failed for r in results):
+        sys.exit(1)
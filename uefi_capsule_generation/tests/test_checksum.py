@@ -0,0 +1,72 @@
+# --------------------------------------------------------------------
+# Copyright (c) 2026 Qualcomm Innovation Center, Inc. All rights reserved.
+# SPDX-License-Identifier: BSD-3-Clause-Clear
+# --------------------------------------------------------------------
+
+"""Equivalence of qcom_capsule_tool.checksum with the code it replaced."""
+
+import hashlib
+import os
+
+import pytest
+
+from qcom_capsule_tool import checksum
+
+
+def crc32_reference(data: bytes, size: int) -> int:
+    """Bit-by-bit CRC-32 (formerly CalcCRC32_i)."""
+
+    def reflect(value: int, bits: int) -> int:
+        result = 0
+        for i in range(bits):
+            if value & 1:
+                result |= 1 << (bits - 1 - i)
+            value >>= 1
+        return result
+
+    regs = 0xFFFFFFFF
+    for i in range(size):
+        byte = reflect(data[i], 8)
+        for _ in range(8):
+            msb = (byte >> 7) & 1
+            regs_msb = (regs >> 31) & 1
+            regs = (regs << 1) & 0xFFFFFFFF
+            if regs_msb ^ msb:
+                regs ^= 0x04C11DB7
+            byte <<= 1
+    return reflect(regs, 32) ^ 0xFFFFFFFF
+
+
+SAMPLES = [b"", b"\x00", b"\xff" * 3, os.urandom(28), os.urandom(4099)]
+
+
+@pytest.mark.parametrize("data", SAMPLES, ids=lambda d: f"{len(d)}B")
+def test_crc32(data):
+    assert checksum.crc32(data) == crc32_reference(data, len(data))
+    half = len(data) // 2
+    assert checksum.crc32(data, half) == crc32_reference(data, half)
+
+
+@pytest.mark.parametrize("data", SAMPLES, ids=lambda d: f"{len(d)}B")
+def test_checksum8(data):
+    assert checksum.checksum8(data) == -sum(data) & 0xFF
+
+
+@pytest.mark.parametrize("data", SAMPLES, ids=lambda d: f"{len(d)}B")
+def test_checksum16(data):
+    even = data[: len(data) & ~1]
+    words = [even[i] | even[i + 1] << 8 for i in range(0, len(even), 2)]
+    assert checksum.checksum16(even) == -sum(words) & 0xFFFF
+
+
+def test_sum8_chunked():
+    data = os.urandom(3 * checksum.FILE_CHUNK_SIZE + 17)
+    assert checksum.sum8(data[1000:], checksum.sum8(data[:1000])) == sum(data) & 0xFF
+
+
+def test_file_digests(tmp_path):
+    data = os.urandom(2 * checksum.FILE_CHUNK_SIZE + 5)
+    path = tmp_path / "blob.bin"
+    path.write_bytes(data)
+    assert checksum.sha256_file(str(path), 4096) == hashlib.sha256(data).digest()
+    assert checksum.sha384_file(str(path)) == hashlib.sha384(data).digest()
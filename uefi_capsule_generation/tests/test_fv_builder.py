@@ -0,0 +1,114 @@
+# --------------------------------------------------------------------
+# Copyright (c) 2026 Qualcomm Innovation Center, Inc. All rights reserved.
+# SPDX-License-Identifier: BSD-3-Clause-Clear
+# --------------------------------------------------------------------
+
+"""FV layout of qcom_capsule_tool.fv_builder, checked against GenFv."""
+
+import io
+import os
+import shutil
+import struct
+
+import pytest
+
+from qcom_capsule_tool import FVCreation, ffs_builder, fv_builder
+
+GUID_A = "4f1c8c8c-0001-4e2a-9a3b-112233445566"
+GUID_B = "4f1c8c8c-0002-4e2a-9a3b-112233445566"
+DATA_A = b"ABCDE"
+DATA_B = bytes(range(16))
+
+# FFS_ATTRIB_DATA_ALIGNMENT 3: the data of file B must be 512-byte aligned.
+ALIGNMENT_512 = 3 << 3
+
+
+def _ffs_images():
+    image_b = bytearray(ffs_builder.build_ffs(GUID_B, DATA_B))
+    image_b[19] |= ALIGNMENT_512
+    # set_ffs_name recomputes the header checksum for the new attributes.
+    return [
+        ffs_builder.build_ffs(GUID_A, DATA_A),
+        ffs_builder.set_ffs_name(bytes(image_b), GUID_B),
+    ]
+
+
+def _build_fv(images):
+    fs = io.BytesIO()
+    fv_builder.write_fv(fs, images)
+    return fs.getvalue()
+
+
+def test_fv_header():
+    fv = _build_fv(_ffs_images())
+    assert len(fv) == 0x240
+
+    header = fv[: fv_builder.FV_HEADER_LENGTH]
+    (
+        zero_vector,
+        fs_guid,
+        fv_length,
+        signature,
+        attributes,
+        header_length,
+        _,
+        ext_header_offset,
+        reserved,
+        revision,
+    ) = struct.unpack_from("<16s16sQ4sIHHHBB", header)
+    assert zero_vector == bytes(16)
+    assert fs_guid == fv_builder.EFI_FIRMWARE_FILE_SYSTEM2_GUID.bytes_le
+    assert fv_length == 0x240
+    assert signature == b"_FVH"
+    # FvMain.inf attributes, with the alignment raised to 2^9 by file B.
+    assert attributes == 0x0009FEFF
+    assert header_length == 0x48
+    assert (ext_header_offset, reserved, revision) == (0, 0, 2)
+    assert header[0x38:] == struct.pack("<IIII", 9, 0x40, 0, 0)
+    assert sum(struct.unpack("<36H", header)) & 0xFFFF == 0
+
+
+def test_fv_files_and_padding():
+    image_a, image_b = _ffs_images()
+    fv = _build_fv([image_a, image_b])
+
+    # File A follows the header; its State byte is inverted (0x07 -> 0xF8).
+    assert fv[0x48 : 0x48 + 23] == image_a[:23]
+    assert fv[0x48 + 23] == 0xF8
+    assert fv[0x48 + 24 : 0x65] == DATA_A
+    assert fv[0x65:0x68] == b"\xff" * 3
+
+    # A pad file moves the data of file B to 0x200.
+    pad = fv[0x68:0x80]
+    assert pad[:16] == bytes(16)
+    assert pad[17:] == bytes([0xAA, 0xF0, 0x00, 0x80, 0x01, 0x00, 0xF8])
+    assert sum(pad[:17] + pad[18:23]) & 0xFF == 0
+    assert fv[0x80:0x1E8] == b"\xff" * (0x1E8 - 0x80)
+
+    assert fv[0x1E8 : 0x1E8 + 23] == image_b[:23]
+    assert fv[0x1E8 + 23] == 0xF8
+    assert fv[0x200:0x210] == DATA_B
+    assert fv[0x210:] == b"\xff" * 0x30
+
+
+def test_streamed_ffs_matches(tmp_path):
+    input_file = tmp_path / "a.bin"
+    input_file.write_bytes(DATA_A)
+    streamed = ffs_builder.StreamedFfsFile("a.ffs", GUID_A, str(input_file))
+    image_a = ffs_builder.build_ffs(GUID_A, DATA_A)
+    assert _build_fv([streamed]) == _build_fv([image_a])
+
+
+@pytest.mark.skipif(shutil.which("GenFv") is None, reason="GenFv not on PATH")
+def test_matches_gen_fv(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    names = []
+    for i, image in enumerate(_ffs_images()):
+        names.append(f"{i}.ffs")
+        with open(names[-1], "wb") as f:
+            f.write(image)
+
+    tools_dir = os.path.dirname(shutil.which("GenFv"))
+    assert FVCreation.run_gen_fv("edk2.fv", names, tools_dir)
+    with open("edk2.fv", "rb") as f:
+        assert _build_fv(_ffs_images()) == f.read()